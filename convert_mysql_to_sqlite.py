@@ -0,0 +1,421 @@
+import os
+import re
+import gzip
+import json
+import time
+import shutil
+import sqlite3
+import sys
+import argparse
+import subprocess
+from collections import Counter
+
+from import_csv_to_db import split_top_level
+
+# ==========================================
+# KONFIGURATION
+# ==========================================
+DUMP_DIR = 'db_DigitalesKlassenbuch'
+# Ohne Dateiangabe: dieselbe Kombination, die App.vue im Browser laedt
+STANDARD_DUMPS = [os.path.join(DUMP_DIR, '01_schema.sql'), os.path.join(DUMP_DIR, '02_beispieldaten.sql')]
+OUTPUT_FILE = 'klassenbuch.sqlite'
+
+# Zeichen pro Lesevorgang; der Speicherbedarf haengt nur hiervon und vom
+# laengsten Statement ab, nicht von der Groesse des Dumps
+LESE_BLOCK = 1024 * 1024
+
+# So viele Statements je Transaktion (ein INSERT aus convert_csv_to_sql.py traegt 1000 Zeilen)
+TRANSAKTION_STATEMENTS = 200
+
+# TypeScript-Uebersetzer aus dem Frontend, fuer --benchmark
+TS_KONVERTER = os.path.join('src', 'lib', 'mysqlToSqlite.ts')
+
+# Statements ohne Entsprechung in SQLite; Fremdschluessel steuert der Loader selbst
+UEBERSPRINGEN = re.compile(
+    r'(SET|LOCK\s+TABLES|UNLOCK\s+TABLES|USE|CREATE\s+DATABASE|DROP\s+DATABASE|START\s+TRANSACTION|BEGIN|COMMIT)\b',
+    re.I)
+
+# MySQL-Escapes in Strings -> Klartext (SQLite kennt nur '')
+ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a', '%': '\\%', '_': '\\_'}
+
+# Ein kompletter String ohne Backslash ist in MySQL und SQLite identisch und
+# wird unveraendert uebernommen (schneller Pfad fuer INSERT-Daten)
+_TOKEN = re.compile(r"'[^'\\]*(?:''[^'\\]*)*'|[;'\"`#]|--|/\*")
+_STRING_ENDE = {"'": re.compile(r"['\\]"), '"': re.compile(r'["\\]')}
+
+# ==========================================
+# TOKENIZER (gestreamt)
+# ==========================================
+def lese_statements(datei, block_groesse=LESE_BLOCK, statistik=None):
+    """Zerlegt einen MySQL-Dump Statement fuer Statement, ohne ihn ganz zu laden.
+
+    Liefert die Statements ohne abschliessendes ';' und ohne Kommentare
+    (auch nicht die /*!...*/-Bloecke von mysqldump). Strings kommen bereits
+    in SQLite-Schreibweise heraus ('' statt \\'), damit alle spaeteren
+    Umschreibungen nie in Daten hineingreifen. DELIMITER-Bloecke
+    (Trigger, Prozeduren) werden nicht unterstuetzt.
+    """
+    puffer, pos, eof = '', 0, False
+    teile = []  # Stuecke des aktuellen Statements
+
+    def nachladen():
+        nonlocal puffer, pos, eof
+        block = datei.read(block_groesse)
+        if statistik is not None:
+            statistik['zeichen'] += len(block)
+        if not block:
+            eof = True
+            return False
+        puffer = puffer[pos:] + block
+        pos = 0
+        return True
+
+    def suche_bis(muster):
+        # Ueberspringt alles bis einschliesslich `muster` (Kommentare)
+        nonlocal pos
+        while True:
+            ende = puffer.find(muster, pos)
+            if ende >= 0:
+                pos = ende + len(muster)
+                return
+            pos = max(pos, len(puffer) - len(muster) + 1)
+            if not nachladen():
+                pos = len(puffer)
+                return
+
+    while True:
+        m = _TOKEN.search(puffer, pos)
+        # Treffer am Pufferende koennen unvollstaendig sein ('a' | 'b' war 'a''b')
+        if (m is None or m.end() >= len(puffer)) and not eof:
+            if m is None:
+                # Ein '-' oder '/' am Ende koennte ein Kommentar-Anfang sein
+                schnitt = len(puffer)
+                if puffer.endswith(('-', '/')):
+                    schnitt = max(pos, schnitt - 1)
+                teile.append(puffer[pos:schnitt])
+                pos = schnitt
+            nachladen()
+            continue
+        if m is None:
+            teile.append(puffer[pos:])
+            break
+
+        token = m.group()
+        if len(token) > 1 and token[0] == "'":
+            teile.append(puffer[pos:m.end()])
+            pos = m.end()
+            continue
+
+        teile.append(puffer[pos:m.start()])
+        pos = m.end()
+        if token == ';':
+            statement = ''.join(teile).strip()
+            teile = []
+            if statement:
+                yield statement
+        elif token in ("'", '"'):
+            # Langsamer Pfad: String mit Backslash-Escapes oder in doppelten Anfuehrungszeichen
+            inhalt = []
+            while True:
+                e = _STRING_ENDE[token].search(puffer, pos)
+                if (e is None or e.end() >= len(puffer)) and not eof:
+                    if e is None:
+                        inhalt.append(puffer[pos:])
+                        pos = len(puffer)
+                    nachladen()
+                    continue
+                if e is None:
+                    raise ValueError("Dump endet mitten in einem String")
+                inhalt.append(puffer[pos:e.start()])
+                if e.group() == '\\':
+                    zeichen = puffer[e.end():e.end() + 1]
+                    inhalt.append(ESCAPES.get(zeichen, zeichen))
+                    pos = e.end() + 1
+                elif puffer[e.end():e.end() + 1] == token:
+                    inhalt.append(token)
+                    pos = e.end() + 1
+                else:
+                    pos = e.end()
+                    break
+            teile.append("'" + ''.join(inhalt).replace("'", "''") + "'")
+        elif token == '`':
+            # Bezeichner in Backticks versteht SQLite direkt
+            bezeichner = ['`']
+            while True:
+                ende = puffer.find('`', pos)
+                if (ende < 0 or ende + 1 >= len(puffer)) and not eof:
+                    if ende < 0:
+                        bezeichner.append(puffer[pos:])
+                        pos = len(puffer)
+                    nachladen()
+                    continue
+                if ende < 0:
+                    raise ValueError("Dump endet mitten in einem Bezeichner")
+                bezeichner.append(puffer[pos:ende + 1])
+                pos = ende + 1
+                if puffer[pos:pos + 1] != '`':
+                    break
+                bezeichner.append('`')
+                pos += 1
+            teile.append(''.join(bezeichner))
+        elif token == '--':
+            # MySQL verlangt nach '--' ein Leerzeichen, sonst ist es z.B. 5--3
+            if puffer[pos:pos + 1] in (' ', '\t', '\r', '\n', ''):
+                suche_bis('\n')
+                teile.append('\n')
+            else:
+                teile.append('-')
+                pos -= 1
+        elif token == '#':
+            suche_bis('\n')
+            teile.append('\n')
+        elif token == '/*':
+            suche_bis('*/')
+            teile.append(' ')
+
+    statement = ''.join(teile).strip()
+    if statement:
+        yield statement
+
+# ==========================================
+# UEBERSETZUNG MySQL -> SQLite
+# ==========================================
+class Uebersetzer:
+    """Schreibt einzelne Statements auf SQLite um.
+
+    Nur CREATE TABLE wird zerlegt; INSERTs werden lediglich am Anfang
+    angepasst und sonst unveraendert durchgereicht, egal wie lang sie sind.
+    """
+
+    def __init__(self):
+        self.indexnamen = set()
+
+    def uebersetze(self, statement):
+        """Liste von SQLite-Statements (leer, wenn es nichts zu tun gibt)."""
+        if UEBERSPRINGEN.match(statement):
+            return []
+        if re.match(r'INSERT\s+IGNORE\b', statement, re.I):
+            return [re.sub(r'^INSERT\s+IGNORE\s+INTO\b', 'INSERT OR IGNORE INTO', statement, count=1, flags=re.I)]
+        if re.match(r'CREATE\s+(TEMPORARY\s+)?TABLE\b', statement, re.I):
+            return self.create_table(statement)
+        return [statement]
+
+    def create_table(self, statement):
+        match = re.match(r'(CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([`\w.]+))\s*\((.*)\)[^)]*$',
+                         statement, flags=re.I | re.S)
+        if not match:
+            return [statement]
+        kopf, tabelle, rumpf = match.groups()
+
+        definitionen, indizes = [], []
+        for teil in split_top_level(rumpf):
+            index_match = re.fullmatch(
+                r'(UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?(?:INDEX|KEY)\s+([`\w]+)\s*(\(.*\))(?:\s+USING\s+\w+)?',
+                teil, flags=re.I | re.S)
+            if index_match:
+                art, name, spalten = index_match.groups()
+                art = (art or '').strip().upper()
+                if art == 'UNIQUE':
+                    definitionen.append(f"UNIQUE {spalten}")
+                elif not art:
+                    indizes.append(self.create_index(tabelle, name, spalten))
+                # FULLTEXT/SPATIAL gibt es in SQLite nicht
+                continue
+            if re.match(r'(PRIMARY\s+KEY|FOREIGN\s+KEY|CONSTRAINT|CHECK|UNIQUE)\b', teil, re.I):
+                definitionen.append(teil)
+            else:
+                definitionen.append(self.spalte(teil))
+
+        return [f"{kopf} (\n    " + ",\n    ".join(definitionen) + "\n)"] + indizes
+
+    def create_index(self, tabelle, name, spalten):
+        # MySQL-Indexnamen gelten pro Tabelle, SQLite-Indexnamen pro Datenbank
+        name = name.strip('`')
+        if name in self.indexnamen:
+            name = f"{tabelle.strip('`')}_{name}"
+        self.indexnamen.add(name)
+        spalten = re.sub(r'`?(\w+)`?\s*\(\d+\)', r'\1', spalten)  # Praefix-Laengen wie name(20)
+        return f"CREATE INDEX {name} ON {tabelle} {spalten}"
+
+    def spalte(self, definition):
+        spalte = definition.split()[0]
+
+        # id INT PRIMARY KEY AUTO_INCREMENT -> INTEGER PRIMARY KEY (Alias fuer die rowid, zaehlt selbst hoch)
+        if re.search(r'\bAUTO_INCREMENT\b', definition, re.I):
+            definition = re.sub(r'\b(?:TINY|SMALL|MEDIUM|BIG)?INT(?:EGER)?\b(\s*\(\d+\))?', 'INTEGER', definition,
+                                count=1, flags=re.I)
+            definition = re.sub(r'\s*\bAUTO_INCREMENT\b', '', definition, flags=re.I)
+
+        # ENUM('a', 'b') -> TEXT + CHECK (spalte IN ('a', 'b')), Werte bleiben so geprueft wie in MySQL
+        enum_match = re.search(r"\bENUM\s*\(((?:'[^']*(?:''[^']*)*'|[^)'])*)\)", definition, flags=re.I)
+        if enum_match:
+            werte = ', '.join(split_top_level(enum_match.group(1)))
+            definition = definition[:enum_match.start()] + 'TEXT' + definition[enum_match.end():]
+            definition += f" CHECK ({spalte} IN ({werte}))"
+
+        # Reine MySQL-Attribute ohne Bedeutung fuer SQLite
+        definition = re.sub(r"\s+(UNSIGNED|ZEROFILL)\b", '', definition, flags=re.I)
+        definition = re.sub(r"\s+(CHARACTER\s+SET|CHARSET|COLLATE)\s+\w+", '', definition, flags=re.I)
+        definition = re.sub(r"\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP(\(\d*\))?", '', definition, flags=re.I)
+        definition = re.sub(r"\s+COMMENT\s+'[^']*(?:''[^']*)*'", '', definition, flags=re.I)
+        return definition
+
+# ==========================================
+# LADEN
+# ==========================================
+def _oeffne(pfad):
+    # newline='' laesst Zeilenumbrueche in Strings unangetastet
+    if pfad.endswith('.gz'):
+        return gzip.open(pfad, 'rt', encoding='utf-8', newline='')
+    return open(pfad, 'r', encoding='utf-8', newline='')
+
+def uebersetzte_statements(dateien, statistik):
+    """Alle SQLite-Statements der Dumps, zusammen mit Datei und Statement-Nummer."""
+    uebersetzer = Uebersetzer()
+    for pfad in dateien:
+        with _oeffne(pfad) as datei:
+            for nr, statement in enumerate(lese_statements(datei, statistik=statistik), 1):
+                statistik['statements'] += 1
+                for sql in uebersetzer.uebersetze(statement):
+                    yield pfad, nr, sql
+
+def lade_dumps(dateien, db_pfad, transaktion_statements=TRANSAKTION_STATEMENTS):
+    """Baut aus MySQL-Dumps eine SQLite-Datenbank; True bei Erfolg.
+
+    Fremdschluessel sind waehrend des Ladens aus (wie SET FOREIGN_KEY_CHECKS = 0)
+    und werden am Ende mit PRAGMA foreign_key_check komplett geprueft.
+    Scheitert ein Statement, wird die halb gebaute Datei geloescht.
+    """
+    statistik = Counter()
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_pfad, isolation_level=None)
+    cursor = conn.cursor()
+    # Die Datei wird neu gebaut; bei einem Abbruch wird sie geloescht statt zurueckgerollt
+    # (ohne Journal ist ROLLBACK nicht moeglich)
+    cursor.execute("PRAGMA journal_mode = OFF")
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA foreign_keys = OFF")
+
+    fehlgeschlagen = True
+    try:
+        cursor.execute("BEGIN")
+        offen = 0
+        for pfad, nr, sql in uebersetzte_statements(dateien, statistik):
+            try:
+                cursor.execute(sql)
+            except sqlite3.Error as e:
+                print(f"FEHLER in {pfad}, Statement {nr}: {e}")
+                print(f"        {sql[:200]}{'...' if len(sql) > 200 else ''}")
+                return False
+            if sql[:6].upper() in ('INSERT', 'REPLAC'):
+                statistik['zeilen'] += cursor.rowcount
+            offen += 1
+            if offen >= transaktion_statements:
+                cursor.execute("COMMIT")
+                cursor.execute("BEGIN")
+                offen = 0
+        cursor.execute("COMMIT")
+
+        verletzungen = Counter(row[0] for row in cursor.execute("PRAGMA foreign_key_check"))
+        fehlgeschlagen = False
+    finally:
+        conn.close()
+        if fehlgeschlagen and os.path.exists(db_pfad):
+            os.remove(db_pfad)
+            print(f"HINWEIS: Unvollstaendige Datei '{db_pfad}' geloescht.")
+
+    dauer = time.perf_counter() - start
+    print(f"ERFOLG: {statistik['statements']} Statements, {statistik['zeilen']} Zeilen in {dauer:.2f}s "
+          f"({statistik['zeichen'] / 1e6 / max(dauer, 1e-9):.1f} MB/s) nach '{db_pfad}' geladen.")
+    for tabelle, anzahl in sorted(verletzungen.items()):
+        print(f"WARNUNG: {anzahl} Zeilen in '{tabelle}' verweisen auf nicht vorhandene Datensaetze.")
+    return not verletzungen
+
+def schreibe_sql(dateien, out_pfad):
+    """Schreibt die uebersetzten Statements als SQLite-Skript (z.B. fuer das Frontend)."""
+    statistik = Counter()
+    with open(out_pfad, 'w', encoding='utf-8') as f_out:
+        for _, _, sql in uebersetzte_statements(dateien, statistik):
+            f_out.write(sql + ";\n")
+    print(f"ERFOLG: {statistik['statements']} Statements nach '{out_pfad}' uebersetzt.")
+
+# ==========================================
+# BENCHMARK gegen mysqlToSqlite.ts
+# ==========================================
+# Transpiliert mysqlToSqlite.ts mit dem TypeScript-Compiler aus node_modules
+# und misst nur den Aufruf von mysqlToSqlite() auf dem kompletten Dump-String.
+TS_BENCHMARK_JS = """
+const fs = require('fs');
+const ts = require('typescript');
+const [quelle, ...dumps] = process.argv.slice(1);
+const js = ts.transpileModule(fs.readFileSync(quelle, 'utf8'),
+  { compilerOptions: { module: ts.ModuleKind.CommonJS } }).outputText;
+const modul = { exports: {} };
+new Function('exports', 'module', js)(modul.exports, modul);
+const sql = dumps.map((d) => fs.readFileSync(d, 'utf8')).join('\\n\\n');
+const start = process.hrtime.bigint();
+const out = modul.exports.mysqlToSqlite(sql);
+const sekunden = Number(process.hrtime.bigint() - start) / 1e9;
+console.log(JSON.stringify({ sekunden, zeichen: out.length, speicher_mb: process.memoryUsage().rss / 1e6 }));
+"""
+
+def benchmark(dateien):
+    """Vergleicht die reine Uebersetzung (ohne Ausfuehren) mit der TS-Version."""
+    statistik = Counter()
+    start = time.perf_counter()
+    for _ in uebersetzte_statements(dateien, statistik):
+        pass
+    dauer = time.perf_counter() - start
+    mb = statistik['zeichen'] / 1e6
+    print(f"Python (gestreamt): {mb:.1f} MB, {statistik['statements']} Statements in {dauer:.2f}s ({mb / max(dauer, 1e-9):.1f} MB/s)")
+
+    if any(pfad.endswith('.gz') for pfad in dateien):
+        print("HINWEIS: Die TS-Version liest keine .gz-Dateien, Vergleich uebersprungen.")
+        return
+    if shutil.which('node') is None:
+        print("HINWEIS: node nicht gefunden, Vergleich mit mysqlToSqlite.ts uebersprungen.")
+        return
+    ergebnis = subprocess.run(['node', '-e', TS_BENCHMARK_JS, TS_KONVERTER, *dateien],
+                              capture_output=True, text=True)
+    if ergebnis.returncode != 0:
+        fehler = [zeile for zeile in ergebnis.stderr.splitlines() if 'Error' in zeile] or [f"Exit-Code {ergebnis.returncode}"]
+        print("HINWEIS: mysqlToSqlite.ts konnte nicht ausgefuehrt werden (npm install ausgefuehrt?):")
+        print(f"        {fehler[0].strip()}")
+        return
+    ts = json.loads(ergebnis.stdout)
+    print(f"TypeScript (ganzer String): {ts['sekunden']:.2f}s ({mb / max(ts['sekunden'], 1e-9):.1f} MB/s), "
+          f"Prozess-Speicher {ts['speicher_mb']:.0f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="MySQL-Dumps gestreamt nach SQLite uebersetzen und laden")
+    parser.add_argument('dumps', nargs='*', default=STANDARD_DUMPS,
+                        help="Eine oder mehrere .sql/.sql.gz-Dateien in Ladereihenfolge (Standard: 01_schema.sql + 02_beispieldaten.sql)")
+    parser.add_argument('-o', '--output', default=OUTPUT_FILE, help=f"SQLite-Datei (Standard: {OUTPUT_FILE})")
+    parser.add_argument('--ueberschreiben', action='store_true', help="Vorhandene SQLite-Datei ersetzen")
+    parser.add_argument('--sql-out', default=None, help="Nur uebersetzen und als SQLite-Skript hierhin schreiben")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Nur die Uebersetzung messen und mit src/lib/mysqlToSqlite.ts vergleichen")
+    args = parser.parse_args()
+
+    for pfad in args.dumps:
+        if not os.path.exists(pfad):
+            print(f"FEHLER: {pfad} nicht gefunden.")
+            if pfad in STANDARD_DUMPS:
+                print("Hinweis: 02_beispieldaten.sql entsteht mit convert_csv_to_sql.py.")
+            sys.exit(1)
+
+    if args.benchmark:
+        benchmark(args.dumps)
+    elif args.sql_out:
+        schreibe_sql(args.dumps, args.sql_out)
+    else:
+        if os.path.exists(args.output):
+            if not args.ueberschreiben:
+                print(f"FEHLER: {args.output} existiert bereits (--ueberschreiben zum Ersetzen).")
+                sys.exit(1)
+            os.remove(args.output)
+        if not lade_dumps(args.dumps, args.output):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
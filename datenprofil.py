@@ -0,0 +1,471 @@
+import os
+import re
+import csv
+import json
+import math
+import time
+import hashlib
+import argparse
+from itertools import islice, zip_longest
+from collections import Counter, defaultdict
+
+from import_csv_to_db import CSV_DIR, TABELLEN_REIHENFOLGE, csv_dateiname
+from kennzahlen import perzentil
+
+# ==========================================
+# KONFIGURATION
+# ==========================================
+PROFIL_JSON = 'datenprofil.json'
+
+# HyperLogLog mit 2^12 Registern: ca. 1.6% Standardfehler bei 4 KB je Spalte
+HLL_PRAEZISION = 12
+
+# Misra-Gries: so viele Zaehler je Spalte; alle Werte, die haeufiger als
+# 1/(TOPK_ZAEHLER+1) der Zeilen vorkommen, sind garantiert dabei
+TOPK_ZAEHLER = 64
+TOPK_AUSGABE = 10
+
+# Histogramme haben feste Bin-Anzahl; die Bin-Breite verdoppelt sich, wenn ein Wert herausfaellt
+HISTOGRAMM_BINS = 16
+
+# Zeilen je Block: jede Spalte eines Blocks wird erst mit Counter (C) verdichtet,
+# die Skizzen sehen dann nur noch (Wert, Anzahl)-Paare
+BLOCK_ZEILEN = 20000
+
+# Nachkommastellen im JSON, damit Laeufe mit gleichen Daten byte-gleich sind
+RUNDEN = 4
+
+DATUM_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+FEHLEND = ('fehlend_entschuldigt', 'fehlend_unentschuldigt')
+
+# ==========================================
+# SKIZZEN (konstanter Speicher je Spalte)
+# ==========================================
+class HyperLogLog:
+    def __init__(self, p=HLL_PRAEZISION):
+        self.p = p
+        self.m = 1 << p
+        self.register = bytearray(self.m)
+
+    def add(self, werte):
+        rest_bits = 64 - self.p
+        maske = (1 << rest_bits) - 1
+        register = self.register
+        blake2b, from_bytes = hashlib.blake2b, int.from_bytes
+        for wert in werte:
+            h = from_bytes(blake2b(wert.encode('utf-8'), digest_size=8).digest(), 'big')
+            rang = rest_bits - (h & maske).bit_length() + 1
+            if rang > register[h >> rest_bits]:
+                register[h >> rest_bits] = rang
+
+    def schaetzung(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        e = alpha * self.m * self.m / sum(2.0 ** -r for r in self.register)
+        nullen = self.register.count(0)
+        if e <= 2.5 * self.m and nullen:
+            e = self.m * math.log(self.m / nullen) # Linear Counting fuer kleine Mengen
+        return int(round(e))
+
+class TopK:
+    """Misra-Gries mit Gewichten: Zaehler sind Untergrenzen, hoechstens um `abzug` zu niedrig."""
+    def __init__(self, k=TOPK_ZAEHLER):
+        self.k = k
+        self.zaehler = {}
+        self.abzug = 0
+
+    def add(self, wert, anzahl=1):
+        z = self.zaehler
+        z[wert] = z.get(wert, 0) + anzahl
+        if len(z) > self.k:
+            # alle um den kleinsten Zaehler senken; amortisiert billig, weil jede Runde k+1 Zaehler trifft
+            m = min(z.values())
+            self.zaehler = {w: c - m for w, c in z.items() if c > m}
+            self.abzug += m
+
+    def top(self, n=TOPK_AUSGABE):
+        # Eintraege, die nicht ueber dem moeglichen Fehler liegen, sind nicht von Rauschen zu unterscheiden
+        sicher = [(w, c) for w, c in self.zaehler.items() if c > self.abzug]
+        return sorted(sicher, key=lambda wc: (-wc[1], wc[0]))[:n]
+
+class Histogramm:
+    """Feste Bin-Anzahl, Bin-Grenzen immer Vielfache der Breite (gleiche Daten -> gleiche Bins)."""
+    def __init__(self, bins=HISTOGRAMM_BINS):
+        self.bins = bins
+        self.breite = 1
+        self.start = None
+        self.zaehler = [0] * bins
+
+    def add(self, x, anzahl=1):
+        if self.start is None:
+            self.start = math.floor(x / self.breite) * self.breite
+        while not self.start <= x < self.start + self.bins * self.breite:
+            self._verdoppeln(x < self.start)
+        self.zaehler[int((x - self.start) // self.breite)] += anzahl
+
+    def _verdoppeln(self, nach_unten):
+        breite = self.breite * 2
+        if nach_unten:
+            ende = math.ceil((self.start + self.bins * self.breite) / breite) * breite
+            start = ende - self.bins * breite
+        else:
+            start = math.floor(self.start / breite) * breite
+        zaehler = [0] * self.bins
+        for i, c in enumerate(self.zaehler):
+            if c:
+                zaehler[int((self.start + i * self.breite - start) // breite)] += c
+        self.start, self.breite, self.zaehler = start, breite, zaehler
+
+    def add_viele(self, werte_anzahl, kleinster, groesster):
+        """Wie add() fuer viele (x, anzahl)-Paare; der Bereich wird vorab einmal erweitert."""
+        self.add(kleinster, 0)
+        self.add(groesster, 0)
+        start, breite, zaehler = self.start, self.breite, self.zaehler
+        for x, anzahl in werte_anzahl:
+            zaehler[int((x - start) // breite)] += anzahl
+
+    def ergebnis(self):
+        belegt = [i for i, c in enumerate(self.zaehler) if c]
+        if not belegt:
+            return []
+        return [[self.start + i * self.breite, self.start + (i + 1) * self.breite, self.zaehler[i]]
+                for i in range(belegt[0], belegt[-1] + 1)]
+
+class Spaltenprofil:
+    def __init__(self, name):
+        self.name = name
+        self.anzahl = 0
+        self.leer = 0
+        self.typ = None # None -> int -> float -> text, oder datum
+        self.min_text = self.max_text = None
+        self.min_zahl = self.max_zahl = None
+        self.summe = 0.0
+        self.histogramm = Histogramm()
+        self.monate = defaultdict(int) # Histogramm fuer Datumsspalten
+        self.distinct = HyperLogLog()
+        self.topk = TopK()
+
+    def add_spalte(self, werte):
+        """Nimmt die Werte einer Spalte aus einem Block auf."""
+        self.anzahl += len(werte)
+        zaehlung = Counter(werte)
+        self.leer += zaehlung.pop('', 0)
+        if not zaehlung:
+            return
+        kleinster, groesster = min(zaehlung), max(zaehlung)
+        if self.min_text is None or kleinster < self.min_text:
+            self.min_text = kleinster
+        if self.max_text is None or groesster > self.max_text:
+            self.max_text = groesster
+        self.distinct.add(zaehlung)
+        topk_add = self.topk.add
+        for wert, anzahl in zaehlung.items():
+            topk_add(wert, anzahl)
+        if self.typ in (None, 'int', 'float') and self._zahlen(zaehlung):
+            return
+        for wert, anzahl in zaehlung.items():
+            if self.typ == 'text':
+                break
+            self._typisiert(wert, anzahl)
+
+    def _zahlen(self, zaehlung):
+        """Schneller Weg fuer reine Zahlenbloecke; False, wenn Werte einzeln typisiert werden muessen."""
+        umwandeln = float if self.typ == 'float' else int
+        try:
+            paare = [(umwandeln(w), c) for w, c in zaehlung.items()]
+        except ValueError:
+            return False
+        self.typ = self.typ or 'int'
+        kleinster = min(x for x, _ in paare)
+        groesster = max(x for x, _ in paare)
+        self.summe += sum(x * c for x, c in paare)
+        if self.min_zahl is None or kleinster < self.min_zahl:
+            self.min_zahl = kleinster
+        if self.max_zahl is None or groesster > self.max_zahl:
+            self.max_zahl = groesster
+        self.histogramm.add_viele(paare, kleinster, groesster)
+        return True
+
+    def _typisiert(self, wert, anzahl):
+        typ = self.typ
+        if typ is None or typ == 'datum':
+            if DATUM_RE.match(wert):
+                self.typ = 'datum'
+                self.monate[wert[:7]] += anzahl
+                return
+            if typ == 'datum':
+                self.typ = 'text'
+                return
+            typ = 'int'
+        try:
+            x = int(wert) if typ == 'int' else float(wert)
+        except ValueError:
+            try:
+                x = float(wert)
+                typ = 'float'
+            except ValueError:
+                self.typ = 'text'
+                return
+        self.typ = typ
+        self.summe += x * anzahl
+        if self.min_zahl is None or x < self.min_zahl:
+            self.min_zahl = x
+        if self.max_zahl is None or x > self.max_zahl:
+            self.max_zahl = x
+        self.histogramm.add(x, anzahl)
+
+    def ergebnis(self):
+        werte = self.anzahl - self.leer
+        e = {
+            'typ': self.typ or 'leer', 'anzahl': self.anzahl, 'leer': self.leer,
+            'leer_quote': runden(self.leer / self.anzahl) if self.anzahl else 0.0,
+            'distinct_ca': self.distinct.schaetzung() if werte else 0,
+            'top': [[w, c] for w, c in self.topk.top()], 'top_max_fehler': self.topk.abzug,
+        }
+        if self.typ in ('int', 'float'):
+            e.update({'min': runden(self.min_zahl), 'max': runden(self.max_zahl),
+                      'mittel': runden(self.summe / werte), 'histogramm': [[runden(v) for v in b] for b in self.histogramm.ergebnis()]})
+        else:
+            e.update({'min': self.min_text, 'max': self.max_text})
+            if self.typ == 'datum':
+                e['histogramm'] = sorted([m, c] for m, c in self.monate.items())
+        return e
+
+def runden(x):
+    if isinstance(x, float):
+        x = round(x, RUNDEN)
+        return int(x) if x.is_integer() else x
+    return x
+
+def verteilung(werte):
+    werte = sorted(werte)
+    if not werte:
+        return {'anzahl': 0}
+    return {'anzahl': len(werte), 'min': runden(werte[0]), 'p50': runden(perzentil(werte, 50)),
+            'p90': runden(perzentil(werte, 90)), 'max': runden(werte[-1]),
+            'mittel': runden(sum(werte) / len(werte))}
+
+# ==========================================
+# FACHLICHE KENNZAHLEN
+# ==========================================
+# Speicher waechst nur mit den Stammdaten (Kurse, Raeume, Lehrkraefte, Schueler),
+# nicht mit Unterrichtsstunden/Anwesenheiten. Die Tabellen kommen in
+# TABELLEN_REIHENFOLGE, also Kurs vor Kursbelegung/Stundenplan.
+class Kennzahlen:
+    def __init__(self):
+        self.kurs = {} # id -> (kursart, lehrer_id)
+        self.raeume = set()
+        self.deputat = {} # lehrer_id -> deputat_soll
+        self.kursgroesse = defaultdict(int)
+        self.plan_stunden = defaultdict(int) # lehrer_id -> Wochenstunden laut Stundenplan
+        self.raum_slots = defaultdict(int)
+        self.max_stunde = 0
+        self.us_status = defaultdict(int)
+        self.klausuren = 0
+        self.vertretungen = defaultdict(int)
+        self.anw_status = defaultdict(int)
+        self.schueler = defaultdict(lambda: [0, 0]) # schueler_id -> [erfasst, fehlend]
+        self.verspaetung = defaultdict(int) # Minuten -> Anzahl
+
+    def beobachter(self, tabelle, header):
+        """Callback je Block (Liste der Spalten-Tupel) fuer eine Tabelle oder None."""
+        i = {name: idx for idx, name in enumerate(header)}
+        if tabelle == 'Raum':
+            return lambda sp: self.raeume.update(sp[i['id']])
+        if tabelle == 'LehrerDeputation':
+            def lehrer_deputation(sp):
+                for lehrer_id, soll in zip(sp[i['lehrer_id']], sp[i['deputat_soll']]):
+                    self.deputat[lehrer_id] = float(soll or 0)
+            return lehrer_deputation
+        if tabelle == 'Kurs':
+            def kurs(sp):
+                self.kurs.update(zip(sp[i['id']], zip(sp[i['kursart']], sp[i['lehrer_id']])))
+            return kurs
+        if tabelle == 'Kursbelegung':
+            return lambda sp: self.kursgroesse.update(Counter(sp[i['kurs_id']]))
+        if tabelle == 'Stundenplan':
+            def stundenplan(sp):
+                for kurs_id, anzahl in Counter(sp[i['kurs_id']]).items():
+                    kurs = self.kurs.get(kurs_id)
+                    if kurs and kurs[1]:
+                        self.plan_stunden[kurs[1]] += anzahl
+                raeume = Counter(sp[i['raum_id']])
+                raeume.pop('', None)
+                self.raum_slots.update(raeume)
+                self.max_stunde = max(self.max_stunde, max(int(st) for st in set(sp[i['stunde']])))
+            return stundenplan
+        if tabelle == 'Unterrichtsstunde':
+            def unterrichtsstunde(sp):
+                self.us_status.update(Counter(sp[i['status']]))
+                self.klausuren += sp[i['ist_klausur']].count('1')
+                vertretungen = Counter(sp[i['vertretungslehrer_id']])
+                vertretungen.pop('', None)
+                self.vertretungen.update(vertretungen)
+            return unterrichtsstunde
+        if tabelle == 'Anwesenheit':
+            def anwesenheit(sp):
+                for (schueler_id, status), anzahl in Counter(zip(sp[i['schueler_id']], sp[i['status']])).items():
+                    self.anw_status[status] += anzahl
+                    s = self.schueler[schueler_id]
+                    s[0] += anzahl
+                    if status in FEHLEND:
+                        s[1] += anzahl
+                for (status, minuten), anzahl in Counter(zip(sp[i['status']], sp[i['verspaetung_minuten']])).items():
+                    if status == 'verspaetet':
+                        self.verspaetung[int(minuten or 0)] += anzahl
+            return anwesenheit
+        return None
+
+    def ergebnis(self):
+        e = {}
+        erfasst = sum(self.anw_status.values())
+        if erfasst:
+            verspaetet = sum(self.verspaetung.values())
+            e['anwesenheit'] = {
+                'erfasst': erfasst,
+                'status_quote': {s: runden(c / erfasst) for s, c in sorted(self.anw_status.items())},
+                'fehlquote': runden(sum(self.anw_status[s] for s in FEHLEND) / erfasst),
+                'fehlquote_je_schueler': verteilung([f / n for n, f in self.schueler.values()]),
+                'verspaetung_minuten': {
+                    'anzahl': verspaetet,
+                    'mittel': runden(sum(m * c for m, c in self.verspaetung.items()) / verspaetet) if verspaetet else 0,
+                    'verteilung': [[m, c] for m, c in sorted(self.verspaetung.items())],
+                },
+            }
+        stunden = sum(self.us_status.values())
+        if stunden:
+            e['unterricht'] = {
+                'stunden': stunden,
+                'status_quote': {s: runden(c / stunden) for s, c in sorted(self.us_status.items())},
+                'klausurquote': runden(self.klausuren / stunden),
+                'vertretungen_je_lehrkraft': verteilung(list(self.vertretungen.values())),
+            }
+        if self.kurs:
+            nach_art = defaultdict(list)
+            for kurs_id, (kursart, _) in self.kurs.items():
+                nach_art[kursart].append(self.kursgroesse.get(kurs_id, 0))
+            e['kursgroessen'] = {art: verteilung(g) for art, g in sorted(nach_art.items())}
+        if self.deputat or self.plan_stunden:
+            lehrer = set(self.deputat) | set(self.plan_stunden)
+            auslastung = [self.plan_stunden[l] / self.deputat[l] for l in lehrer if self.deputat.get(l)]
+            e['lehrerauslastung'] = {
+                'lehrkraefte': len(lehrer),
+                'wochenstunden': verteilung([self.plan_stunden[l] for l in lehrer]),
+                'anteil_deputat': verteilung(auslastung),
+                'ueber_deputat': sum(1 for a in auslastung if a > 1),
+            }
+        if self.raeume or self.raum_slots:
+            raeume = self.raeume | set(self.raum_slots)
+            slots = 5 * self.max_stunde
+            e['raumauslastung'] = {
+                'raeume': len(raeume), 'slots_pro_woche': slots,
+                'belegung': verteilung([self.raum_slots[r] / slots for r in raeume] if slots else []),
+                'ungenutzt': sum(1 for r in raeume if not self.raum_slots[r]),
+            }
+        return e
+
+# ==========================================
+# PROFILING
+# ==========================================
+def profiliere_datei(pfad, beobachter_fabrik=None, block_zeilen=BLOCK_ZEILEN):
+    """Liest eine CSV genau einmal in Bloecken; Speicher unabhaengig von der Zeilenzahl."""
+    with open(pfad, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f, delimiter=';', quotechar='"')
+        header = next(reader, None)
+        if header is None:
+            return {'zeilen': 0, 'spalten': {}}
+        profile = [Spaltenprofil(name) for name in header]
+        beobachter = beobachter_fabrik(header) if beobachter_fabrik else None
+        zeilen = 0
+        while True:
+            block = list(islice(reader, block_zeilen))
+            if not block:
+                break
+            zeilen += len(block)
+            # Zeilen -> Spalten; kurze Zeilen werden mit '' (NULL) aufgefuellt
+            spalten = list(zip_longest(*block, fillvalue=''))[:len(header)]
+            spalten += [('',) * len(block)] * (len(header) - len(spalten))
+            for profil, spalte in zip(profile, spalten):
+                profil.add_spalte(spalte)
+            if beobachter:
+                beobachter(spalten)
+    return {'zeilen': zeilen, 'spalten': {p.name: p.ergebnis() for p in profile}}
+
+def csv_tabellen(csv_dir):
+    """Alle CSVs im Ordner als {tabelle: dateiname}: bekannte Tabellen in TABELLEN_REIHENFOLGE, dann der Rest."""
+    bekannt = {csv_dateiname(t): t for t in TABELLEN_REIHENFOLGE}
+    dateien = sorted(d for d in os.listdir(csv_dir) if d.endswith('.csv'))
+    tabellen = {t: csv_dateiname(t) for t in TABELLEN_REIHENFOLGE if csv_dateiname(t) in dateien}
+    tabellen.update((d[:-len('.csv')], d) for d in dateien if d not in bekannt)
+    return tabellen
+
+def profiliere(csv_dir=CSV_DIR, tabellen=None):
+    """Profiliert alle CSVs in `csv_dir` oder nur die angegebenen Tabellen."""
+    kennzahlen = Kennzahlen()
+    profil = {'tabellen': {}}
+    dateien = csv_tabellen(csv_dir) if os.path.isdir(csv_dir) else {}
+    if tabellen is not None:
+        dateien = {t: dateien.get(t, csv_dateiname(t)) for t in tabellen}
+    for tabelle, datei in dateien.items():
+        pfad = os.path.join(csv_dir, datei)
+        if not os.path.exists(pfad):
+            print(f"WARNUNG: {pfad} nicht gefunden, uebersprungen.")
+            continue
+        start = time.perf_counter()
+        groesse = os.path.getsize(pfad)
+        ergebnis = profiliere_datei(pfad, lambda header: kennzahlen.beobachter(tabelle, header))
+        dauer = time.perf_counter() - start
+        profil['tabellen'][tabelle] = ergebnis
+        print(f"{tabelle:<18} {ergebnis['zeilen']:>10} Zeilen  {groesse / 1e6:>8.1f} MB  {dauer:>6.2f}s "
+              f"({groesse / 1e6 / max(dauer, 1e-9):.1f} MB/s)")
+    profil['kennzahlen'] = kennzahlen.ergebnis()
+    return profil
+
+def drucke_bericht(profil):
+    k = profil['kennzahlen']
+    print()
+    if 'anwesenheit' in k:
+        a = k['anwesenheit']
+        print(f"Anwesenheit: {a['erfasst']} Eintraege, Fehlquote {a['fehlquote']:.1%} "
+              f"(je Schueler p50 {a['fehlquote_je_schueler']['p50']:.1%}, p90 {a['fehlquote_je_schueler']['p90']:.1%})")
+        v = a['verspaetung_minuten']
+        print(f"  Verspaetungen: {v['anzahl']}, mittel {v['mittel']:.1f} min")
+    if 'unterricht' in k:
+        u = k['unterricht']
+        quoten = ', '.join(f"{s} {q:.1%}" for s, q in u['status_quote'].items())
+        print(f"Unterricht: {u['stunden']} Stunden ({quoten}), Klausuren {u['klausurquote']:.1%}")
+    for art, g in k.get('kursgroessen', {}).items():
+        if g['anzahl']:
+            print(f"Kursgroesse {art:<18} {g['anzahl']:>4} Kurse  min {g['min']:>3}  p50 {g['p50']:>3}  max {g['max']:>3}")
+    if 'lehrerauslastung' in k:
+        l = k['lehrerauslastung']
+        if l['anteil_deputat']['anzahl']:
+            print(f"Lehrkraefte: {l['lehrkraefte']}, Anteil Deputat p50 {l['anteil_deputat']['p50']:.1%}, "
+                  f"max {l['anteil_deputat']['max']:.1%}, ueber Deputat: {l['ueber_deputat']}")
+    if 'raumauslastung' in k:
+        r = k['raumauslastung']
+        if r['belegung']['anzahl']:
+            print(f"Raeume: {r['raeume']}, Belegung mittel {r['belegung']['mittel']:.1%}, "
+                  f"max {r['belegung']['max']:.1%}, ungenutzt: {r['ungenutzt']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Datenprofil: liest jede CSV einmal und schreibt Spalten-Statistiken und Kennzahlen als JSON")
+    parser.add_argument('--csv-dir', default=CSV_DIR)
+    parser.add_argument('--json', default=PROFIL_JSON, help=f"Ausgabedatei (Standard: {PROFIL_JSON})")
+    parser.add_argument('--tabellen', nargs='+', choices=TABELLEN_REIHENFOLGE, metavar='TABELLE',
+                        help="Nur diese Tabellen (Standard: alle CSVs im Ordner)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.csv_dir):
+        print(f"FEHLER: Ordner {args.csv_dir} nicht gefunden.")
+        return
+    tabellen = [t for t in TABELLEN_REIHENFOLGE if t in args.tabellen] if args.tabellen else None
+    profil = profiliere(args.csv_dir, tabellen)
+    drucke_bericht(profil)
+    with open(args.json, 'w', encoding='utf-8') as f:
+        json.dump(profil, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write('\n')
+    print(f"\nProfil gespeichert: {args.json}")
+
+if __name__ == '__main__':
+    main()
@@ -33,7 +33,7 @@ CREATE TABLE Klasse (
     id INT PRIMARY KEY AUTO_INCREMENT,
     schuljahr_id INT NOT NULL,
     jahrgangsstufe ENUM('5', '6', '7', '8', '9', '10') NOT NULL,
-    bezeichnung CHAR(1) NOT NULL, -- 'a', 'b', 'c', 'd'
+    bezeichnung VARCHAR(10) NOT NULL, -- 'a', 'b', 'c', 'd'; mehrere Schulen in einer DB: mit Schulpraefix, z.B. 'S001-a'
     klassenlehrer_id INT NULL,
     FOREIGN KEY (schuljahr_id) REFERENCES Schuljahr(id) ON DELETE CASCADE,
     FOREIGN KEY (klassenlehrer_id) REFERENCES Lehrer(id) ON DELETE SET NULL,
@@ -2,8 +2,20 @@ import random
 import csv
 import os
 import math
+import time
+import pickle
+import shutil
+import inspect
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import date, timedelta
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+
+import lehrer_zuweisung
+import sek_ii_belegung
+import partitionierung
+from schulalltag import ANWESENHEIT_STATUS_GEWICHTE, VERSPAETUNG_MINUTEN
 
 # ==========================================
 # KONFIGURATION
@@ -46,6 +58,50 @@ VERWANDTE_FAECHER = {
 WOCHENTAGE = ['Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag']
 SEK_I_STUNDEN = 6 # 1. bis 6. Stunde jeden Tag (1-6)
 
+SIM_START = date(2026, 8, 3) # Montag, erster simulierter Schultag
+SIM_TAGE = 26 # Kalendertage, die beim Generieren ausgerollt werden
+
+# Gewichte fuer das Ausrollen von Unterrichtsstunden; Anwesenheits-Status und
+# Verspaetungen kommen aus schulalltag.py (teilt sich der Generator mit dem Lasttest)
+UNTERRICHT_STATUS_GEWICHTE = {'gehalten': 0.92, 'entfallen': 0.04, 'vertretung': 0.04}
+KLAUSUR_QUOTE = 0.02
+
+# Sek II Schienen: Slots (wochentag_idx, stunde), 0-8 fuer GKs, 9-10 fuer LKs
+SEK_II_SCHIENEN = [
+    [(0,1),(0,2),(3,3)], [(0,3),(0,4),(3,4)], [(0,5),(0,6),(3,5)],
+    [(1,1),(1,2),(4,1)], [(1,3),(1,4),(4,2)], [(1,5),(1,6),(4,3)],
+    [(2,1),(2,2),(4,4)], [(2,3),(2,4),(4,5)], [(2,5),(2,6),(4,6)],
+    [(0,8),(0,9),(2,8),(2,9),(4,8)], 
+    [(1,8),(1,9),(3,8),(3,9),(4,7)]
+]
+
+CACHE_DIR = '.generator_cache' # Stufen-Cache (--cache)
+
+BASIS_DIR = 'db_DigitalesKlassenbuch'
+BEZIRK_DIR = 'db_DigitalesKlassenbuch_bezirk' # Standard-Ausgabe im Multi-Schul-Modus
+
+# Multi-Schul-Modus: jede Schule bekommt pro Tabelle einen eigenen, disjunkten
+# id-Bereich (Schule n -> ids n*Groesse+1 .. (n+1)*Groesse). So koennen die
+# Worker unabhaengig zaehlen und die Ergebnisse kollisionsfrei zusammengefuehrt
+# werden. Die Groessen reichen fuer eine Schule dieser Konfiguration mit
+# reichlich Puffer; INT (2^31) erlaubt damit gut 200 Schulen.
+ID_BEREICHE = {
+    'Klasse': 1_000,
+    'Raum': 1_000,
+    'Lehrer': 10_000,
+    'Kurs': 10_000,
+    'Stundenplan': 100_000,
+    'Schueler': 100_000,
+    'Unterrichtsstunde': 1_000_000,
+    'Anwesenheit': 10_000_000,
+}
+
+# Tabellen, die fuer alle Schulen identisch sind (beim Zusammenfuehren nur einmal)
+GEMEINSAME_TABELLEN = ['schuljahr.csv', 'wochentag.csv', 'abschnitt.csv', 'fach.csv']
+
+UNTERRICHTSSTUNDE_HEADERS = ['id', 'stundenplan_id', 'datum', 'status', 'thema', 'hausaufgaben', 'vertretungslehrer_id', 'tatsaechlicher_raum_id', 'tatsaechliche_stunde', 'ist_klausur', 'notiz']
+ANWESENHEIT_HEADERS = ['id', 'unterrichtsstunde_id', 'schueler_id', 'status', 'verspaetung_minuten', 'entschuldigungsstatus', 'anmerkung']
+
 # ==========================================
 # HILFSFUNKTIONEN
 # ==========================================
@@ -87,6 +143,19 @@ def export_csv(out_dir, filename, headers, data):
         writer.writerows(data)
     print(f"Erstellt: {filepath} ({len(data)} Zeilen)")
 
+def id_basis(schul_nr):
+    """Offset (letzte "belegte" id) pro Tabelle fuer die Schule `schul_nr`."""
+    return {tabelle: (schul_nr or 0) * groesse for tabelle, groesse in ID_BEREICHE.items()}
+
+def schul_praefix(schul_nr):
+    return '' if schul_nr is None else f'S{schul_nr + 1:03d}-'
+
+def pruefe_id_bereiche(anzahlen):
+    for tabelle, anzahl in anzahlen.items():
+        if anzahl > ID_BEREICHE[tabelle]:
+            raise ValueError(f"id-Bereich fuer {tabelle} ueberlaufen ({anzahl} > "
+                             f"{ID_BEREICHE[tabelle]}). ID_BEREICHE vergroessern.")
+
 def pick_slots(freie_slots, target_std):
     blocks = []
     singles = []
@@ -170,35 +239,74 @@ def pick_slots(freie_slots, target_std):
             
     return picked
 
+def simuliere_schultag(curr_date, sp_by_wt, kursbelegung_dict, lehrer_ids, us_id_counter, anw_id_counter,
+                       unterrichtsstunde_data, anwesenheit_data):
+    """Rollt alle Stundenplan-Eintraege eines Tages zu Unterrichtsstunden + Anwesenheiten aus.
+
+    Haengt die Zeilen an die uebergebenen Listen an und gibt die naechsten
+    freien ids (Unterrichtsstunde, Anwesenheit) zurueck.
+    """
+    wt_id = curr_date.weekday() + 1
+    for sp in sp_by_wt[wt_id]:
+        sp_id, k_id = sp[0], sp[1]
+        status = random.choices(list(UNTERRICHT_STATUS_GEWICHTE), weights=list(UNTERRICHT_STATUS_GEWICHTE.values()))[0]
+        v_id = random.choice(lehrer_ids) if status == 'vertretung' else ''
+        ist_kl = 1 if random.random() < KLAUSUR_QUOTE else 0
+        
+        unterrichtsstunde_data.append([us_id_counter, sp_id, curr_date, status, '', '', v_id, '', '', ist_kl, ''])
+        
+        if status in ['gehalten', 'vertretung']:
+            for sid in kursbelegung_dict[k_id]:
+                ast = random.choices(list(ANWESENHEIT_STATUS_GEWICHTE), weights=list(ANWESENHEIT_STATUS_GEWICHTE.values()))[0]
+                v_min = random.randint(*VERSPAETUNG_MINUTEN) if ast == 'verspaetet' else 0
+                anwesenheit_data.append([anw_id_counter, us_id_counter, sid, ast, v_min, '', ''])
+                anw_id_counter += 1
+        us_id_counter += 1
+    return us_id_counter, anw_id_counter
+
+def partition_fuer_datum(datum, grenzen):
+    """Partitionsname fuer ein Datum; `grenzen` kommt aus partitionierung.partitionen()."""
+    for name, von, bis in grenzen:
+        if von is None or von <= datum < bis:
+            return name
+
+def teile_in_partitionen(unterrichtsstunde_data, anwesenheit_data, grenzen):
+    """Verteilt die Zeilen auf Partitionen; Anwesenheit bekommt dabei das Datum ihrer Stunde als letzte Spalte."""
+    us_shards, anw_shards, us_datum = defaultdict(list), defaultdict(list), {}
+    for row in unterrichtsstunde_data:
+        us_datum[row[0]] = row[2]
+        us_shards[partition_fuer_datum(row[2], grenzen)].append(row)
+    for row in anwesenheit_data:
+        datum = us_datum[row[1]]
+        anw_shards[partition_fuer_datum(datum, grenzen)].append(row + [datum])
+    return us_shards, anw_shards
+
 # ==========================================
-# HAUPTSKRIPT (SCHEDULE FIRST)
+# PIPELINE-STUFEN (SCHEDULE FIRST)
 # ==========================================
-def main():
-    out_dir = 'db_DigitalesKlassenbuch'
-    os.makedirs(out_dir, exist_ok=True)
-    v_m, v_w, nachnamen_list = load_names_from_files(out_dir)
-    if not v_m: v_m = ['Thomas', 'Michael']; v_w = ['Sabine', 'Susanne']; nachnamen_list = ['Müller', 'Schmidt']
+# Jede Stufe bekommt die Ausgaben ihrer Vorgaenger (`inp`, Name -> dict) und
+# den Schul-Kontext (`ctx`: ids, praefix, namen_dir) und liefert ein eigenes
+# dict zurueck. Stufen veraendern ihre Eingaben nicht, damit jede Stufe
+# einzeln aus dem Cache kommen kann (siehe STUFEN / run_pipeline).
 
-    fach_to_id = {k: i for i, (k, _, _) in enumerate(FAECHER, 1)}
-    
-    raum_dict = {r: i for i, r in enumerate(RAEUME, 1)}
-    raeume_sp = [r for r in RAEUME if r.startswith('SpH')]
-    raeume_if = [r for r in RAEUME if r.startswith('IF')]
-    raeume_nw = [r for r in RAEUME if r.startswith('NW')]
-    raeume_allg = [r for r in RAEUME if r.startswith('R')] + ['Aula']
+def stufe_namen(inp, ctx):
+    v_m, v_w, nachnamen_list = load_names_from_files(ctx['namen_dir'])
+    if not v_m: v_m = ['Thomas', 'Michael']; v_w = ['Sabine', 'Susanne']; nachnamen_list = ['Müller', 'Schmidt']
+    return {'v_m': v_m, 'v_w': v_w, 'nachnamen': nachnamen_list}
 
+def stufe_kurse(inp, ctx):
     # --- 1. GLOBALE RASTER & OBJEKTE ---
     kurs_objekte = [] # dicts mit allem, was wir haben
-    
+
     # --- 2. SEK I GENERIERUNG UND BLOCKUNG ---
     # Jede Klasse bekommt ein 30-Slot Grid (5 Tage x 6 Stunden)
     # Slot = (wochentag_idx 0-4, stunde 1-6)
     sek_i_klassen_kurse = [('D',4), ('M',4), ('E',4), ('BI',2), ('PH',2), ('KU',2), ('MU',2), ('GE',2), ('EK',2), ('SP',3), ('IF',1)]
     # Summe oben = 28. Bleiben 2 fuer Reli = 30 perfekt. (WP in Jg 7-10 klauen wir Stunden von Nebenfächern, aber wir machen es vereinfacht)
-    
+
     klasse_bez_to_id = {}
-    klasse_id_counter = 1
-    
+    klasse_id_counter = ctx['ids']['Klasse'] + 1
+
     # Klassen-Definition
     for jg, klassen in KLASSEN_SEK_I.items():
         for bez, anzahl in klassen.items():
@@ -211,14 +319,14 @@ def main():
         band_reli = [(2, 3), (2, 4)] # Mi 3,4 (Block 2)
         band_wp = [(3, 8), (3, 9), (4, 1)] # Do 8,9 (Block 4) + Fr 1
         band_kumu = [(1, 1), (1, 2)] # Di 1,2 (Block 1) für KU/MU in Jg 9, 10
-        
+
         # Reli Kurse generieren
         jg_reli_kurse = []
         for rel_fach in ['ER', 'KR', 'PL']:
             c = {'fach': rel_fach, 'stunden': 2, 'jg': jg, 'art': 'Religion/Ethik', 'bez': f'{jg}-{rel_fach}', 'slots': band_reli.copy(), 'is_seki': True}
             kurs_objekte.append(c)
             jg_reli_kurse.append(c)
-            
+
         # WP Kurse (Jg 7-10)
         jg_wp_kurse = []
         if int(jg) >= 7:
@@ -226,7 +334,7 @@ def main():
                 c = {'fach': wp_fach, 'stunden': 3, 'jg': jg, 'art': 'Wahlpflicht', 'bez': f'{jg}-WP-{wp_fach}', 'slots': band_wp.copy(), 'is_seki': True}
                 kurs_objekte.append(c)
                 jg_wp_kurse.append(c)
-                
+
         # KU/MU Kurse (Jg 9-10)
         jg_kumu_kurse = []
         if int(jg) >= 9:
@@ -234,7 +342,7 @@ def main():
                 c = {'fach': kumu_fach, 'stunden': 2, 'jg': jg, 'art': 'Wahlpflicht', 'bez': f'{jg}-{kumu_fach}-Band', 'slots': band_kumu.copy(), 'is_seki': True}
                 kurs_objekte.append(c)
                 jg_kumu_kurse.append(c)
-                
+
         # B) Klassen intern abarbeiten
         for bez, anzahl in klassen.items():
             kl_id = klasse_bez_to_id[f'{jg}{bez}']
@@ -246,19 +354,19 @@ def main():
                  local_faecher = [('D',4), ('M',4), ('E',4), ('BI',2), ('PH',2), ('KU',2), ('MU',1), ('GE',2), ('EK',2), ('SP',2)]
             else:
                  local_faecher = [('D',4), ('M',4), ('E',4), ('BI',2), ('PH',2), ('KU',2), ('MU',2), ('GE',2), ('EK',2), ('SP',3), ('IF',1)]
-            
+
             # 1. Berechne Gesamtstunden dieser Klasse
             total_std = sum(std for f, std in local_faecher)
             total_std += 2 # Reli
             if int(jg) >= 7: total_std += 3 # WP
             if int(jg) >= 9: total_std += 2 # KU/MU
-            
+
             # 2. Erstelle exakt passende freie Slots
             freie_slots = []
             for wt in range(5):
                 for st in range(1, 7): # Basis: 1-6
                     freie_slots.append((wt, st))
-                    
+
             hours_to_add = total_std - 30
             wt_to_extend = 0
             while hours_to_add > 0:
@@ -270,7 +378,7 @@ def main():
                     freie_slots.append((wt_to_extend, 7))
                     hours_to_add -= 1
                 wt_to_extend = (wt_to_extend + 1) % 5
-                
+
             # Reservierte Bänder entfernen
             for s in band_reli:
                 if s in freie_slots: freie_slots.remove(s)
@@ -280,10 +388,10 @@ def main():
             if int(jg) >= 9:
                 for s in band_kumu:
                     if s in freie_slots: freie_slots.remove(s)
-            
+
             # Wichtig: Nach Stunden sortieren (große zuerst), damit wir die Doppelstunden gut legen können
             local_faecher = sorted(local_faecher, key=lambda x: -x[1])
-            
+
             for fach, std in local_faecher:
                 c = {'fach': fach, 'stunden': std, 'jg': jg, 'klasse': bez, 'art': 'Klassenunterricht', 'bez': f'{jg}{bez}-{fach}', 'slots': [], 'is_seki': True}
                 picked = pick_slots(freie_slots, std)
@@ -293,128 +401,106 @@ def main():
 
     # --- 3. SEK II GENERIERUNG (Schienen-Modell) ---
     sek_ii_stunden = {'GK': 3, 'LK': 5}
-    sek_ii_schienen = [
-        [(0,1),(0,2),(3,3)], [(0,3),(0,4),(3,4)], [(0,5),(0,6),(3,5)],
-        [(1,1),(1,2),(4,1)], [(1,3),(1,4),(4,2)], [(1,5),(1,6),(4,3)],
-        [(2,1),(2,2),(4,4)], [(2,3),(2,4),(4,5)], [(2,5),(2,6),(4,6)],
-        [(0,8),(0,9),(2,8),(2,9),(4,8)], 
-        [(1,8),(1,9),(3,8),(3,9),(4,7)]
-    ]
-    
+
+    gk_faecher = ['D', 'M', 'E', 'SP', 'BI', 'GE', 'KU', 'SW', 'PH', 'CH', 'ER', 'PL']
+    lk_faecher = ['D', 'M', 'E', 'BI', 'GE']
+
     for jg, anzahl in STUFEN_SEK_II.items():
-        anzahl_gk = math.ceil(anzahl / 22)
         anzahl_lk = math.ceil(anzahl / 15) if jg != 'EF' else 0
-        
+
+        # Erwartete GK-Nachfrage: Pflichtfaecher belegt jeder, der sie nicht als LK hat;
+        # die uebrigen GK-Plaetze teilen sich die Wahlfaecher (LK-Faecher anteilig weniger).
+        lk_anteil = sek_ii_belegung.LK_ANZAHL / len(lk_faecher) if jg != 'EF' else 0
+        gk_anteil = {f: 1 - lk_anteil if f in lk_faecher else 1 for f in gk_faecher}
+        nachfrage = {f: anzahl * gk_anteil[f] for f in gk_faecher if f in sek_ii_belegung.PFLICHTFAECHER}
+        wahlfaecher = [f for f in gk_faecher if f not in nachfrage]
+        frei = anzahl * sek_ii_belegung.GK_ANZAHL - sum(nachfrage.values())
+        for f in wahlfaecher:
+            nachfrage[f] = frei * gk_anteil[f] / sum(gk_anteil[w] for w in wahlfaecher)
+
         # Ordne Fächer auf Schienen (vereinfacht: reihum)
         schiene_gk_idx = 0
         schiene_lk_idx = 9 # LK Schienen fangen später an
-        
-        for fach in ['D', 'M', 'E', 'SP', 'BI', 'GE', 'KU', 'SW', 'PH', 'CH', 'ER', 'PL']:
-            num_gks = anzahl_gk if fach in ['D','M','E','SP'] else max(1, anzahl_gk // 2)
+
+        for fach in gk_faecher:
+            num_gks = max(1, math.ceil(nachfrage[fach] / 22))
             for i in range(num_gks):
-                c = {'fach': fach, 'stunden': sek_ii_stunden['GK'], 'jg': jg, 'art': 'GK', 'bez': f'{jg}-{fach}-GK{i+1}', 'slots': sek_ii_schienen[schiene_gk_idx].copy(), 'is_seki': False}
+                c = {'fach': fach, 'stunden': sek_ii_stunden['GK'], 'jg': jg, 'art': 'GK', 'bez': f'{jg}-{fach}-GK{i+1}', 'slots': SEK_II_SCHIENEN[schiene_gk_idx].copy(), 'schiene': schiene_gk_idx, 'is_seki': False}
                 kurs_objekte.append(c)
                 schiene_gk_idx = (schiene_gk_idx + 1) % 9
-                
-            if jg != 'EF' and fach in ['D', 'M', 'E', 'BI', 'GE']:
+
+            if jg != 'EF' and fach in lk_faecher:
                 for i in range(anzahl_lk):
-                    c = {'fach': fach, 'stunden': sek_ii_stunden['LK'], 'jg': jg, 'art': 'LK', 'bez': f'{jg}-{fach}-LK{i+1}', 'slots': sek_ii_schienen[schiene_lk_idx].copy(), 'is_seki': False}
+                    c = {'fach': fach, 'stunden': sek_ii_stunden['LK'], 'jg': jg, 'art': 'LK', 'bez': f'{jg}-{fach}-LK{i+1}', 'slots': SEK_II_SCHIENEN[schiene_lk_idx].copy(), 'schiene': schiene_lk_idx, 'is_seki': False}
                     kurs_objekte.append(c)
                     schiene_lk_idx = 9 if schiene_lk_idx == 10 else 10
 
+    return {'kurse': kurs_objekte, 'klassen': klasse_bez_to_id}
 
+def stufe_lehrer(inp, ctx):
+    # --- 5. LEHRER GENERIEREN (Bin-Packing, siehe lehrer_zuweisung.py) ---
+    kurs_objekte = inp['kurse']['kurse']
+    v_m, v_w, nachnamen_list = inp['namen']['v_m'], inp['namen']['v_w'], inp['namen']['nachnamen']
+    praefix = ctx['praefix']
+    fach_to_id = {k: i for i, (k, _, _) in enumerate(FAECHER, 1)}
 
-    # --- 5. LEHRER GENERIEREN (Fitting Algorithm) ---
-    lehrkraefte = [] # id, faecher, kuerzel, slots
-    lehrer_id_counter = 1
-    unversorgte_kurse = kurs_objekte.copy()
-    used_kuerzel = set()
+    zuweisung, kurs_lehrer_idx, statistik = lehrer_zuweisung.weise_lehrer_zu(kurs_objekte, VERWANDTE_FAECHER)
 
-    while unversorgte_kurse:
-        # Finde faecher, die am meisten gebraucht werden
-        fach_count = defaultdict(int)
-        for c in unversorgte_kurse: fach_count[c['fach']] += 1
-        hauptfach = max(fach_count.items(), key=lambda x: x[1])[0]
-        
-        faecher = [hauptfach]
-        if hauptfach in VERWANDTE_FAECHER and random.random() < 0.7: faecher.append(random.choice(VERWANDTE_FAECHER[hauptfach]))
-        else: faecher.append(random.choice(list(fach_count.keys())))
-        
-        # Lehrer anlegen
+    lehrkraefte = [] # id, faecher, kuerzel, deputat
+    used_kuerzel = set()
+    for l_idx, z in enumerate(zuweisung):
         is_male = random.choice([True, False])
         vorname = random.choice(v_m if is_male else v_w)
         nachname = random.choice(nachnamen_list)
-        l_dict = {
-            'id': lehrer_id_counter, 'kuerzel': generate_kuerzel(vorname, nachname, used_kuerzel),
+        lehrkraefte.append({
+            'id': ctx['ids']['Lehrer'] + 1 + l_idx, 'kuerzel': generate_kuerzel(vorname, nachname, used_kuerzel),
             'vorname': vorname, 'nachname': nachname, 'geb': random_date(1960, 1995),
-            'faecher': set(faecher), 'slots': set(), 'zugewiesen_stunden': 0
-        }
-        
-        # Kurse aufladen bis max 26 h
-        kurse_fuer_diesen_lehrer = []
-        
-        # Pass 1: Genau die beiden Faecher
-        for c in unversorgte_kurse:
-            if c['fach'] in l_dict['faecher']:
-                kollision = any(s in l_dict['slots'] for s in c['slots'])
-                if not kollision and l_dict['zugewiesen_stunden'] + c['stunden'] <= 26:
-                    kurse_fuer_diesen_lehrer.append(c)
-                    l_dict['zugewiesen_stunden'] += c['stunden']
-                    l_dict['slots'].update(c['slots'])
-                    
-        # Pass 2: Wenn der Lehrer stark unterbelegt ist (unter 15 Stunden), darf er fachfremd aushelfen
-        if l_dict['zugewiesen_stunden'] < 15:
-            for c in unversorgte_kurse:
-                if c not in kurse_fuer_diesen_lehrer:
-                    kollision = any(s in l_dict['slots'] for s in c['slots'])
-                    if not kollision and l_dict['zugewiesen_stunden'] + c['stunden'] <= 26:
-                        kurse_fuer_diesen_lehrer.append(c)
-                        l_dict['zugewiesen_stunden'] += c['stunden']
-                        l_dict['slots'].update(c['slots'])
-                        l_dict['faecher'].add(c['fach']) # Fach offiziell hinzufügen
-                        if l_dict['zugewiesen_stunden'] >= 20:
-                            break
-
-        # Zuweisung eintragen und von Todos loeschen
-        for c in kurse_fuer_diesen_lehrer:
-            c['lehrer_id'] = l_dict['id']
-            unversorgte_kurse.remove(c)
-            
-        lehrkraefte.append(l_dict)
-        lehrer_id_counter += 1
+            'faecher': set(z['faecher']), 'deputat_soll': z['deputat_soll'], 'zugewiesen_stunden': z['stunden']
+        })
+    kurs_lehrer = [lehrkraefte[l_idx]['id'] for l_idx in kurs_lehrer_idx]
 
     # --- 6. DATEN UMGIESSEN & CSV OBJEKTE ERSTELLEN ---
     lehrer_data = []
     lehrer_deputation_data = []
     lehrbefaehigung_data = []
     for l in lehrkraefte:
-        lehrer_data.append([l['id'], l['kuerzel'], l['vorname'], l['nachname'], l['geb'], 1])
-        soll = max(l['zugewiesen_stunden'], 13) # Unterstes legales Limit simulieren
-        umfang = round((soll / 25.5) * 100, 2)
+        lehrer_data.append([l['id'], praefix + l['kuerzel'], l['vorname'], l['nachname'], l['geb'], 1])
+        soll = l['deputat_soll']
+        umfang = round((soll / lehrer_zuweisung.VOLLZEIT_DEPUTAT) * 100, 2)
         lehrer_deputation_data.append([l['id'], l['id'], 1, soll, 0, 0, l['zugewiesen_stunden'], umfang, ''])
-        for fach in l['faecher']:
+        for fach in sorted(l['faecher']): # sortiert -> reproduzierbar trotz Hash-Randomisierung
             lehrbefaehigung_data.append([l['id'], fach_to_id[fach]])
 
     klasse_data = []
-    for bez, kid in klasse_bez_to_id.items():
+    for bez, kid in inp['kurse']['klassen'].items():
         jg = bez[:-1] if len(bez) == 2 else bez[:-1] # 5a -> 5, 10a -> 10
         klasse = bez[-1]
         moegliche_kl = [l['id'] for l in lehrkraefte if 'D' in l['faecher'] or 'M' in l['faecher'] or 'E' in l['faecher']]
         kl_id = random.choice(moegliche_kl) if moegliche_kl else lehrkraefte[0]['id']
-        klasse_data.append([kid, 1, jg, klasse, kl_id])
+        klasse_data.append([kid, 1, jg, praefix + klasse, kl_id])
+
+    return {
+        'lehrer_ids': [l['id'] for l in lehrkraefte], 'kurs_lehrer': kurs_lehrer, 'statistik': statistik,
+        'lehrer_data': lehrer_data, 'lehrer_deputation_data': lehrer_deputation_data,
+        'lehrbefaehigung_data': lehrbefaehigung_data, 'klasse_data': klasse_data,
+    }
 
+def stufe_raeume(inp, ctx):
     # --- RAUMZUWEISUNG (Kollisionsfrei) ---
-    raum_dict = {name: i for i, name in enumerate(RAEUME, 1)}
+    kurs_objekte = inp['kurse']['kurse']
+    raum_dict = {name: i for i, name in enumerate(RAEUME, ctx['ids']['Raum'] + 1)}
     raum_belegung = defaultdict(set) # r_id -> set of (wt_idx, st)
-    
-    def assign_room(c, possible_rooms):
+    kurs_raum = [None] * len(kurs_objekte) # Kurs-Index -> r_id
+
+    def assign_room(k_idx, possible_rooms):
+        c = kurs_objekte[k_idx]
         for r_name in possible_rooms:
             r_id = raum_dict[r_name]
             # Prüfen ob Raum in allen benötigten Slots frei ist
             if all((wt, st) not in raum_belegung[r_id] for (wt, st) in c['slots']):
                 for (wt, st) in c['slots']:
                     raum_belegung[r_id].add((wt, st))
-                c['raum_id'] = r_id
+                kurs_raum[k_idx] = r_id
                 return True
         return False
 
@@ -426,55 +512,72 @@ def main():
         'IF': [f'Computerraum {i}' for i in range(1, 4)],
         'SP': [f'Turnhalle {i}' for i in range(1, 4)]
     }
-    for c in kurs_objekte:
+    for k_idx, c in enumerate(kurs_objekte):
         if c['fach'] in fachraum_map:
-            assigned = assign_room(c, fachraum_map[c['fach']])
+            assigned = assign_room(k_idx, fachraum_map[c['fach']])
             if not assigned:
                 # Fallback auf generische Kursräume wenn Fachräume voll
-                assign_room(c, [f'Kursraum {i}' for i in range(1, 21)])
+                assign_room(k_idx, [f'Kursraum {i}' for i in range(1, 21)])
 
     # 2. Klassenräume (für klassengebundene Kurse, die keine Fachräume sind)
-    for c in kurs_objekte:
-        if 'raum_id' not in c and c.get('is_seki') and c.get('klasse'):
+    for k_idx, c in enumerate(kurs_objekte):
+        if kurs_raum[k_idx] is None and c.get('is_seki') and c.get('klasse'):
             # Eigener Klassenraum
             my_room = f"R-{c['jg']}{c['klasse']}"
-            assigned = assign_room(c, [my_room])
+            assigned = assign_room(k_idx, [my_room])
             if not assigned:
-                assign_room(c, [f'Kursraum {i}' for i in range(1, 21)])
+                assign_room(k_idx, [f'Kursraum {i}' for i in range(1, 21)])
 
     # 3. Rest (Kurse der Sek II, WP, Reli-Bänder etc.)
     generic_rooms = [f'Kursraum {i}' for i in range(1, 21)] + [f'R-{jg}{bez}' for jg, klassen in KLASSEN_SEK_I.items() for bez in klassen]
-    for c in kurs_objekte:
-        if 'raum_id' not in c:
-            assign_room(c, generic_rooms)
+    for k_idx in range(len(kurs_objekte)):
+        if kurs_raum[k_idx] is None:
+            assign_room(k_idx, generic_rooms)
+
+    raum_data = [[i, ctx['praefix'] + r] for r, i in raum_dict.items()]
+    return {'kurs_raum': kurs_raum, 'raum_data': raum_data}
+
+def stufe_stundenplan(inp, ctx):
+    kurs_objekte = inp['kurse']['kurse']
+    klasse_bez_to_id = inp['kurse']['klassen']
+    kurs_lehrer = inp['lehrer']['kurs_lehrer']
+    kurs_raum = inp['raeume']['kurs_raum']
+    fach_to_id = {k: i for i, (k, _, _) in enumerate(FAECHER, 1)}
 
     kurs_data = []
     stundenplan_data = []
-    kurs_id_counter = 1
-    sp_id_counter = 1
-    
-    for c in kurs_objekte:
+    kurs_id_counter = ctx['ids']['Kurs'] + 1
+    sp_id_counter = ctx['ids']['Stundenplan'] + 1
+
+    for k_idx, c in enumerate(kurs_objekte):
         kid = klasse_bez_to_id.get(f"{c['jg']}{c.get('klasse')}", '')
         # id, schuljahr, abschnitt, bez, fach, lehrer, jg, kl_id, kursart, wochenstd, parallel
-        kurs_row = [kurs_id_counter, 1, '', c['bez'], fach_to_id[c['fach']], c['lehrer_id'], c['jg'], kid, c['art'], c['stunden'], '']
+        kurs_row = [kurs_id_counter, 1, '', ctx['praefix'] + c['bez'], fach_to_id[c['fach']], kurs_lehrer[k_idx], c['jg'], kid, c['art'], c['stunden'], '']
         kurs_data.append(kurs_row)
-        c['id'] = kurs_id_counter
-        
+
         # Stundenplan Slots erstellen
         for (wt_idx, st) in c['slots']:
             # Wenn ein Kurs absolut keinen Raum gefunden haben sollte (extremst unwahrscheinlich bei so vielen Räumen), r_id = NULL
-            r_id = c.get('raum_id', '') 
+            r_id = kurs_raum[k_idx] or ''
             stundenplan_data.append([sp_id_counter, kurs_id_counter, 1, r_id, wt_idx + 1, st, '2026-08-01', ''])
             sp_id_counter += 1
-            
+
         kurs_id_counter += 1
 
+    return {'kurs_data': kurs_data, 'stundenplan_data': stundenplan_data}
+
+def stufe_belegung(inp, ctx):
     # --- 7. SCHUELER BELEGUNGEN ---
+    # Kurs-ids ergeben sich aus der Reihenfolge der Kurs-Objekte (siehe stufe_stundenplan)
+    kurs_objekte = [dict(c, id=ctx['ids']['Kurs'] + 1 + k_idx) for k_idx, c in enumerate(inp['kurse']['kurse'])]
+    klasse_bez_to_id = inp['kurse']['klassen']
+    v_m, v_w, nachnamen_list = inp['namen']['v_m'], inp['namen']['v_w'], inp['namen']['nachnamen']
+
     schueler_data = []
     schueler_status_data = []
     kursbelegung_data = []
-    schueler_id_counter = 1
-    
+    schueler_id_counter = ctx['ids']['Schueler'] + 1
+
     kursbelegung_dict = defaultdict(list) # fuer Anwesenheit (kurs_id -> [schueler_ids])
 
     # Helper: Kurse finden
@@ -492,29 +595,29 @@ def main():
             reli_k = [x for x in kurse_by_jg[jg] if x['art'] == 'Religion/Ethik']
             wp_k = [x for x in kurse_by_jg[jg] if x['art'] == 'Wahlpflicht' and x['fach'] not in ['KU', 'MU']]
             kumu_k = [x for x in kurse_by_jg[jg] if x['art'] == 'Wahlpflicht' and x['fach'] in ['KU', 'MU']]
-            
+
             for _ in range(anzahl):
                 ism = random.choice([True, False])
                 schueler_data.append([schueler_id_counter, random.choice(v_m if ism else v_w), random.choice(nachnamen_list), random_date(base_y, base_y+1), 1])
                 schueler_status_data.append([schueler_id_counter, schueler_id_counter, 1, jg, kl_id, 'normal'])
-                
+
                 # Alle Klassenkurse belegen
-                for c in k_kurse: 
+                for c in k_kurse:
                     kursbelegung_data.append([schueler_id_counter, c['id']])
                     kursbelegung_dict[c['id']].append(schueler_id_counter)
-                
+
                 # 1 Reli Kurs belegen
-                if reli_k: 
+                if reli_k:
                     wc = random.choice(reli_k)
                     kursbelegung_data.append([schueler_id_counter, wc['id']])
                     kursbelegung_dict[wc['id']].append(schueler_id_counter)
-                    
+
                 # 1 WP Kurs belegen
                 if wp_k:
                     wc = random.choice(wp_k)
                     kursbelegung_data.append([schueler_id_counter, wc['id']])
                     kursbelegung_dict[wc['id']].append(schueler_id_counter)
-                    
+
                 # 1 KU/MU Kurs belegen (Jg 9-10)
                 if kumu_k:
                     wc = random.choice(kumu_k)
@@ -523,61 +626,171 @@ def main():
 
                 schueler_id_counter += 1
 
+    # Sek II: schienenkonflikt-freie, groessenbalancierte Kurswahl (siehe sek_ii_belegung.py)
+    sek_ii_statistik = {}
     for jg, anzahl in STUFEN_SEK_II.items():
         base_y = 2026 - {'EF':10, 'Q1':11, 'Q2':12}[jg] - 6
-        jg_gks = [c for c in kurse_by_jg[jg] if c['art'] == 'GK']
-        jg_lks = [c for c in kurse_by_jg[jg] if c['art'] == 'LK']
-        
+        jg_kurse = kurse_by_jg[jg]
+        jg_schueler = []
+
         for _ in range(anzahl):
             ism = random.choice([True, False])
             schueler_data.append([schueler_id_counter, random.choice(v_m if ism else v_w), random.choice(nachnamen_list), random_date(base_y, base_y+1), 1])
             schueler_status_data.append([schueler_id_counter, schueler_id_counter, 1, jg, '', 'normal'])
-            
-            # 2 LKs
-            if jg != 'EF' and len(jg_lks) >= 2:
-                for c in random.sample(jg_lks, 2): 
-                    kursbelegung_data.append([schueler_id_counter, c['id']])
-                    kursbelegung_dict[c['id']].append(schueler_id_counter)
-            
-            # 8 GKs
-            if len(jg_gks) >= 8:
-                for c in random.sample(jg_gks, 8):
-                    kursbelegung_data.append([schueler_id_counter, c['id']])
-                    kursbelegung_dict[c['id']].append(schueler_id_counter)
-            
+            jg_schueler.append(schueler_id_counter)
             schueler_id_counter += 1
 
+        # 2 LKs (nicht in der EF) + 8 GKs, hoechstens ein Kurs pro Schiene
+        belegung, statistik = sek_ii_belegung.belege_jahrgang(
+            jg_schueler, jg_kurse, lk_anzahl=0 if jg == 'EF' else sek_ii_belegung.LK_ANZAHL)
+        sek_ii_statistik[jg] = statistik
+        for c, kurs_schueler in zip(jg_kurse, belegung):
+            for s_id in kurs_schueler:
+                kursbelegung_data.append([s_id, c['id']])
+            kursbelegung_dict[c['id']].extend(kurs_schueler)
+
+    return {
+        'schueler_data': schueler_data, 'schueler_status_data': schueler_status_data,
+        'kursbelegung_data': kursbelegung_data, 'kursbelegung_dict': dict(kursbelegung_dict),
+        'sek_ii_statistik': sek_ii_statistik,
+    }
+
+def stufe_anwesenheit(inp, ctx):
     # --- 8. AUSROLLEN: UNTERRICHTSSTUNDE & ANWESENHEIT ---
     unterrichtsstunde_data = []
     anwesenheit_data = []
-    us_id_counter = 1
-    anw_id_counter = 1
-    
-    sim_start = date(2026, 8, 3) # Montag
+    us_id_counter = ctx['ids']['Unterrichtsstunde'] + 1
+    anw_id_counter = ctx['ids']['Anwesenheit'] + 1
+
     sp_by_wt = defaultdict(list)
-    for sp in stundenplan_data: sp_by_wt[sp[4]].append(sp)
-        
-    for day_offset in range(26):
-        curr_date = sim_start + timedelta(days=day_offset)
+    for sp in inp['stundenplan']['stundenplan_data']: sp_by_wt[sp[4]].append(sp)
+    kursbelegung_dict = defaultdict(list, inp['belegung']['kursbelegung_dict'])
+
+    for day_offset in range(SIM_TAGE):
+        curr_date = SIM_START + timedelta(days=day_offset)
         if curr_date.weekday() > 4: continue
-        wt_id = curr_date.weekday() + 1
-        
-        for sp in sp_by_wt[wt_id]:
-            sp_id, k_id = sp[0], sp[1]
-            status = random.choices(['gehalten', 'entfallen', 'vertretung'], weights=[0.92, 0.04, 0.04])[0]
-            v_id = random.choice(lehrkraefte)['id'] if status == 'vertretung' else ''
-            ist_kl = 1 if random.random() < 0.02 else 0
-            
-            unterrichtsstunde_data.append([us_id_counter, sp_id, curr_date, status, '', '', v_id, '', '', ist_kl, ''])
-            
-            if status in ['gehalten', 'vertretung']:
-                for sid in kursbelegung_dict[k_id]:
-                    ast = random.choices(['anwesend', 'fehlend_entschuldigt', 'fehlend_unentschuldigt', 'verspaetet'], weights=[0.92, 0.04, 0.02, 0.02])[0]
-                    v_min = random.randint(5, 30) if ast == 'verspaetet' else 0
-                    anwesenheit_data.append([anw_id_counter, us_id_counter, sid, ast, v_min, '', ''])
-                    anw_id_counter += 1
-            us_id_counter += 1
+        us_id_counter, anw_id_counter = simuliere_schultag(
+            curr_date, sp_by_wt, kursbelegung_dict, inp['lehrer']['lehrer_ids'], us_id_counter, anw_id_counter,
+            unterrichtsstunde_data, anwesenheit_data)
+
+    return {'unterrichtsstunde_data': unterrichtsstunde_data, 'anwesenheit_data': anwesenheit_data}
+
+# ==========================================
+# PIPELINE MIT STUFEN-CACHE
+# ==========================================
+# name, funktion, abhaengigkeiten, konstanten (Namen globaler Konfig-Werte),
+# hilfsfunktionen (deren Quelltext mitgehasht wird), dateien (Inhalt mitgehasht)
+Stufe = namedtuple('Stufe', ['name', 'funktion', 'abhaengigkeiten', 'konstanten', 'hilfsfunktionen', 'dateien'])
+
+STUFEN = [
+    Stufe('namen', stufe_namen, [], [], [load_names_from_files], ['vornamen.txt', 'nachnamen.txt']),
+    Stufe('kurse', stufe_kurse, [], ['KLASSEN_SEK_I', 'STUFEN_SEK_II', 'SEK_II_SCHIENEN'],
+          [pick_slots, sek_ii_belegung], []),
+    Stufe('lehrer', stufe_lehrer, ['kurse', 'namen'], ['FAECHER', 'VERWANDTE_FAECHER'],
+          [generate_kuerzel, random_date, lehrer_zuweisung], []),
+    Stufe('raeume', stufe_raeume, ['kurse'], ['RAEUME', 'KLASSEN_SEK_I'], [], []),
+    Stufe('stundenplan', stufe_stundenplan, ['kurse', 'lehrer', 'raeume'], ['FAECHER'], [], []),
+    Stufe('belegung', stufe_belegung, ['kurse', 'namen'], ['KLASSEN_SEK_I', 'STUFEN_SEK_II'],
+          [random_date, sek_ii_belegung], []),
+    Stufe('anwesenheit', stufe_anwesenheit, ['stundenplan', 'belegung', 'lehrer'],
+          ['SIM_START', 'SIM_TAGE', 'UNTERRICHT_STATUS_GEWICHTE', 'ANWESENHEIT_STATUS_GEWICHTE',
+           'KLAUSUR_QUOTE', 'VERSPAETUNG_MINUTEN'], [simuliere_schultag], []),
+]
+
+def stufen_schluessel(stufe, ctx, seed, upstream_schluessel):
+    """Inhalts-Hash der Eingaben einer Stufe.
+
+    Statt die (grossen) Ausgaben der Vorgaenger zu hashen, fliessen deren
+    Schluessel ein: gleiche Schluessel bedeuten gleiche Ausgaben, weil jede
+    Stufe deterministisch aus ihren Eingaben und ihrem Seed rechnet.
+    """
+    h = hashlib.sha256()
+    teile = [
+        stufe.name,
+        inspect.getsource(stufe.funktion),
+        *(inspect.getsource(f) for f in stufe.hilfsfunktionen),
+        repr([(k, globals()[k]) for k in stufe.konstanten]),
+        repr(sorted(ctx['ids'].items())),
+        ctx['praefix'],
+        repr(seed),
+        *(upstream_schluessel[d] for d in stufe.abhaengigkeiten),
+    ]
+    for teil in teile:
+        h.update(teil.encode('utf-8'))
+        h.update(b'\0')
+    for dateiname in stufe.dateien:
+        pfad = os.path.join(ctx['namen_dir'], dateiname)
+        if os.path.exists(pfad):
+            with open(pfad, 'rb') as f:
+                h.update(f.read())
+        h.update(b'\0')
+    return h.hexdigest()
+
+def run_pipeline(ctx, seed=None, cache_dir=None):
+    """Fuehrt alle STUFEN aus und gibt deren Ausgaben (Name -> dict) zurueck.
+
+    Mit `seed` bekommt jede Stufe ihren eigenen, von den anderen Stufen
+    unabhaengigen Zufallszustand; nur dann ist ein Cache-Treffer gleichwertig
+    zur Neuberechnung. Mit `cache_dir` werden die Ausgaben dort als Pickle
+    abgelegt und bei gleichem Schluessel wiederverwendet.
+    """
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    ergebnisse, schluessel = {}, {}
+
+    for stufe in STUFEN:
+        schluessel[stufe.name] = stufen_schluessel(stufe, ctx, seed, schluessel)
+        cache_pfad = os.path.join(cache_dir, f'{stufe.name}-{schluessel[stufe.name][:20]}.pickle') if cache_dir else None
+
+        if cache_pfad and os.path.exists(cache_pfad):
+            with open(cache_pfad, 'rb') as f:
+                ergebnisse[stufe.name] = pickle.load(f)
+            print(f"Stufe '{stufe.name}': aus Cache")
+            continue
 
+        if seed is not None:
+            random.seed(f'{seed}:{stufe.name}')
+        start = time.perf_counter()
+        ergebnisse[stufe.name] = stufe.funktion({d: ergebnisse[d] for d in stufe.abhaengigkeiten}, ctx)
+        print(f"Stufe '{stufe.name}': berechnet in {time.perf_counter() - start:.2f}s")
+
+        if cache_pfad:
+            # Erst in eine Temp-Datei schreiben, damit ein abgebrochener Lauf keinen halben Cache hinterlaesst
+            with open(cache_pfad + '.tmp', 'wb') as f:
+                pickle.dump(ergebnisse[stufe.name], f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(cache_pfad + '.tmp', cache_pfad)
+
+    return ergebnisse
+
+# ==========================================
+# HAUPTSKRIPT
+# ==========================================
+def generate_schule(out_dir=BASIS_DIR, schul_nr=None, namen_dir=None, seed=None, cache_dir=None, partitioniert=None):
+    """Generiert den kompletten Datensatz einer Schule nach `out_dir`.
+
+    Ohne `schul_nr` entsteht der klassische Einzel-Datensatz (ids ab 1). Mit
+    `schul_nr` (0-basiert) bekommt jede Tabelle den disjunkten id-Bereich
+    dieser Schule und eindeutige Bezeichner (Raum, Kuerzel, Kurs) ein Praefix.
+    Mit `partitioniert` ('monat' oder 'abschnitt') werden Unterrichtsstunde und
+    Anwesenheit zusaetzlich als Shards je Partition abgelegt.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    ctx = {'ids': id_basis(schul_nr), 'praefix': schul_praefix(schul_nr), 'namen_dir': namen_dir or out_dir}
+    e = run_pipeline(ctx, seed, cache_dir)
+    lehrer, belegung = e['lehrer'], e['belegung']
+
+    # Statistiken stehen im Stufen-Ergebnis, damit sie auch bei Cache-Treffern erscheinen
+    lehrer_zuweisung.print_statistik(lehrer['statistik'])
+    for jg, statistik in belegung['sek_ii_statistik'].items():
+        sek_ii_belegung.print_statistik(jg, statistik)
+
+    pruefe_id_bereiche({
+        'Klasse': len(e['kurse']['klassen']), 'Raum': len(e['raeume']['raum_data']),
+        'Lehrer': len(lehrer['lehrer_ids']), 'Kurs': len(e['stundenplan']['kurs_data']),
+        'Stundenplan': len(e['stundenplan']['stundenplan_data']), 'Schueler': len(belegung['schueler_data']),
+        'Unterrichtsstunde': len(e['anwesenheit']['unterrichtsstunde_data']),
+        'Anwesenheit': len(e['anwesenheit']['anwesenheit_data']),
+    })
 
     # --- 9. EXPORTE ---
     schuljahr_data = [[1, SCHULJAHR, SCHULJAHR_START, SCHULJAHR_END, 1]]
@@ -587,27 +800,282 @@ def main():
     ]
     fach_data = [[i, k, n, a] for i, (k, n, a) in enumerate(FAECHER, 1)]
     wochentag_data = [[i+1, tag] for i, tag in enumerate(WOCHENTAGE)]
-    raum_data = [[i, r] for i, r in enumerate(RAEUME, 1)]
-    
+
     export_csv(out_dir, 'schuljahr.csv', ['id', 'bezeichnung', 'startdatum', 'enddatum', 'aktiv'], schuljahr_data)
     export_csv(out_dir, 'wochentag.csv', ['id', 'name'], wochentag_data)
     export_csv(out_dir, 'abschnitt.csv', ['id', 'schuljahr_id', 'code', 'startdatum', 'enddatum'], abschnitt_data)
     export_csv(out_dir, 'fach.csv', ['id', 'kuerzel', 'name', 'aufgabenfeld'], fach_data)
-    export_csv(out_dir, 'raum.csv', ['id', 'bezeichnung'], raum_data)
-    export_csv(out_dir, 'lehrer.csv', ['id', 'kuerzel', 'vorname', 'nachname', 'geburtsdatum', 'aktiv'], lehrer_data)
-    export_csv(out_dir, 'lehrbefaehigung.csv', ['lehrer_id', 'fach_id'], lehrbefaehigung_data)
-    export_csv(out_dir, 'klasse.csv', ['id', 'schuljahr_id', 'jahrgangsstufe', 'bezeichnung', 'klassenlehrer_id'], klasse_data)
-    export_csv(out_dir, 'schueler.csv', ['id', 'vorname', 'nachname', 'geburtsdatum', 'aktiv'], schueler_data)
-    export_csv(out_dir, 'schueler_status.csv', ['id', 'schueler_id', 'schuljahr_id', 'jahrgangsstufe', 'klasse_id', 'status_laufbahn'], schueler_status_data)
-    
-    export_csv(out_dir, 'kurs.csv', ['id', 'schuljahr_id', 'abschnitt_id', 'bezeichnung', 'fach_id', 'lehrer_id', 'jahrgangsstufe', 'klasse_id', 'kursart', 'wochenstunden', 'parallelgruppe'], kurs_data)
-    export_csv(out_dir, 'kursbelegung.csv', ['schueler_id', 'kurs_id'], kursbelegung_data)
-    export_csv(out_dir, 'lehrer_deputation.csv', ['id', 'lehrer_id', 'schuljahr_id', 'deputat_soll', 'anrechnungsstunden', 'ermaessigungsstunden', 'deputat_unterricht_verfuegbar', 'beschaeftigungsumfang_prozent', 'bemerkung'], lehrer_deputation_data)
-    export_csv(out_dir, 'stundenplan.csv', ['id', 'kurs_id', 'schuljahr_id', 'raum_id', 'wochentag_id', 'stunde', 'gueltig_ab', 'gueltig_bis'], stundenplan_data)
-    export_csv(out_dir, 'unterrichtsstunde.csv', ['id', 'stundenplan_id', 'datum', 'status', 'thema', 'hausaufgaben', 'vertretungslehrer_id', 'tatsaechlicher_raum_id', 'tatsaechliche_stunde', 'ist_klausur', 'notiz'], unterrichtsstunde_data)
-    export_csv(out_dir, 'anwesenheit.csv', ['id', 'unterrichtsstunde_id', 'schueler_id', 'status', 'verspaetung_minuten', 'entschuldigungsstatus', 'anmerkung'], anwesenheit_data)
-
-    print(f"\nGenerierung abgeschlossen: {len(lehrkraefte)} Lehrer fuer einen lückenlosen Sek I Stundenplan generiert!")
+    export_csv(out_dir, 'raum.csv', ['id', 'bezeichnung'], e['raeume']['raum_data'])
+    export_csv(out_dir, 'lehrer.csv', ['id', 'kuerzel', 'vorname', 'nachname', 'geburtsdatum', 'aktiv'], lehrer['lehrer_data'])
+    export_csv(out_dir, 'lehrbefaehigung.csv', ['lehrer_id', 'fach_id'], lehrer['lehrbefaehigung_data'])
+    export_csv(out_dir, 'klasse.csv', ['id', 'schuljahr_id', 'jahrgangsstufe', 'bezeichnung', 'klassenlehrer_id'], lehrer['klasse_data'])
+    export_csv(out_dir, 'schueler.csv', ['id', 'vorname', 'nachname', 'geburtsdatum', 'aktiv'], belegung['schueler_data'])
+    export_csv(out_dir, 'schueler_status.csv', ['id', 'schueler_id', 'schuljahr_id', 'jahrgangsstufe', 'klasse_id', 'status_laufbahn'], belegung['schueler_status_data'])
+
+    export_csv(out_dir, 'kurs.csv', ['id', 'schuljahr_id', 'abschnitt_id', 'bezeichnung', 'fach_id', 'lehrer_id', 'jahrgangsstufe', 'klasse_id', 'kursart', 'wochenstunden', 'parallelgruppe'], e['stundenplan']['kurs_data'])
+    export_csv(out_dir, 'kursbelegung.csv', ['schueler_id', 'kurs_id'], belegung['kursbelegung_data'])
+    export_csv(out_dir, 'lehrer_deputation.csv', ['id', 'lehrer_id', 'schuljahr_id', 'deputat_soll', 'anrechnungsstunden', 'ermaessigungsstunden', 'deputat_unterricht_verfuegbar', 'beschaeftigungsumfang_prozent', 'bemerkung'], lehrer['lehrer_deputation_data'])
+    export_csv(out_dir, 'stundenplan.csv', ['id', 'kurs_id', 'schuljahr_id', 'raum_id', 'wochentag_id', 'stunde', 'gueltig_ab', 'gueltig_bis'], e['stundenplan']['stundenplan_data'])
+    export_csv(out_dir, 'unterrichtsstunde.csv', UNTERRICHTSSTUNDE_HEADERS, e['anwesenheit']['unterrichtsstunde_data'])
+    export_csv(out_dir, 'anwesenheit.csv', ANWESENHEIT_HEADERS, e['anwesenheit']['anwesenheit_data'])
+
+    if partitioniert:
+        export_partitionen(out_dir, e['anwesenheit']['unterrichtsstunde_data'], e['anwesenheit']['anwesenheit_data'],
+                           partitioniert)
+
+    print(f"\nGenerierung abgeschlossen: {len(lehrer['lehrer_ids'])} Lehrer fuer einen lückenlosen Sek I Stundenplan generiert!")
+    return len(lehrer['lehrer_ids'])
+
+def export_partitionen(out_dir, unterrichtsstunde_data, anwesenheit_data, art):
+    """Schreibt die Shards; die Partitionen ergeben sich aus schuljahr.csv/abschnitt.csv in `out_dir`."""
+    shard_dir = os.path.join(out_dir, partitionierung.PARTITIONEN_DIR)
+    # Alte Shards entfernen, sonst bleiben bei geaenderter Partitionierung verwaiste Dateien liegen
+    if os.path.isdir(shard_dir):
+        shutil.rmtree(shard_dir)
+    os.makedirs(shard_dir)
+    grenzen = partitionierung.partitionen(out_dir, art)
+    us_shards, anw_shards = teile_in_partitionen(unterrichtsstunde_data, anwesenheit_data, grenzen)
+    for name in sorted(us_shards):
+        export_csv(shard_dir, partitionierung.shard_datei('Unterrichtsstunde', name), UNTERRICHTSSTUNDE_HEADERS, us_shards[name])
+        export_csv(shard_dir, partitionierung.shard_datei('Anwesenheit', name), ANWESENHEIT_HEADERS + ['datum'], anw_shards[name])
+
+def erkenne_partitionierung(shard_dir):
+    """'monat' / 'abschnitt' anhand der vorhandenen Shards, None ohne Shards."""
+    if not os.path.isdir(shard_dir):
+        return None
+    for file_name in os.listdir(shard_dir):
+        if file_name.startswith('unterrichtsstunde_a'):
+            return 'abschnitt'
+        if file_name.startswith('unterrichtsstunde_p2'):
+            return 'monat'
+    return None
+
+# ==========================================
+# APPEND-MODUS (weitere Schultage anhaengen)
+# ==========================================
+def _read_csv_rows(daten_dir, filename):
+    with open(os.path.join(daten_dir, filename), 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f, delimiter=';', quotechar='"')
+        next(reader)
+        for row in reader:
+            yield row
+
+def _append_csv(out_dir, filename, data, headers=None):
+    """Haengt Zeilen an eine CSV an; `headers` nur, wenn die Datei neu angelegt wird."""
+    filepath = os.path.join(out_dir, filename)
+    neu = not os.path.exists(filepath)
+    with open(filepath, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=';', quotechar='"')
+        if neu and headers:
+            writer.writerow(headers)
+        writer.writerows(data)
+    print(f"Angehaengt: {filepath} (+{len(data)} Zeilen)")
+
+def lade_append_zustand(daten_dir):
+    """Liest aus einem bestehenden Datensatz alles, was zum Weiter-Simulieren noetig ist.
+
+    unterrichtsstunde.csv und anwesenheit.csv werden nur zeilenweise
+    durchlaufen (letzte id / letztes Datum), nie komplett in den Speicher geladen.
+    """
+    stundenplan = []
+    for row in _read_csv_rows(daten_dir, 'stundenplan.csv'):
+        gueltig_bis = date.fromisoformat(row[7]) if row[7] else None
+        # Gleiche Form wie stundenplan_data in generate_schule: [id, kurs_id, ..., wochentag_id, ...]
+        stundenplan.append([int(row[0]), int(row[1]), row[2], row[3], int(row[4]), int(row[5]),
+                            date.fromisoformat(row[6]), gueltig_bis])
+
+    kursbelegung_dict = defaultdict(list)
+    for schueler_id, kurs_id in _read_csv_rows(daten_dir, 'kursbelegung.csv'):
+        kursbelegung_dict[int(kurs_id)].append(int(schueler_id))
+
+    lehrer_ids = [int(row[0]) for row in _read_csv_rows(daten_dir, 'lehrer.csv')]
+    abschnitt_rows = [row for row in _read_csv_rows(daten_dir, 'abschnitt.csv') if row[3] and row[4]]
+    abschnitte = sorted((date.fromisoformat(row[3]), date.fromisoformat(row[4])) for row in abschnitt_rows)
+
+    letzte_us_id, letztes_datum = 0, None
+    for row in _read_csv_rows(daten_dir, 'unterrichtsstunde.csv'):
+        letzte_us_id = max(letzte_us_id, int(row[0]))
+        datum = date.fromisoformat(row[2])
+        if letztes_datum is None or datum > letztes_datum:
+            letztes_datum = datum
+
+    letzte_anw_id = 0
+    for row in _read_csv_rows(daten_dir, 'anwesenheit.csv'):
+        letzte_anw_id = max(letzte_anw_id, int(row[0]))
+
+    return {
+        'stundenplan': stundenplan, 'kursbelegung': kursbelegung_dict, 'lehrer_ids': lehrer_ids,
+        'abschnitte': abschnitte, 'letzte_us_id': letzte_us_id, 'letzte_anw_id': letzte_anw_id,
+        'letztes_datum': letztes_datum,
+    }
+
+def naechste_schultage(letztes_datum, anzahl_tage, abschnitte):
+    """Die naechsten `anzahl_tage` Schultage nach `letztes_datum`.
+
+    Wochenenden und Tage ausserhalb aller Abschnitte (z.B. Luecken zwischen
+    den Halbjahren) werden uebersprungen; nach dem Ende des letzten Abschnitts
+    ist Schluss, auch wenn dann weniger Tage zurueckkommen.
+    """
+    tage = []
+    curr_date = letztes_datum + timedelta(days=1)
+    ende = abschnitte[-1][1] if abschnitte else SCHULJAHR_END
+    while len(tage) < anzahl_tage and curr_date <= ende:
+        im_abschnitt = not abschnitte or any(start <= curr_date <= bis for start, bis in abschnitte)
+        if curr_date.weekday() <= 4 and im_abschnitt:
+            tage.append(curr_date)
+        curr_date += timedelta(days=1)
+    return tage
+
+def append_schultage(daten_dir, anzahl_tage, delta_dir=None):
+    """Simuliert `anzahl_tage` weitere Schultage und haengt sie an den Datensatz an.
+
+    Lehrer, Stundenplan und Belegungen bleiben unveraendert; es entstehen nur
+    neue Unterrichtsstunden und Anwesenheiten. Mit `delta_dir` werden die neuen
+    Zeilen zusaetzlich als eigene CSVs abgelegt (z.B. fuer
+    `import_csv_to_db.py --csv-dir <delta_dir>`). Liegen Partitions-Shards
+    vor, werden die neuen Zeilen auch an die passenden Shards angehaengt.
+    """
+    zustand = lade_append_zustand(daten_dir)
+    letztes_datum = zustand['letztes_datum'] or SIM_START - timedelta(days=1)
+    tage = naechste_schultage(letztes_datum, anzahl_tage, zustand['abschnitte'])
+    if len(tage) < anzahl_tage:
+        print(f"WARNUNG: Schuljahresende erreicht, nur {len(tage)} von {anzahl_tage} Schultagen moeglich.")
+    if not tage:
+        return 0
+
+    unterrichtsstunde_data = []
+    anwesenheit_data = []
+    us_id_counter = zustand['letzte_us_id'] + 1
+    anw_id_counter = zustand['letzte_anw_id'] + 1
+
+    for curr_date in tage:
+        # Nur Stundenplan-Eintraege, die an diesem Tag gueltig sind
+        sp_by_wt = defaultdict(list)
+        for sp in zustand['stundenplan']:
+            if sp[6] <= curr_date and (sp[7] is None or curr_date <= sp[7]):
+                sp_by_wt[sp[4]].append(sp)
+        us_id_counter, anw_id_counter = simuliere_schultag(
+            curr_date, sp_by_wt, zustand['kursbelegung'], zustand['lehrer_ids'], us_id_counter, anw_id_counter,
+            unterrichtsstunde_data, anwesenheit_data)
+
+    _append_csv(daten_dir, 'unterrichtsstunde.csv', unterrichtsstunde_data)
+    _append_csv(daten_dir, 'anwesenheit.csv', anwesenheit_data)
+    if delta_dir:
+        os.makedirs(delta_dir, exist_ok=True)
+        for filename, data in [('unterrichtsstunde.csv', unterrichtsstunde_data), ('anwesenheit.csv', anwesenheit_data)]:
+            with open(os.path.join(daten_dir, filename), 'r', encoding='utf-8', newline='') as f:
+                headers = next(csv.reader(f, delimiter=';', quotechar='"'))
+            if os.path.exists(os.path.join(delta_dir, filename)):
+                os.remove(os.path.join(delta_dir, filename))
+            _append_csv(delta_dir, filename, data, headers)
+
+    shard_dir = os.path.join(daten_dir, partitionierung.PARTITIONEN_DIR)
+    art = erkenne_partitionierung(shard_dir)
+    if art:
+        us_shards, anw_shards = teile_in_partitionen(unterrichtsstunde_data, anwesenheit_data,
+                                                     partitionierung.partitionen(daten_dir, art))
+        for name in sorted(us_shards):
+            _append_csv(shard_dir, partitionierung.shard_datei('Unterrichtsstunde', name), us_shards[name], UNTERRICHTSSTUNDE_HEADERS)
+            _append_csv(shard_dir, partitionierung.shard_datei('Anwesenheit', name), anw_shards[name], ANWESENHEIT_HEADERS + ['datum'])
+
+    print(f"\n{len(tage)} Schultage ({tage[0]} bis {tage[-1]}) angehaengt.")
+    return len(tage)
+
+# ==========================================
+# MULTI-SCHUL-MODUS (Prozess-Pool)
+# ==========================================
+def _generiere_schule_worker(auftrag):
+    schul_nr, out_dir, seed, cache_dir, partitioniert = auftrag
+    # Jeder Worker-Prozess hat seinen eigenen Zustand des `random`-Moduls,
+    # daher genuegt ein eigener Seed pro Schule fuer reproduzierbare Daten.
+    anzahl_lehrer = generate_schule(out_dir, schul_nr, namen_dir=BASIS_DIR, seed=seed, cache_dir=cache_dir,
+                                    partitioniert=partitioniert)
+    return schul_nr, out_dir, anzahl_lehrer
+
+def merge_partitionen(partition_dirs, out_dir):
+    """Haengt die CSVs aller Schul-Partitionen zu je einer Datei zusammen.
+
+    Dank disjunkter id-Bereiche ist das ein reines Aneinanderhaengen (byteweise,
+    ohne die Dateien zu parsen). Gemeinsame Tabellen werden nur einmal uebernommen.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    file_names = sorted(f for f in os.listdir(partition_dirs[0]) if f.endswith('.csv'))
+    for file_name in file_names:
+        quellen = partition_dirs[:1] if file_name in GEMEINSAME_TABELLEN else partition_dirs
+        with open(os.path.join(out_dir, file_name), 'wb') as f_out:
+            for i, partition_dir in enumerate(quellen):
+                with open(os.path.join(partition_dir, file_name), 'rb') as f_in:
+                    header = f_in.readline()
+                    if i == 0:
+                        f_out.write(header)
+                    shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+        print(f"Zusammengefuehrt: {os.path.join(out_dir, file_name)} ({len(quellen)} Partitionen)")
+
+    shard_dir = partitionierung.PARTITIONEN_DIR
+    if os.path.isdir(os.path.join(partition_dirs[0], shard_dir)):
+        merge_partitionen([os.path.join(d, shard_dir) for d in partition_dirs], os.path.join(out_dir, shard_dir))
+
+def generate_schulen(anzahl_schulen, out_dir=BEZIRK_DIR, seed=None, prozesse=None, merge=False, cache_dir=None,
+                     partitioniert=None):
+    """Generiert `anzahl_schulen` Schulen parallel, je eine Partition unter out_dir/schule_NNN."""
+    if anzahl_schulen * ID_BEREICHE['Anwesenheit'] >= 2**31:
+        raise ValueError(f"{anzahl_schulen} Schulen passen nicht in den INT-Bereich der ids.")
+    if seed is None:
+        seed = random.randrange(2**32)
+    print(f"Generiere {anzahl_schulen} Schulen mit Seed {seed} nach '{out_dir}'...\n")
+
+    auftraege = [(nr, os.path.join(out_dir, f'schule_{nr + 1:03d}'), seed + nr, cache_dir, partitioniert)
+                 for nr in range(anzahl_schulen)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=prozesse) as pool:
+        futures = [pool.submit(_generiere_schule_worker, a) for a in auftraege]
+        for future in as_completed(futures):
+            schul_nr, partition_dir, anzahl_lehrer = future.result()
+            print(f"-> Schule {schul_nr + 1} fertig ({anzahl_lehrer} Lehrer): {partition_dir}")
+    print(f"\n{anzahl_schulen} Schulen in {time.perf_counter() - start:.1f}s generiert.")
+
+    if merge:
+        merge_partitionen([a[1] for a in auftraege], out_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description="Beispieldaten fuer das Digitale Klassenbuch generieren")
+    parser.add_argument('--schulen', type=int, default=1,
+                        help="Anzahl Schulen; ab 2 werden sie parallel mit disjunkten id-Bereichen generiert")
+    parser.add_argument('--prozesse', type=int, default=None,
+                        help="Anzahl Worker-Prozesse (Standard: Anzahl CPUs)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed fuer reproduzierbare Daten")
+    parser.add_argument('--out-dir', default=None, help="Ausgabeordner")
+    parser.add_argument('--merge', action='store_true',
+                        help="Partitionen am Ende zu einem Datensatz zusammenfuehren")
+    parser.add_argument('--append-tage', type=int, default=None, metavar='N',
+                        help="Bestehenden Datensatz nur um N weitere Schultage verlaengern")
+    parser.add_argument('--delta-dir', default=None,
+                        help="Im Append-Modus die neuen Zeilen zusaetzlich hier als eigene CSVs ablegen")
+    parser.add_argument('--cache', action='store_true',
+                        help=f"Stufen-Ergebnisse in '{CACHE_DIR}' zwischenspeichern und unveraenderte Stufen ueberspringen")
+    parser.add_argument('--partitioniert', choices=['monat', 'abschnitt'], default=None,
+                        help=f"Unterrichtsstunde/Anwesenheit zusaetzlich je Partition nach '{partitionierung.PARTITIONEN_DIR}/' schreiben "
+                             "(fuer import_partitionen.py)")
+    args = parser.parse_args()
+
+    cache_dir = None
+    if args.cache:
+        cache_dir = CACHE_DIR
+        if args.seed is None:
+            # Ohne festen Seed waere jeder Lauf anders -> ein Cache-Treffer waere nie korrekt
+            args.seed = random.randrange(2**32)
+            print(f"HINWEIS: --cache ohne --seed, verwende Seed {args.seed}.")
+
+    if args.append_tage is not None:
+        if args.seed is not None:
+            random.seed(args.seed)
+        append_schultage(args.out_dir or BASIS_DIR, args.append_tage, args.delta_dir)
+    elif args.schulen <= 1:
+        generate_schule(args.out_dir or BASIS_DIR, namen_dir=BASIS_DIR, seed=args.seed, cache_dir=cache_dir,
+                        partitioniert=args.partitioniert)
+    else:
+        generate_schulen(args.schulen, args.out_dir or BEZIRK_DIR, args.seed, args.prozesse, args.merge, cache_dir,
+                         args.partitioniert)
 
 if __name__ == '__main__':
     main()
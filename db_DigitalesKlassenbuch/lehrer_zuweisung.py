@@ -0,0 +1,360 @@
+import math
+import time
+import random
+from collections import defaultdict
+
+# ==========================================
+# KONFIGURATION
+# ==========================================
+# Deputat-Soll (Unterrichtsstunden) neuer Lehrkraefte: (soll, gewicht).
+# Vollzeit = 25.5 h, dazu typische Teilzeit-Modelle.
+DEPUTAT_VERTEILUNG = [(25.5, 0.70), (19.0, 0.15), (13.0, 0.15)]
+VOLLZEIT_DEPUTAT = 25.5
+
+# Wie viele Stunden eine Lehrkraft maximal fachfremd unterrichten darf.
+# 0 = nur Faecher mit Lehrbefaehigung (realistische Lehrbefaehigung-Tabelle).
+FACHFREMD_MAX_STUNDEN = 0
+
+# Obergrenze fuer die Runden der lokalen Suche nach First-Fit-Decreasing. Eine Runde loest
+# eine Lehrkraft auf oder verschiebt einzelne Kurse; begrenzt wird ueber Runden statt ueber
+# die Laufzeit, damit gleiche Eingaben (und gleicher Seed) dasselbe Ergebnis liefern
+LOKALE_SUCHE_MAX_RUNDEN = 100
+
+# ==========================================
+# HILFSFUNKTIONEN
+# ==========================================
+def slot_maske(slots):
+    """(wochentag_idx 0-4, stunde 1-9) -> Bitmaske; Kollision = maske_a & maske_b."""
+    maske = 0
+    for wt, st in slots:
+        maske |= 1 << (wt * 10 + st)
+    return maske
+
+def _partnerfach(fach, lehrkraft, kurse, offen_nach_fach, verwandte_faecher):
+    """Zweitfach einer neuen Lehrkraft: das Fach, von dessen offenen Kursen sie die meisten Stunden
+    ohne Slot-Kollision noch uebernehmen kann; bei Gleichstand ein verwandtes Fach."""
+    verwandt = set(verwandte_faecher.get(fach, []))
+    verwandt.update(f for f, partner in verwandte_faecher.items() if fach in partner)
+
+    def nutzbar(f):
+        maske, stunden = lehrkraft.maske, lehrkraft.stunden
+        for k_idx in offen_nach_fach[f]:
+            kurs = kurse[k_idx]
+            if not maske & kurs['maske'] and stunden + kurs['stunden'] <= lehrkraft.kapazitaet:
+                maske |= kurs['maske']
+                stunden += kurs['stunden']
+        return stunden - lehrkraft.stunden
+
+    kandidaten = [(nutzbar(f), f in verwandt, f) for f in offen_nach_fach if f != fach and offen_nach_fach[f]]
+    kandidaten = [k for k in kandidaten if k[0] > 0]
+    if not kandidaten:
+        return None
+    return max(kandidaten)[2]
+
+def _ziehe_deputat(deputat_verteilung):
+    sollwerte = [soll for soll, _ in deputat_verteilung]
+    gewichte = [gewicht for _, gewicht in deputat_verteilung]
+    return random.choices(sollwerte, weights=gewichte)[0]
+
+# ==========================================
+# ZUWEISUNG
+# ==========================================
+class _Lehrkraft:
+    __slots__ = ('faecher', 'deputat_soll', 'kapazitaet', 'stunden', 'fachfremd_stunden', 'maske', 'kurse')
+
+    def __init__(self, faecher, deputat_soll):
+        self.faecher = faecher
+        self.deputat_soll = deputat_soll
+        self.kapazitaet = int(deputat_soll)
+        self.stunden = 0
+        self.fachfremd_stunden = 0
+        self.maske = 0
+        self.kurse = set()
+
+    def passt(self, kurs, fachfremd_max):
+        if self.maske & kurs['maske'] or self.stunden + kurs['stunden'] > self.kapazitaet:
+            return False
+        if kurs['fach'] in self.faecher:
+            return True
+        return self.fachfremd_stunden + kurs['stunden'] <= fachfremd_max
+
+    def nimm(self, k_idx, kurs):
+        self.kurse.add(k_idx)
+        self.stunden += kurs['stunden']
+        self.maske |= kurs['maske']
+        if kurs['fach'] not in self.faecher:
+            self.fachfremd_stunden += kurs['stunden']
+
+    def gib_ab(self, k_idx, kurs):
+        self.kurse.discard(k_idx)
+        self.stunden -= kurs['stunden']
+        self.maske &= ~kurs['maske']
+        if kurs['fach'] not in self.faecher:
+            self.fachfremd_stunden -= kurs['stunden']
+
+
+def _fach_engpass(kurse):
+    """Pro Kurs: wie viele Kurse desselben Fachs maximal gleichzeitig in einem seiner Slots liegen.
+
+    Baender (Reli, WP, Sek II Schienen) erzwingen so viele verschiedene
+    Lehrkraefte mit diesem Fach; solche Kurse werden zuerst verteilt.
+    """
+    belegung = defaultdict(int)
+    for kurs in kurse:
+        for slot in kurs['slots']:
+            belegung[(kurs['fach'], slot)] += 1
+    return [max((belegung[(kurs['fach'], slot)] for slot in kurs['slots']), default=0) for kurs in kurse]
+
+
+def _first_fit_decreasing(kurse, verwandte_faecher, deputat_verteilung, fachfremd_max):
+    # Faecher, die gemessen an ihren Stunden die meisten Lehrkraefte binden (Reli-/WP-Baender), zuerst:
+    # deren Lehrkraefte brauchen ein Zweitfach mit vielen offenen Stunden. Innerhalb eines Fachs
+    # Engpass-Kurse zuerst, dann grosse Kurse (klassisches "decreasing")
+    engpass = _fach_engpass(kurse)
+    fach_stunden = defaultdict(int)
+    fach_engpass = defaultdict(int)
+    for kurs, kurs_engpass in zip(kurse, engpass):
+        fach_stunden[kurs['fach']] += kurs['stunden']
+        fach_engpass[kurs['fach']] = max(fach_engpass[kurs['fach']], kurs_engpass)
+    bindung = {fach: fach_engpass[fach] / fach_stunden[fach] for fach in fach_stunden}
+    reihenfolge = sorted(range(len(kurse)), key=lambda i: (-bindung[kurse[i]['fach']], -engpass[i],
+                                                           -kurse[i]['stunden'], kurse[i]['fach'], i))
+
+    offen_nach_fach = defaultdict(dict) # fach -> noch offene Kurs-Indizes (dict als geordnete Menge)
+    for k_idx in reihenfolge:
+        offen_nach_fach[kurse[k_idx]['fach']][k_idx] = None
+
+    lehrkraefte = []
+    nach_fach = defaultdict(list) # fach -> Indizes der Lehrkraefte mit Lehrbefaehigung
+    kurs_lehrer = [None] * len(kurse)
+
+    def zuweisen(k_idx, l_idx):
+        kurs = kurse[k_idx]
+        lehrkraefte[l_idx].nimm(k_idx, kurs)
+        kurs_lehrer[k_idx] = l_idx
+        del offen_nach_fach[kurs['fach']][k_idx]
+
+    def fuelle_auf(l_idx, fach):
+        for offen_idx in list(offen_nach_fach[fach]):
+            if lehrkraefte[l_idx].passt(kurse[offen_idx], fachfremd_max):
+                zuweisen(offen_idx, l_idx)
+
+    for k_idx in reihenfolge:
+        if kurs_lehrer[k_idx] is not None:
+            continue
+        kurs = kurse[k_idx]
+        ziel = next((l_idx for l_idx in nach_fach[kurs['fach']] if lehrkraefte[l_idx].passt(kurs, fachfremd_max)), None)
+
+        if ziel is None and fachfremd_max > 0:
+            ziel = next((l_idx for l_idx, l in enumerate(lehrkraefte) if l.passt(kurs, fachfremd_max)), None)
+
+        if ziel is not None:
+            zuweisen(k_idx, ziel)
+            continue
+
+        # Neue Lehrkraft: zuerst mit offenen Kursen ihres Fachs auffuellen (in derselben
+        # Reihenfolge), dann ein Zweitfach waehlen, das in die freien Slots passt
+        ziel = len(lehrkraefte)
+        lehrkraefte.append(_Lehrkraft([kurs['fach']], _ziehe_deputat(deputat_verteilung)))
+        nach_fach[kurs['fach']].append(ziel)
+        zuweisen(k_idx, ziel)
+        fuelle_auf(ziel, kurs['fach'])
+
+        partner = _partnerfach(kurs['fach'], lehrkraefte[ziel], kurse, offen_nach_fach, verwandte_faecher)
+        if partner:
+            lehrkraefte[ziel].faecher.append(partner)
+            nach_fach[partner].append(ziel)
+            fuelle_auf(ziel, partner)
+
+    return lehrkraefte, nach_fach, kurs_lehrer
+
+
+def _lokale_suche(kurse, lehrkraefte, nach_fach, kurs_lehrer, fachfremd_max, max_runden, zeitlimit=None):
+    """Versucht wiederholt, die am schwaechsten ausgelastete Lehrkraft komplett aufzuloesen.
+
+    Jeder ihrer Kurse muss bei einer anderen Lehrkraft (Lehrbefaehigung,
+    Kapazitaet, keine Slot-Kollision) unterkommen, notfalls nachdem diese
+    einen kollidierenden Kurs an eine dritte Lehrkraft weitergereicht hat;
+    sonst wird der Versuch zurueckgerollt. Gelingt keine Aufloesung, werden
+    einzelne Kurse von schwaecher zu staerker ausgelasteten Lehrkraeften
+    verschoben, damit der naechste Versuch leichter wird. Nach `max_runden`
+    Runden ist Schluss; `zeitlimit` (Sekunden, Standard aus) ist nur eine
+    Notbremse und macht das Ergebnis von der Rechnergeschwindigkeit abhaengig.
+    Gibt die aktiven Lehrkraefte, die Anzahl eingesparter Lehrkraefte und die
+    Anzahl der Runden zurueck.
+    """
+    start = time.perf_counter()
+    aktiv = set(range(len(lehrkraefte)))
+    eingespart = 0
+    runden = 0
+
+    def zeit_abgelaufen():
+        if zeitlimit is None or time.perf_counter() - start < zeitlimit:
+            return False
+        print(f"WARNUNG: Lokale Suche nach {zeitlimit}s Zeitlimit in Runde {runden} abgebrochen "
+              f"(Ergebnis nicht reproduzierbar).")
+        return True
+
+    def verschiebe(k_idx, ziel):
+        kurs = kurse[k_idx]
+        lehrkraefte[kurs_lehrer[k_idx]].gib_ab(k_idx, kurs)
+        lehrkraefte[ziel].nimm(k_idx, kurs)
+        zug = (k_idx, kurs_lehrer[k_idx])
+        kurs_lehrer[k_idx] = ziel
+        return zug
+
+    def kandidaten(kurs, ausser):
+        pool = nach_fach[kurs['fach']] if fachfremd_max <= 0 else aktiv
+        return [z for z in pool if z in aktiv and z not in ausser]
+
+    def unterbringen(k_idx, ausser):
+        """Verschiebt Kurs k_idx zu einer anderen Lehrkraft; Rueckgabe: Liste der Zuege oder None."""
+        kurs = kurse[k_idx]
+        ziele = kandidaten(kurs, ausser)
+        ziel = next((z for z in ziele if lehrkraefte[z].passt(kurs, fachfremd_max)), None)
+        if ziel is not None:
+            return [verschiebe(k_idx, ziel)]
+        # Auswerfen: ein Kurs des Ziels (der einzige kollidierende, sonst ein beliebiger)
+        # wandert zu einer dritten Lehrkraft und macht Slot und Kapazitaet frei
+        for z in ziele:
+            ziel_lk = lehrkraefte[z]
+            blockiert = [b for b in ziel_lk.kurse if kurse[b]['maske'] & kurs['maske']]
+            if len(blockiert) > 1:
+                continue
+            for b_idx in blockiert or sorted(ziel_lk.kurse):
+                if ziel_lk.stunden - kurse[b_idx]['stunden'] + kurs['stunden'] > ziel_lk.kapazitaet:
+                    continue
+                weiter = next((u for u in kandidaten(kurse[b_idx], ausser | {z})
+                               if lehrkraefte[u].passt(kurse[b_idx], fachfremd_max)), None)
+                if weiter is None:
+                    continue
+                zuege = [verschiebe(b_idx, weiter)]
+                if ziel_lk.passt(kurs, fachfremd_max):
+                    return zuege + [verschiebe(k_idx, z)]
+                verschiebe(b_idx, z)
+        return None
+
+    def rollback(zuege):
+        for k_idx, vorher in reversed(zuege):
+            verschiebe(k_idx, vorher)
+
+    verbessert = True
+    while verbessert and runden < max_runden:
+        if zeit_abgelaufen():
+            break
+        runden += 1
+        verbessert = False
+        reihenfolge = sorted(aktiv, key=lambda i: (lehrkraefte[i].stunden, i))
+        for l_idx in reihenfolge:
+            quelle = lehrkraefte[l_idx]
+            zuege = []
+            for k_idx in sorted(quelle.kurse, key=lambda i: (-kurse[i]['stunden'], i)):
+                ergebnis = unterbringen(k_idx, {l_idx})
+                if ergebnis is None:
+                    break
+                zuege += ergebnis
+
+            if not quelle.kurse:
+                aktiv.discard(l_idx)
+                eingespart += 1
+                verbessert = True
+                break
+            rollback(zuege)
+
+        if verbessert:
+            continue
+        # Keine Lehrkraft aufloesbar: einzelne Kurse zu mindestens gleich stark ausgelasteten Lehrkraeften
+        for l_idx in reihenfolge:
+            quelle = lehrkraefte[l_idx]
+            for k_idx in sorted(quelle.kurse):
+                kurs = kurse[k_idx]
+                ziel = next((z for z in kandidaten(kurs, {l_idx}) if lehrkraefte[z].stunden >= quelle.stunden
+                             and lehrkraefte[z].passt(kurs, fachfremd_max)), None)
+                if ziel is not None:
+                    verschiebe(k_idx, ziel)
+                    verbessert = True
+
+    return aktiv, eingespart, runden
+
+
+def _untere_schranke(kurse, deputat_verteilung):
+    """Mindestanzahl Lehrkraefte: nach Stunden (alle Vollzeit) bzw. nach Fach-Engpaessen (je 2 Faecher)."""
+    if not kurse:
+        return 0
+    nach_stunden = math.ceil(sum(k['stunden'] for k in kurse) / max(int(s) for s, _ in deputat_verteilung))
+    engpass_pro_fach = defaultdict(int)
+    for kurs, engpass in zip(kurse, _fach_engpass(kurse)):
+        engpass_pro_fach[kurs['fach']] = max(engpass_pro_fach[kurs['fach']], engpass)
+    return max(nach_stunden, math.ceil(sum(engpass_pro_fach.values()) / 2))
+
+def weise_lehrer_zu(kurse, verwandte_faecher=None, deputat_verteilung=DEPUTAT_VERTEILUNG,
+                    fachfremd_max=FACHFREMD_MAX_STUNDEN, lokale_suche=True,
+                    max_runden=LOKALE_SUCHE_MAX_RUNDEN, zeitlimit=None):
+    """Ordnet jedem Kurs eine Lehrkraft zu und legt dabei moeglichst wenige Lehrkraefte an.
+
+    `kurse` ist eine Liste von dicts mit 'fach', 'stunden' und 'slots'
+    (wie die Kurs-Objekte des Generators). Bin-Packing per First-Fit-Decreasing:
+    eine Lehrkraft ist ein Behaelter mit ihrem Deputat-Soll als Kapazitaet, ein
+    Kurs passt nur ohne Slot-Kollision und (bis auf `fachfremd_max` Stunden)
+    nur in ein Fach ihrer Lehrbefaehigung. Engpass-Kurse (Baender) werden
+    zuerst verteilt, neue Lehrkraefte sofort aufgefuellt und erst danach mit
+    einem Zweitfach versehen, das in ihre freien Slots passt. Danach optional
+    lokale Suche mit Verschieben einzelner Kurse, begrenzt auf `max_runden`
+    Runden (und nur auf Wunsch zusaetzlich auf `zeitlimit` Sekunden).
+
+    Rueckgabe: (lehrkraefte, kurs_lehrer, statistik). `lehrkraefte` ist eine
+    Liste von dicts ('faecher', 'deputat_soll', 'stunden', 'fachfremd_stunden',
+    'kurse'), `kurs_lehrer[k]` der Index der Lehrkraft von Kurs k.
+    """
+    verwandte_faecher = verwandte_faecher or {}
+    kurse = [dict(fach=k['fach'], stunden=k['stunden'], slots=k['slots'], maske=slot_maske(k['slots'])) for k in kurse]
+
+    start = time.perf_counter()
+    lehrkraefte, nach_fach, kurs_lehrer = _first_fit_decreasing(kurse, verwandte_faecher, deputat_verteilung, fachfremd_max)
+    laufzeit_ffd = time.perf_counter() - start
+    anzahl_ffd = len(lehrkraefte)
+
+    aktiv, eingespart, runden = set(range(len(lehrkraefte))), 0, 0
+    start = time.perf_counter()
+    if lokale_suche:
+        aktiv, eingespart, runden = _lokale_suche(kurse, lehrkraefte, nach_fach, kurs_lehrer, fachfremd_max,
+                                                  max_runden, zeitlimit)
+    laufzeit_suche = time.perf_counter() - start
+
+    # Aufgeloeste Lehrkraefte entfernen und Indizes verdichten
+    neuer_index = {alt: neu for neu, alt in enumerate(sorted(aktiv))}
+    ergebnis = [{
+        'faecher': lehrkraefte[alt].faecher, 'deputat_soll': lehrkraefte[alt].deputat_soll,
+        'stunden': lehrkraefte[alt].stunden, 'fachfremd_stunden': lehrkraefte[alt].fachfremd_stunden,
+        'kurse': sorted(lehrkraefte[alt].kurse),
+    } for alt in sorted(aktiv)]
+    kurs_lehrer = [neuer_index[l_idx] for l_idx in kurs_lehrer]
+
+    gesamt_stunden = sum(k['stunden'] for k in kurse)
+    auslastung = [l['stunden'] / int(l['deputat_soll']) for l in ergebnis]
+    statistik = {
+        'kurse': len(kurse),
+        'lehrkraefte': len(ergebnis),
+        'lehrkraefte_nach_ffd': anzahl_ffd,
+        'eingespart_durch_lokale_suche': eingespart,
+        'runden_lokale_suche': runden,
+        'untere_schranke': _untere_schranke(kurse, deputat_verteilung),
+        'stunden': gesamt_stunden,
+        'kapazitaet': sum(int(l['deputat_soll']) for l in ergebnis),
+        'fachfremd_stunden': sum(l['fachfremd_stunden'] for l in ergebnis),
+        'auslastung_mittel': round(sum(auslastung) / len(auslastung), 4) if auslastung else 0,
+        'auslastung_min': round(min(auslastung), 4) if auslastung else 0,
+        'auslastung_max': round(max(auslastung), 4) if auslastung else 0,
+        'laufzeit_ffd_s': round(laufzeit_ffd, 4),
+        'laufzeit_lokale_suche_s': round(laufzeit_suche, 4),
+    }
+    return ergebnis, kurs_lehrer, statistik
+
+def print_statistik(statistik):
+    print(f"Lehrerzuweisung: {statistik['lehrkraefte']} Lehrkraefte fuer {statistik['kurse']} Kurse "
+          f"({statistik['stunden']} h, untere Schranke {statistik['untere_schranke']} Lehrkraefte)")
+    print(f"  FFD: {statistik['lehrkraefte_nach_ffd']} Lehrkraefte in {statistik['laufzeit_ffd_s']:.3f}s, "
+          f"lokale Suche: -{statistik['eingespart_durch_lokale_suche']} in {statistik['runden_lokale_suche']} Runden "
+          f"({statistik['laufzeit_lokale_suche_s']:.3f}s)")
+    print(f"  Auslastung: mittel {statistik['auslastung_mittel']:.1%}, min {statistik['auslastung_min']:.1%}, "
+          f"max {statistik['auslastung_max']:.1%}; fachfremd: {statistik['fachfremd_stunden']} h")
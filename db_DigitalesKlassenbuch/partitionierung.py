@@ -0,0 +1,61 @@
+import os
+import csv
+from datetime import date, timedelta
+
+# Gemeinsame Partitionierung von Generator (generate_beispieldaten.py --partitioniert)
+# und Importer (import_partitionen.py): Partitionsgrenzen und Namen der Shard-Dateien.
+
+# ==========================================
+# KONFIGURATION
+# ==========================================
+# Diese beiden Tabellen wachsen mit jedem Schultag und werden fast nur ueber
+# Datumsbereiche abgefragt -> RANGE-Partitionierung nach `datum`.
+PARTITIONIERTE_TABELLEN = ['Unterrichtsstunde', 'Anwesenheit']
+
+# Unterordner des CSV-Ordners, in den der Generator die Shards schreibt,
+# z.B. partitionen/unterrichtsstunde_p2026_08.csv oder partitionen/anwesenheit_a1.csv
+PARTITIONEN_DIR = 'partitionen'
+
+# Auffang-Partition fuer alles ausserhalb des Schuljahres (MySQL: MAXVALUE, PostgreSQL: DEFAULT)
+REST_PARTITION = 'p_rest'
+
+# ==========================================
+# PARTITIONEN
+# ==========================================
+def _lese_csv(csv_dir, file_name):
+    with open(os.path.join(csv_dir, file_name), 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f, delimiter=';'))
+
+def partitionen(csv_dir, art):
+    """Liste (name, von, bis) der Partitionen; `bis` ist exklusiv.
+
+    art='monat': ein Monat je Partition ueber das Schuljahr (schuljahr.csv),
+    art='abschnitt': eine Partition je Abschnitt/Halbjahr (abschnitt.csv).
+    Zuletzt immer die Rest-Partition mit (None, None).
+    """
+    grenzen = []
+    if art == 'monat':
+        for schuljahr in _lese_csv(csv_dir, 'schuljahr.csv'):
+            monat = date.fromisoformat(schuljahr['startdatum']).replace(day=1)
+            ende = date.fromisoformat(schuljahr['enddatum'])
+            while monat <= ende:
+                naechster = (monat + timedelta(days=32)).replace(day=1)
+                grenzen.append((f'p{monat.year}_{monat.month:02d}', monat, naechster))
+                monat = naechster
+    elif art == 'abschnitt':
+        for abschnitt in _lese_csv(csv_dir, 'abschnitt.csv'):
+            if abschnitt['startdatum'] and abschnitt['enddatum']:
+                grenzen.append((f"a{abschnitt['id']}", date.fromisoformat(abschnitt['startdatum']),
+                                date.fromisoformat(abschnitt['enddatum']) + timedelta(days=1)))
+    else:
+        raise ValueError(f"Unbekannte Partitionierung '{art}' (erwartet: monat, abschnitt)")
+    grenzen.sort(key=lambda g: g[1])
+    grenzen.append((REST_PARTITION, None, None))
+    return grenzen
+
+def shard_datei(table_name, partition):
+    """Dateiname eines Shards, z.B. anwesenheit_p2026_08.csv (Tabellennamen sind hier einteilig)."""
+    return f"{table_name.lower()}_{partition}.csv"
+
+def shard_pfad(csv_dir, table_name, partition):
+    return os.path.join(csv_dir, PARTITIONEN_DIR, shard_datei(table_name, partition))
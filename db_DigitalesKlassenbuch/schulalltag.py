@@ -0,0 +1,8 @@
+# Annahmen ueber den Schulalltag, die der Generator (generate_beispieldaten.py) beim
+# Ausrollen und der Lasttest (lasttest_klassenbuch.py) beim Erfassen gleich verwenden.
+
+# Verteilung der Anwesenheits-Status je Schueler und Unterrichtsstunde
+ANWESENHEIT_STATUS_GEWICHTE = {'anwesend': 0.92, 'fehlend_entschuldigt': 0.04, 'fehlend_unentschuldigt': 0.02, 'verspaetet': 0.02}
+
+# Verspaetung in Minuten (von, bis), gleichverteilt
+VERSPAETUNG_MINUTEN = (5, 30)
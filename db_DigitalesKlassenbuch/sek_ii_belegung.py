@@ -0,0 +1,237 @@
+import time
+import random
+from collections import defaultdict
+
+# ==========================================
+# KONFIGURATION
+# ==========================================
+# Jede Sek II Schiene ist ein Wahl-Slot: pro Schueler hoechstens ein Kurs je
+# Schiene. Die Schienen-Nummer steht im Kurs-Dict unter 'schiene'.
+LK_ANZAHL = 2
+GK_ANZAHL = 8
+
+# Faecher, die jeder Schueler belegen muss (als LK oder GK)
+PFLICHTFAECHER = ['D', 'M', 'E', 'SP']
+
+# Schueler werden blockweise einem gemeinsamen Wahlprofil (Schiene -> Fach)
+# zugeordnet; pro Jahrgang entstehen hoechstens so viele verschiedene Profile.
+# Kleine Jahrgaenge bekommen damit ein Profil pro Schueler, 10k+ Schueler
+# werden in Bloecken verteilt, ohne pro Schueler Kandidaten zu durchsuchen.
+MAX_PROFILE = 500
+
+# Neue Versuche, wenn ein gezogenes Profil die Pflichtfaecher nicht abdeckt
+PROFIL_VERSUCHE = 20
+
+# Nachbesserung: so viele Runden ueber alle Profile, solange sich etwas verbessert
+VERBESSERUNG_RUNDEN = 20
+
+# ==========================================
+# HILFSFUNKTIONEN
+# ==========================================
+def _freiester(kandidaten, rest):
+    """(schiene, fach) mit den meisten freien Plaetzen; Gleichstand zufaellig."""
+    return max(kandidaten, key=lambda k: (rest[k], random.random()))
+
+def _ziehe_profil(lk_angebot, gk_angebot, rest, lk_anzahl, gk_anzahl, pflicht):
+    """Ein konfliktfreies Wahlprofil {schiene: fach}: jede Schiene hoechstens einmal, jedes Fach hoechstens einmal."""
+    profil = {}
+    faecher = set()
+
+    # LKs: Schienen mit den meisten freien Plaetzen zuerst
+    lk_schienen = sorted(lk_angebot, key=lambda s: -sum(rest[(s, f)] for f in lk_angebot[s]))
+    for s in lk_schienen:
+        if len(profil) == lk_anzahl:
+            break
+        kandidaten = [(s, f) for f in lk_angebot[s] if f not in faecher]
+        if kandidaten:
+            _, fach = _freiester(kandidaten, rest)
+            profil[s] = fach
+            faecher.add(fach)
+    lk_belegt = len(profil)
+
+    # Pflichtfaecher, die nicht schon als LK belegt sind
+    offen = [f for f in pflicht if f not in faecher]
+    random.shuffle(offen)
+    for fach in offen:
+        kandidaten = [(s, fach) for s in gk_angebot if s not in profil and fach in gk_angebot[s]]
+        if not kandidaten:
+            return None
+        s, _ = _freiester(kandidaten, rest)
+        profil[s] = fach
+        faecher.add(fach)
+
+    # Restliche GKs auf die freien Schienen mit den meisten freien Plaetzen
+    gk_belegt = len(profil) - lk_belegt
+    freie = sorted((s for s in gk_angebot if s not in profil),
+                   key=lambda s: -sum(rest[(s, f)] for f in gk_angebot[s]))
+    for s in freie:
+        if gk_belegt >= gk_anzahl:
+            break
+        kandidaten = [(s, f) for f in gk_angebot[s] if f not in faecher]
+        if kandidaten:
+            _, fach = _freiester(kandidaten, rest)
+            profil[s] = fach
+            faecher.add(fach)
+            gk_belegt += 1
+    return profil
+
+def _verbessere(gewaehlt, rest, angebot, gk_angebot, pflicht):
+    """Lokale Suche auf den Profilen: verschiebt einzelne GK-Wahlen, solange die
+    Summe der quadrierten Abweichungen je Kurs (rest^2 / Kursanzahl) sinkt.
+
+    Erlaubt sind: anderes Fach in derselben Schiene (nicht fuer Pflichtfaecher),
+    dasselbe Fach in einer freien Schiene, oder ein anderes Fach in einer freien
+    Schiene (nicht fuer Pflichtfaecher). Liefert die Anzahl der Verschiebungen.
+    """
+    def gewinn(alt, neu, b):
+        ka, kn = len(angebot[alt]), len(angebot[neu])
+        return ((rest[alt] + b) ** 2 - rest[alt] ** 2) / ka + ((rest[neu] - b) ** 2 - rest[neu] ** 2) / kn
+
+    verschoben = 0
+    for _ in range(VERBESSERUNG_RUNDEN):
+        runde = 0
+        for schueler, profil in gewaehlt:
+            b = len(schueler)
+            for schiene in [s for s in profil if s in gk_angebot]:
+                fach = profil[schiene]
+                alt = (schiene, fach)
+                faecher = set(profil.values())
+                ziele = []
+                if fach not in pflicht:
+                    ziele += [(schiene, f) for f in gk_angebot[schiene] if f not in faecher]
+                for frei in gk_angebot:
+                    if frei in profil:
+                        continue
+                    ziele += [(frei, f) for f in gk_angebot[frei]
+                              if f == fach or (fach not in pflicht and f not in faecher)]
+                if not ziele:
+                    continue
+                bestes = min(ziele, key=lambda neu: gewinn(alt, neu, b))
+                if gewinn(alt, bestes, b) < -1e-9:
+                    del profil[schiene]
+                    profil[bestes[0]] = bestes[1]
+                    rest[alt] += b
+                    rest[bestes] -= b
+                    runde += 1
+        verschoben += runde
+        if not runde:
+            break
+    return verschoben
+
+# ==========================================
+# BELEGUNG
+# ==========================================
+def belege_jahrgang(schueler_ids, kurse, lk_anzahl=LK_ANZAHL, gk_anzahl=GK_ANZAHL,
+                    pflicht=PFLICHTFAECHER, max_profile=MAX_PROFILE):
+    """Verteilt die Schueler eines Sek II Jahrgangs schienenkonflikt-frei auf dessen Kurse.
+
+    kurse: Dicts mit 'fach', 'art' ('GK'/'LK') und 'schiene'. Rueckgabe:
+    (belegung, statistik) mit belegung[k_idx] = sortierte Schueler-ids des Kurses.
+
+    1. Pro (schiene, fach) gibt es Kapazitaet = Kursanzahl * Zielgroesse.
+    2. Schuelerbloecke ziehen ein Wahlprofil gewichtet nach freien Plaetzen;
+       so folgt die Nachfrage je Fach/Schiene dem Angebot.
+    3. Innerhalb eines (schiene, fach) werden die Schueler per Slicing reihum
+       auf die Parallelkurse verteilt (Groessen unterscheiden sich um max. 1).
+    """
+    start = time.perf_counter()
+    n = len(schueler_ids)
+    if lk_anzahl == 0:
+        kurse_aktiv = [k_idx for k_idx, c in enumerate(kurse) if c['art'] == 'GK']
+    else:
+        kurse_aktiv = [k_idx for k_idx, c in enumerate(kurse) if c['art'] in ('GK', 'LK')]
+
+    # Listen statt Sets: die Reihenfolge (und damit der Zufallsstrom) darf nicht vom Hash-Seed abhaengen
+    angebot = defaultdict(list) # (schiene, fach) -> [k_idx]
+    lk_angebot = defaultdict(list)
+    gk_angebot = defaultdict(list)
+    for k_idx in kurse_aktiv:
+        c = kurse[k_idx]
+        if not angebot[(c['schiene'], c['fach'])]:
+            (lk_angebot if c['art'] == 'LK' else gk_angebot)[c['schiene']].append(c['fach'])
+        angebot[(c['schiene'], c['fach'])].append(k_idx)
+
+    anzahl_art = defaultdict(int)
+    for k_idx in kurse_aktiv:
+        anzahl_art[kurse[k_idx]['art']] += 1
+    ziel = {
+        'LK': n * lk_anzahl / anzahl_art['LK'] if anzahl_art['LK'] else 0.0,
+        'GK': n * gk_anzahl / anzahl_art['GK'] if anzahl_art['GK'] else 0.0,
+    }
+    rest = {key: len(k_idxs) * ziel[kurse[k_idxs[0]]['art']] for key, k_idxs in angebot.items()}
+
+    # --- Bloecke mit gemeinsamem Wahlprofil ---
+    reihenfolge = list(schueler_ids)
+    random.shuffle(reihenfolge)
+    block = max(1, -(-n // max_profile))
+    soll = lk_anzahl + gk_anzahl
+    gewaehlt = [] # (Schueler-Block, Profil)
+    unvollstaendig = 0
+    for b_start in range(0, n, block):
+        schueler = reihenfolge[b_start:b_start + block]
+        bestes = None
+        for _ in range(PROFIL_VERSUCHE):
+            profil = _ziehe_profil(lk_angebot if lk_anzahl else {}, gk_angebot, rest, lk_anzahl, gk_anzahl, pflicht)
+            if profil is not None and (bestes is None or len(profil) > len(bestes)):
+                bestes = profil
+            if bestes is not None and len(bestes) == soll:
+                break
+        if bestes is None:
+            unvollstaendig += len(schueler)
+            continue
+        if len(bestes) < soll:
+            unvollstaendig += len(schueler)
+        for schiene, fach in bestes.items():
+            rest[(schiene, fach)] -= len(schueler)
+        gewaehlt.append((schueler, bestes))
+
+    verschoben = _verbessere(gewaehlt, rest, angebot, gk_angebot, pflicht)
+
+    zuteilung = defaultdict(list) # (schiene, fach) -> Schueler-ids
+    for schueler, profil in gewaehlt:
+        for schiene, fach in profil.items():
+            zuteilung[(schiene, fach)].extend(schueler)
+
+    # --- Reihum auf die Parallelkurse ---
+    belegung = [[] for _ in kurse]
+    for key, schueler in zuteilung.items():
+        k_idxs = angebot[key]
+        for i, k_idx in enumerate(k_idxs):
+            belegung[k_idx] = sorted(schueler[i::len(k_idxs)])
+
+    laufzeit = time.perf_counter() - start
+    kurs_statistik = []
+    for k_idx in kurse_aktiv:
+        c = kurse[k_idx]
+        kurs_statistik.append({
+            'bez': c.get('bez', str(k_idx)), 'fach': c['fach'], 'art': c['art'], 'schiene': c['schiene'],
+            'schueler': len(belegung[k_idx]), 'ziel': round(ziel[c['art']], 1),
+        })
+    statistik = {
+        'schueler': n, 'kurse': len(kurse_aktiv), 'profile': len(gewaehlt), 'blockgroesse': block,
+        'verschiebungen': verschoben,
+        'unvollstaendig': unvollstaendig, 'laufzeit_s': laufzeit, 'kurs_statistik': kurs_statistik,
+    }
+    for art in ('LK', 'GK'):
+        groessen = [k['schueler'] for k in kurs_statistik if k['art'] == art]
+        if groessen:
+            statistik[art] = {
+                'ziel': ziel[art], 'min': min(groessen), 'max': max(groessen),
+                'mittel': sum(groessen) / len(groessen),
+                'max_abweichung': max(abs(g - ziel[art]) for g in groessen) / ziel[art] if ziel[art] else 0.0,
+            }
+    return belegung, statistik
+
+def print_statistik(jg, statistik, details=False):
+    print(f"Sek II Belegung {jg}: {statistik['schueler']} Schueler auf {statistik['kurse']} Kurse, "
+          f"{statistik['profile']} Wahlprofile (Block {statistik['blockgroesse']}) in {statistik['laufzeit_s']:.3f}s")
+    for art in ('LK', 'GK'):
+        if art in statistik:
+            s = statistik[art]
+            print(f"  {art}: Ziel {s['ziel']:.1f}, min {s['min']}, max {s['max']}, mittel {s['mittel']:.1f}, "
+                  f"max. Abweichung {s['max_abweichung']:.1%}")
+    if statistik['unvollstaendig']:
+        print(f"  WARNUNG: {statistik['unvollstaendig']} Schueler ohne vollstaendige Kurswahl")
+    if details:
+        for k in sorted(statistik['kurs_statistik'], key=lambda k: (k['schiene'], k['bez'])):
+            print(f"    Schiene {k['schiene'] + 1:>2} {k['bez']:<14} {k['schueler']:>4} / {k['ziel']}")
@@ -1,7 +1,11 @@
 import os
+import re
 import csv
-import mysql.connector
-from mysql.connector import Error
+import time
+import queue
+import argparse
+import threading
+from abc import ABC, abstractmethod
 from getpass import getpass
 
 # ==========================================
@@ -13,16 +17,25 @@ DB_USER = 'root'
 # DB_PASSWORD = 'dein_passwort' # Besser interaktiv abfragen oder hier hartkodieren
 DB_NAME = 'db_DigitalesKlassenbuch'
 
+# Verbindungsdaten fuer das PostgreSQL-Backend (z.B. Analyse-Replikat)
+PG_HOST = 'localhost'
+PG_PORT = 5432
+PG_USER = 'postgres'
+PG_DB_NAME = 'db_digitalesklassenbuch'
+
 # Ordner, in dem die CSV-Dateien liegen (relativ zu diesem Skript)
 CSV_DIR = 'db_DigitalesKlassenbuch'
+SCHEMA_FILE = os.path.join(CSV_DIR, '01_schema.sql')
 
 # Die Import-Reihenfolge ist extrem wichtig wegen der Foreign Key Constraints!
 # Von Tabellen ohne Abhängigkeiten hin zu Tabellen mit vielen Abhängigkeiten.
 TABELLEN_REIHENFOLGE = [
     'Schuljahr',
     'Raum',
+    'Wochentag',
     'Fach',
     'Lehrer',
+    'Lehrbefaehigung',
     'Schueler',
     'Abschnitt',
     'Klasse',
@@ -35,109 +48,596 @@ TABELLEN_REIHENFOLGE = [
     'Anwesenheit'
 ]
 
+# Zeilen pro executemany, wenn eine Datei gestreamt statt komplett geladen wird
+BATCH_SIZE = 5000
+
+# Pipeline-Import (--pipeline): so viele fertige Batches darf der Leser-Thread
+# dem Schreiber vorauslaufen, bevor er warten muss (Backpressure)
+PIPELINE_QUEUE_GROESSE = 8
+
 # Mapping der Python-None-Werte zu SQL NULL
 def convert_value(val):
     if val == '' or val is None:
         return None
     return val
 
-def import_csv_data(connection, cursor):
-    print(f"\nStarte Import von {len(TABELLEN_REIHENFOLGE)} Tabellen in die Datenbank '{DB_NAME}'...\n")
-    
-    # Optional: Foreign Key Checks fuer den Import kurz deaktivieren, 
-    # falls es doch mal unvorhergesehene Inkonsistenzen (z.B. Zirkelbezuege) gaebe.
-    # Da unsere CSVs konsistent in der richtigen Reihenfolge sind, ist es nicht zwingend, 
-    # aber "Best Practice" fuer Massenimports.
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
-    
-    erfolgreiche_imports = 0
+def read_csv_batches(file_path, batch_size=BATCH_SIZE):
+    """Liefert die Datenzeilen einer CSV (ohne Header) in Paketen, ohne die Datei komplett zu laden."""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        csv_reader = csv.reader(file, delimiter=';', quotechar='"')
+        next(csv_reader)
+        batch = []
+        for row in csv_reader:
+            batch.append(tuple(convert_value(col) for col in row))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+class BatchPipeline:
+    """Liest, parst und konvertiert eine CSV in einem eigenen Thread.
+
+    Die fertigen Batches landen in einer begrenzten Queue, aus der der
+    aufrufende Thread sie an die Datenbank schickt. So ueberlappen CSV-Arbeit
+    und Warten auf den Server; ist die Queue voll, wartet der Leser.
+    Aus den Wartezeiten beider Seiten ergibt sich, wer der Engpass ist.
+    """
+    _ENDE = object()
+
+    def __init__(self, file_path, batch_size=BATCH_SIZE, queue_groesse=PIPELINE_QUEUE_GROESSE):
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=queue_groesse)
+        self._stop = threading.Event()
+        self._fehler = None
+        self.leser_wartezeit = 0.0      # Queue voll  -> Datenbank kommt nicht hinterher
+        self.schreiber_wartezeit = 0.0  # Queue leer  -> CSV-Verarbeitung kommt nicht hinterher
+        self.fuellstaende = []
+
+    def _put(self, item):
+        # Mit Timeout, damit der Leser aufhoert, wenn der Schreiber abgebrochen hat
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _lesen(self):
+        try:
+            for batch in read_csv_batches(self.file_path, self.batch_size):
+                start = time.perf_counter()
+                if not self._put(batch):
+                    return
+                self.leser_wartezeit += time.perf_counter() - start
+        except Exception as e:  # wird im Schreiber-Thread erneut ausgeloest
+            self._fehler = e
+        self._put(self._ENDE)
+
+    def __iter__(self):
+        leser = threading.Thread(target=self._lesen, name='csv-leser', daemon=True)
+        leser.start()
+        try:
+            while True:
+                self.fuellstaende.append(self._queue.qsize())
+                start = time.perf_counter()
+                batch = self._queue.get()
+                self.schreiber_wartezeit += time.perf_counter() - start
+                if batch is self._ENDE:
+                    break
+                yield batch
+        finally:
+            self._stop.set()
+            leser.join()
+        if self._fehler is not None:
+            raise self._fehler
+
+    def abbrechen(self):
+        """Beendet den Leser-Thread, falls das Senden vorzeitig scheitert."""
+        self._stop.set()
+
+    def bericht(self):
+        if not self.fuellstaende:
+            return ''
+        mittel = sum(self.fuellstaende) / len(self.fuellstaende)
+        if self.leser_wartezeit > self.schreiber_wartezeit:
+            engpass = 'Datenbank (Schreiben)'
+        else:
+            engpass = 'CSV lesen/konvertieren'
+        return (f"Queue im Mittel {mittel:.1f}/{self._queue.maxsize} belegt (max {max(self.fuellstaende)}), "
+                f"Leser wartete {self.leser_wartezeit:.2f}s, Schreiber {self.schreiber_wartezeit:.2f}s "
+                f"-> Engpass: {engpass}")
+
+def csv_dateiname(table_name):
+    # Die Dateinamen im Skript sind lowercase mit Unterstrichen
+    # Mapping z.B. Schuljahr -> schuljahr.csv, LehrerDeputation -> lehrer_deputation.csv
+    file_name = ""
+    for i, char in enumerate(table_name):
+        if char.isupper() and i > 0:
+            file_name += "_" + char.lower()
+        else:
+            file_name += char.lower()
+    return file_name + ".csv"
 
-    for table_name in TABELLEN_REIHENFOLGE:
-        # Die Dateinamen im Skript sind lowercase mit Unterstrichen
-        # Mapping z.B. Schuljahr -> schuljahr.csv, LehrerDeputation -> lehrer_deputation.csv
-        file_name = ""
-        for i, char in enumerate(table_name):
-            if char.isupper() and i > 0:
-                file_name += "_" + char.lower()
+# ==========================================
+# SCHEMA-UEBERSETZUNG MySQL -> PostgreSQL
+# ==========================================
+def split_top_level(text, sep=','):
+    """Trennt `text` an `sep`, aber nicht innerhalb von Klammern oder Strings.
+
+    Zerlegt den Rumpf eines CREATE TABLE in Spalten/Constraints und die Werte
+    eines ENUM(...); auch convert_mysql_to_sqlite.py nutzt das. Die Teile
+    kommen ohne umgebende Leerzeichen zurueck, z.B.
+    "a INT, CHECK (a IN (1, 2)), b ENUM('x,y')" -> ['a INT', 'CHECK (a IN (1, 2))', "b ENUM('x,y')"].
+    """
+    teile, aktuell, depth, in_string = [], '', 0, False
+    for char in text:
+        if char == "'":
+            in_string = not in_string
+        elif not in_string:
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif char == sep and depth == 0:
+                teile.append(aktuell.strip())
+                aktuell = ''
+                continue
+        aktuell += char
+    if aktuell.strip():
+        teile.append(aktuell.strip())
+    return teile
+
+def _spalte_zu_postgres(definition):
+    spalte = definition.split()[0]
+
+    # id INT PRIMARY KEY AUTO_INCREMENT -> Identity-Spalte (Sequenz wird nach dem Import nachgezogen)
+    definition = re.sub(r'\bINT\s+PRIMARY\s+KEY\s+AUTO_INCREMENT\b',
+                        'INT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY', definition, flags=re.I)
+
+    # ENUM('a', 'b') -> VARCHAR(n) + CHECK (spalte IN ('a', 'b'))
+    enum_match = re.search(r'\bENUM\s*\(([^)]*)\)', definition, flags=re.I)
+    if enum_match:
+        werte = split_top_level(enum_match.group(1))
+        laenge = max(len(w.strip("'")) for w in werte)
+        definition = definition[:enum_match.start()] + f'VARCHAR({laenge})' + definition[enum_match.end():]
+        definition += f" CHECK ({spalte} IN ({', '.join(werte)}))"
+
+    # BOOLEAN bleibt BOOLEAN: Postgres akzeptiert die 1/0-Werte aus den CSVs direkt.
+    return definition
+
+def mysql_schema_zu_postgres(schema_sql):
+    """Uebersetzt 01_schema.sql in PostgreSQL-DDL.
+
+    ENUMs werden zu VARCHAR mit CHECK, AUTO_INCREMENT zu Identity-Spalten,
+    Inline-INDEX/KEY zu separaten CREATE INDEX und alle Foreign Keys werden
+    DEFERRABLE, damit sie waehrend des Imports erst beim COMMIT greifen.
+    """
+    ohne_kommentare = re.sub(r'--[^\n]*', '', schema_sql)
+    tabellen, indizes = [], []
+
+    for statement in ohne_kommentare.split(';'):
+        match = re.match(r'\s*CREATE\s+TABLE\s+(\w+)\s*\((.*)\)\s*$', statement, flags=re.I | re.S)
+        if not match:
+            continue
+        table_name, body = match.group(1), match.group(2)
+
+        eintraege = []
+        for item in split_top_level(body):
+            item = ' '.join(item.split())
+            index_match = re.match(r'(?:INDEX|KEY)\s+(\w+)\s*(\(.*\))$', item, flags=re.I)
+            if index_match:
+                indizes.append(f"CREATE INDEX {index_match.group(1)} ON {table_name} {index_match.group(2)};")
+            elif re.match(r'FOREIGN\s+KEY\b', item, flags=re.I):
+                eintraege.append(item + ' DEFERRABLE INITIALLY DEFERRED')
+            elif re.match(r'(PRIMARY\s+KEY|UNIQUE|CHECK|CONSTRAINT)\b', item, flags=re.I):
+                eintraege.append(item)
             else:
-                file_name += char.lower()
-        file_name += ".csv"
-        
-        file_path = os.path.join(CSV_DIR, file_name)
-        
+                eintraege.append(_spalte_zu_postgres(item))
+
+        tabellen.append(f"CREATE TABLE {table_name} (\n    " + ",\n    ".join(eintraege) + "\n);")
+
+    return "\n\n".join(tabellen + indizes) + "\n"
+
+# ==========================================
+# BACKENDS
+# ==========================================
+class ImportBackend(ABC):
+    """Schnittstelle fuer ein Ziel-Datenbanksystem.
+
+    `import_csv_data` kennt nur diese Methoden; alles Dialekt-spezifische
+    (Verbindung, Constraint-Handling, Ladeverfahren) steckt in den Unterklassen.
+    Fehlt einer Unterklasse eine abstrakte Methode, scheitert schon das Anlegen.
+    """
+    name = ''
+    db_name = ''
+    Error = Exception
+    pipeline = False         # Lesen und Senden ueberlappend (siehe BatchPipeline)
+    letzte_pipeline = None   # BatchPipeline der zuletzt geladenen Tabelle, fuer den Bericht
+
+    @abstractmethod
+    def connect(self, password):
+        pass
+
+    def server_info(self):
+        return ''
+
+    @abstractmethod
+    def create_schema(self, schema_sql):
+        pass
+
+    @abstractmethod
+    def run_sql(self, sql):
+        """Fuehrt ein SQL-Skript im Dialekt des Backends aus."""
+
+    def begin_import(self):
+        pass
+
+    @abstractmethod
+    def load_table(self, table_name, headers, file_path):
+        """Laedt eine CSV-Datei und gibt die Anzahl importierter Zeilen zurueck."""
+
+    def end_import(self, tabellen):
+        pass
+
+    def tausche_partition(self, table_name, partition, von, bis, headers, file_path):
+        """Laedt eine CSV in eine Staging-Tabelle und tauscht sie gegen die Partition aus.
+
+        Die uebrigen Partitionen bleiben unberuehrt; gibt die Zeilenzahl zurueck.
+        Optional: wer sie nicht ueberschreibt, meldet einen verstaendlichen Fehler.
+        """
+        raise NotImplementedError(f"Backend '{self.name}' unterstuetzt keinen Partitionstausch "
+                                  f"(import_partitionen.py braucht MySQL oder PostgreSQL).")
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+class MySQLBackend(ImportBackend):
+    name = 'MySQL'
+    db_name = DB_NAME
+
+    def __init__(self):
+        import mysql.connector
+        from mysql.connector import Error
+        self._connector = mysql.connector
+        self.Error = Error
+        self.connection = None
+        self.cursor = None
+
+    def connect(self, password):
+        self.connection = self._connector.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=password,
+            database=DB_NAME
+        )
+        self.cursor = self.connection.cursor()
+
+    def server_info(self):
+        return self.connection.get_server_info()
+
+    def create_schema(self, schema_sql):
+        self.run_sql(schema_sql)
+
+    def run_sql(self, sql):
+        for statement in sql.split(';'):
+            if statement.strip():
+                self.cursor.execute(statement)
+        self.connection.commit()
+
+    def begin_import(self):
+        # Optional: Foreign Key Checks fuer den Import kurz deaktivieren,
+        # falls es doch mal unvorhergesehene Inkonsistenzen (z.B. Zirkelbezuege) gaebe.
+        # Da unsere CSVs konsistent in der richtigen Reihenfolge sind, ist es nicht zwingend,
+        # aber "Best Practice" fuer Massenimports.
+        self.cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+
+    def load_table(self, table_name, headers, file_path):
+        # Baue den INSERT Befehl dynamisch
+        # z.B. INSERT INTO Lehrer (id, kuerzel, vorname) VALUES (%s, %s, %s)
+        placeholders = ', '.join(['%s'] * len(headers))
+        columns = ', '.join(headers)
+        sql = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+
+        if self.pipeline:
+            return self._load_table_pipeline(sql, file_path)
+
+        with open(file_path, 'r', encoding='utf-8') as file:
+            csv_reader = csv.reader(file, delimiter=';', quotechar='"')
+            next(csv_reader)
+            # Leere Strings ("") in den CSVs zu SQL NULL konvertieren
+            data_to_insert = [tuple(convert_value(col) for col in row) for row in csv_reader]
+
+        if not data_to_insert:
+            return 0
+
+        try:
+            # Massen-Insert für die gesamte Tabelle (sehr schnell)
+            self.cursor.executemany(sql, data_to_insert)
+            self.connection.commit()
+        except self.Error:
+            self.connection.rollback()
+            raise
+        return len(data_to_insert)
+
+    def _load_table_pipeline(self, sql, file_path):
+        # Ein Commit am Ende, damit eine Tabelle wie bisher ganz oder gar nicht importiert wird
+        self.letzte_pipeline = BatchPipeline(file_path)
+        anzahl = 0
+        try:
+            for batch in self.letzte_pipeline:
+                self.cursor.executemany(sql, batch)
+                anzahl += len(batch)
+            self.connection.commit()
+        except self.Error:
+            self.letzte_pipeline.abbrechen()
+            self.connection.rollback()
+            raise
+        return anzahl
+
+    def end_import(self, tabellen):
+        # Constraints wieder aktivieren
+        self.cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+
+    def tausche_partition(self, table_name, partition, von, bis, headers, file_path):
+        staging = f"{table_name}_{partition}_neu"
+        placeholders = ', '.join(['%s'] * len(headers))
+        sql = f"INSERT INTO {staging} ({', '.join(headers)}) VALUES ({placeholders})"
+
+        self.cursor.execute(f"DROP TABLE IF EXISTS {staging};")
+        self.cursor.execute(f"CREATE TABLE {staging} LIKE {table_name};")
+        self.cursor.execute(f"ALTER TABLE {staging} REMOVE PARTITIONING;")
+        anzahl = 0
+        batches = BatchPipeline(file_path) if self.pipeline else read_csv_batches(file_path)
+        try:
+            for batch in batches:
+                self.cursor.executemany(sql, batch)
+                anzahl += len(batch)
+            self.connection.commit()
+            # EXCHANGE prueft, dass alle Zeilen in den Wertebereich der Partition fallen.
+            # Danach liegt der alte Partitionsinhalt in der Staging-Tabelle.
+            self.cursor.execute(f"ALTER TABLE {table_name} EXCHANGE PARTITION {partition} WITH TABLE {staging};")
+        except self.Error:
+            if self.pipeline:
+                batches.abbrechen()
+            self.connection.rollback()
+            raise
+        finally:
+            self.cursor.execute(f"DROP TABLE IF EXISTS {staging};")
+        return anzahl
+
+    def close(self):
+        if self.connection is not None and self.connection.is_connected():
+            self.cursor.close()
+            self.connection.close()
+            print("MySQL-Verbindung wurde geschlossen.")
+
+
+class PostgresBackend(ImportBackend):
+    """Laedt die CSVs per `COPY ... FROM STDIN` (gestreamt, ohne Zwischenspeicher).
+
+    Der gesamte Import laeuft in einer Transaktion mit aufgeschobenen
+    Constraints; jede Tabelle bekommt einen SAVEPOINT, damit eine fehlerhafte
+    Datei die anderen nicht mitreisst. Die Foreign Keys werden erst beim
+    abschliessenden COMMIT geprueft.
+    """
+    name = 'PostgreSQL'
+    db_name = PG_DB_NAME
+
+    def __init__(self):
+        import psycopg2
+        self._psycopg2 = psycopg2
+        self.Error = psycopg2.Error
+        self.connection = None
+        self.cursor = None
+
+    def connect(self, password):
+        self.connection = self._psycopg2.connect(
+            host=PG_HOST,
+            port=PG_PORT,
+            user=PG_USER,
+            password=password,
+            dbname=PG_DB_NAME
+        )
+        self.cursor = self.connection.cursor()
+
+    def server_info(self):
+        return self.connection.server_version
+
+    def create_schema(self, schema_sql):
+        self.run_sql(mysql_schema_zu_postgres(schema_sql))
+
+    def run_sql(self, sql):
+        self.cursor.execute(sql)
+        self.connection.commit()
+
+    def begin_import(self):
+        self.cursor.execute("SET CONSTRAINTS ALL DEFERRED;")
+
+    def load_table(self, table_name, headers, file_path):
+        columns = ', '.join(headers)
+        sql = (f"COPY {table_name} ({columns}) FROM STDIN "
+               f"WITH (FORMAT csv, DELIMITER ';', QUOTE '\"', HEADER true)")
+
+        self.cursor.execute("SAVEPOINT tabellen_import;")
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                # copy_expert liest die Datei blockweise -> konstanter Speicherbedarf
+                self.cursor.copy_expert(sql, file)
+        except self.Error:
+            self.cursor.execute("ROLLBACK TO SAVEPOINT tabellen_import;")
+            raise
+        self.cursor.execute("RELEASE SAVEPOINT tabellen_import;")
+        return self.cursor.rowcount
+
+    def end_import(self, tabellen):
+        # Identity-Sequenzen hinter die groesste importierte id setzen,
+        # sonst kollidieren spaetere INSERTs ohne explizite id.
+        for table_name, headers in tabellen:
+            if 'id' not in headers:
+                continue
+            self.cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+                f"FROM {table_name};",
+                (table_name.lower(),)
+            )
+        # Erst hier werden die aufgeschobenen Foreign Keys geprueft
+        try:
+            self.connection.commit()
+        except self.Error:
+            self.connection.rollback()
+            raise
+
+    def tausche_partition(self, table_name, partition, von, bis, headers, file_path):
+        tabelle = table_name.lower()
+        alt, staging = f"{tabelle}_{partition}", f"{tabelle}_{partition}_neu"
+        columns = ', '.join(headers)
+        try:
+            self.cursor.execute(f"DROP TABLE IF EXISTS {staging};")
+            self.cursor.execute(f"CREATE TABLE {staging} (LIKE {tabelle} INCLUDING DEFAULTS INCLUDING CONSTRAINTS);")
+            with open(file_path, 'r', encoding='utf-8') as file:
+                self.cursor.copy_expert(
+                    f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv, DELIMITER ';', QUOTE '\"', HEADER true)", file)
+            anzahl = self.cursor.rowcount
+            # Tausch in derselben Transaktion: Leser sehen entweder die alte oder die neue Partition
+            self.cursor.execute(f"ALTER TABLE {tabelle} DETACH PARTITION {alt};")
+            if von is None or bis is None:
+                self.cursor.execute(f"ALTER TABLE {tabelle} ATTACH PARTITION {staging} DEFAULT;")
+            else:
+                self.cursor.execute(f"ALTER TABLE {tabelle} ATTACH PARTITION {staging} FOR VALUES FROM (%s) TO (%s);",
+                                    (von.isoformat(), bis.isoformat()))
+            self.cursor.execute(f"DROP TABLE {alt};")
+            self.cursor.execute(f"ALTER TABLE {staging} RENAME TO {alt};")
+            self.connection.commit()
+        except self.Error:
+            self.connection.rollback()
+            raise
+        return anzahl
+
+    def close(self):
+        if self.connection is not None and not self.connection.closed:
+            self.cursor.close()
+            self.connection.close()
+            print("PostgreSQL-Verbindung wurde geschlossen.")
+
+
+BACKENDS = {
+    'mysql': MySQLBackend,
+    'postgres': PostgresBackend,
+}
+
+# ==========================================
+# IMPORT
+# ==========================================
+def import_csv_data(backend, csv_dir=CSV_DIR, tabellen=TABELLEN_REIHENFOLGE):
+    print(f"\nStarte Import von {len(tabellen)} Tabellen in die Datenbank '{backend.db_name}'...\n")
+
+    backend.begin_import()
+
+    erfolgreiche_imports = 0
+    importierte_tabellen = []
+
+    for table_name in tabellen:
+        file_name = csv_dateiname(table_name)
+        file_path = os.path.join(csv_dir, file_name)
+
         if not os.path.exists(file_path):
             print(f"WARNUNG: Datei {file_name} nicht gefunden. Ueberspringe Tabelle {table_name}.")
             continue
 
         with open(file_path, 'r', encoding='utf-8') as file:
-            csv_reader = csv.reader(file, delimiter=';', quotechar='"')
-            headers = next(csv_reader) # Erste Zeile sind die Spaltennamen
-            
-            # Baue den INSERT Befehl dynamisch
-            # z.B. INSERT INTO Lehrer (id, kuerzel, vorname) VALUES (%s, %s, %s)
-            placeholders = ', '.join(['%s'] * len(headers))
-            columns = ', '.join(headers)
-            sql = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-            
-            data_to_insert = []
-            for row in csv_reader:
-                # Leere Strings ("") in den CSVs zu SQL NULL konvertieren
-                processed_row = tuple(convert_value(col) for col in row)
-                data_to_insert.append(processed_row)
-            
-            if not data_to_insert:
-                print(f"INFO: Tabelle {table_name} - CSV Datei ist leer.")
-                continue
+            headers = next(csv.reader(file, delimiter=';', quotechar='"')) # Erste Zeile sind die Spaltennamen
 
-            try:
-                # Massen-Insert für die gesamte Tabelle (sehr schnell)
-                cursor.executemany(sql, data_to_insert)
-                connection.commit()
-                print(f"ERFOLG: {len(data_to_insert)} Zeilen in '{table_name}' importiert.")
-                erfolgreiche_imports += 1
-            except Error as e:
-                connection.rollback()
-                print(f"FEHLER beim Importieren von '{table_name}': {e}")
-                
-    # Constraints wieder aktivieren
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
-    print(f"\nImport abgeschlossen. {erfolgreiche_imports} von {len(TABELLEN_REIHENFOLGE)} Tabellen befuellt.")
+        backend.letzte_pipeline = None
+        start = time.perf_counter()
+        try:
+            anzahl = backend.load_table(table_name, headers, file_path)
+        except backend.Error as e:
+            print(f"FEHLER beim Importieren von '{table_name}': {e}")
+            continue
+        dauer = time.perf_counter() - start
+
+        if not anzahl:
+            print(f"INFO: Tabelle {table_name} - CSV Datei ist leer.")
+            continue
+
+        print(f"ERFOLG: {anzahl} Zeilen in '{table_name}' importiert ({dauer:.2f}s, {anzahl / max(dauer, 1e-9):.0f} Zeilen/s).")
+        if backend.letzte_pipeline is not None:
+            print(f"        Pipeline: {backend.letzte_pipeline.bericht()}")
+        erfolgreiche_imports += 1
+        importierte_tabellen.append((table_name, headers))
+
+    try:
+        backend.end_import(importierte_tabellen)
+    except backend.Error as e:
+        print(f"\nFEHLER beim Abschluss des Imports (Constraints/Sequenzen): {e}")
+        print("Alle Aenderungen dieses Laufs wurden zurueckgerollt.")
+        return
+
+    print(f"\nImport abgeschlossen. {erfolgreiche_imports} von {len(tabellen)} Tabellen befuellt.")
 
 def main():
-    print("=== MySQL CSV Import-Tool fuer das Digitale Klassenbuch ===")
-    
-    db_pass = input(f"Passwort fuer MySQL-User '{DB_USER}': ")
+    parser = argparse.ArgumentParser(description="CSV Import-Tool fuer das Digitale Klassenbuch")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='mysql',
+                        help="Ziel-Datenbanksystem (Standard: mysql)")
+    parser.add_argument('--schema', action='store_true',
+                        help="Vor dem Import die Tabellen aus 01_schema.sql anlegen")
+    parser.add_argument('--csv-dir', default=CSV_DIR,
+                        help="Ordner mit den CSVs (z.B. ein Delta aus dem Append-Modus des Generators)")
+    parser.add_argument('--print-schema', action='store_true',
+                        help="Nur die uebersetzte PostgreSQL-DDL ausgeben, nichts importieren")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="CSV-Lesen und Senden in getrennten Threads ueberlappen (MySQL)")
+    args = parser.parse_args()
+
+    if args.print_schema:
+        with open(SCHEMA_FILE, 'r', encoding='utf-8') as f:
+            print(mysql_schema_zu_postgres(f.read()))
+        return
 
     try:
-        connection = mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=db_pass,
-            database=DB_NAME
-        )
-        
-        if connection.is_connected():
-            db_info = connection.get_server_info()
-            print(f"Verbindung zu MySQL Server (Version {db_info}) erfolgreich aufgebaut.")
-            
-            cursor = connection.cursor()
-            
-            # Wir trauen uns nicht, die Tabellen pauschal zu loeschen (TRUNCATE),
-            # da dies destruktiv ist. Der Import geht davon aus, dass die Tabellen
-            # leer oder frisch erzeugt (01_schema.sql) sind.
-            
-            import_csv_data(connection, cursor)
-
-    except Error as e:
+        backend = BACKENDS[args.backend]()
+    except ImportError as e:
+        print(f"KRITISCHER FEHLER: Datenbank-Treiber fuer '{args.backend}' fehlt ({e}).")
+        print("Hinweis: pip install mysql-connector-python bzw. pip install psycopg2-binary")
+        return
+    print(f"=== {backend.name} CSV Import-Tool fuer das Digitale Klassenbuch ===")
+    if args.pipeline:
+        if args.backend == 'postgres':
+            # COPY liest die Datei bereits gestreamt ein, es gibt nichts zu ueberlappen
+            print("HINWEIS: --pipeline wirkt nur beim MySQL-Backend, PostgreSQL nutzt COPY.")
+        backend.pipeline = True
+
+    db_user = PG_USER if args.backend == 'postgres' else DB_USER
+    db_pass = input(f"Passwort fuer {backend.name}-User '{db_user}': ")
+
+    try:
+        backend.connect(db_pass)
+        print(f"Verbindung zu {backend.name} Server (Version {backend.server_info()}) erfolgreich aufgebaut.")
+
+        if args.schema:
+            with open(SCHEMA_FILE, 'r', encoding='utf-8') as f:
+                backend.create_schema(f.read())
+            print("Schema aus 01_schema.sql angelegt.")
+
+        # Wir trauen uns nicht, die Tabellen pauschal zu loeschen (TRUNCATE),
+        # da dies destruktiv ist. Der Import geht davon aus, dass die Tabellen
+        # leer oder frisch erzeugt (01_schema.sql) sind.
+
+        import_csv_data(backend, args.csv_dir)
+
+    except backend.Error as e:
         print(f"\nKRITISCHER FEHLER beim Verbinden zur Datenbank: {e}")
-        print("Hinweis: Stelle sicher, dass der MySQL/MariaDB Server laeuft,")
-        print("         die Datenbank 'db_DigitalesKlassenbuch' angelegt ist (via 01_schema.sql),")
-        print("         und das Paket 'mysql-connector-python' installiert ist (pip install mysql-connector-python).")
+        print(f"Hinweis: Stelle sicher, dass der {backend.name} Server laeuft,")
+        print(f"         die Datenbank '{backend.db_name}' angelegt ist (via 01_schema.sql bzw. --schema),")
+        print("         und der passende Treiber installiert ist "
+              "(pip install mysql-connector-python bzw. pip install psycopg2-binary).")
     finally:
-        if 'connection' in locals() and connection.is_connected():
-            cursor.close()
-            connection.close()
-            print("MySQL-Verbindung wurde geschlossen.")
+        backend.close()
 
 if __name__ == '__main__':
     main()
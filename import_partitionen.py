@@ -0,0 +1,202 @@
+import os
+import argparse
+
+from import_csv_to_db import BACKENDS, CSV_DIR, TABELLEN_REIHENFOLGE, import_csv_data, mysql_schema_zu_postgres
+# Partitionsgrenzen und Shard-Namen teilt sich der Importer mit dem Generator
+from db_DigitalesKlassenbuch.partitionierung import (PARTITIONEN_DIR, PARTITIONIERTE_TABELLEN, REST_PARTITION,
+                                                     partitionen, shard_pfad)
+
+# ==========================================
+# KONFIGURATION
+# ==========================================
+# Spalten in MySQL-Syntax. Gegenueber 01_schema.sql gilt:
+# - der Partitionsschluessel `datum` muss in jedem PRIMARY KEY / UNIQUE stecken,
+# - Anwesenheit bekommt `datum` denormalisiert aus Unterrichtsstunde,
+# - keine Foreign Keys zwischen den beiden Tabellen (sonst waere kein Partitionstausch moeglich).
+UNTERRICHTSSTUNDE_SPALTEN = """
+    id INT NOT NULL,
+    stundenplan_id INT NOT NULL,
+    datum DATE NOT NULL,
+    status ENUM('geplant', 'gehalten', 'entfallen', 'vertretung', 'verlegt') NOT NULL DEFAULT 'gehalten',
+    thema VARCHAR(500) NULL,
+    hausaufgaben TEXT NULL,
+    vertretungslehrer_id INT NULL,
+    tatsaechlicher_raum_id INT NULL,
+    tatsaechliche_stunde INT NULL,
+    ist_klausur BOOLEAN NOT NULL DEFAULT FALSE,
+    notiz TEXT NULL,
+    CHECK (tatsaechliche_stunde IS NULL OR tatsaechliche_stunde BETWEEN 1 AND 9),
+    PRIMARY KEY (id, datum),
+    UNIQUE (stundenplan_id, datum),
+    INDEX idx_unterrichtsstunde_datum (datum)"""
+
+ANWESENHEIT_SPALTEN = """
+    id INT NOT NULL,
+    unterrichtsstunde_id INT NOT NULL,
+    schueler_id INT NOT NULL,
+    datum DATE NOT NULL,
+    status ENUM(
+        'anwesend',
+        'fehlend_unentschuldigt',
+        'fehlend_entschuldigt',
+        'verspaetet',
+        'beurlaubt'
+    ) NOT NULL DEFAULT 'anwesend',
+    verspaetung_minuten INT NOT NULL DEFAULT 0,
+    entschuldigungsstatus ENUM('offen', 'eingereicht', 'anerkannt', 'abgelehnt') NULL,
+    anmerkung TEXT NULL,
+    CHECK (verspaetung_minuten >= 0),
+    PRIMARY KEY (id, datum),
+    UNIQUE (unterrichtsstunde_id, schueler_id, datum),
+    INDEX idx_anwesenheit_schueler (schueler_id, datum)"""
+
+# MySQL erlaubt keine Foreign Keys auf partitionierten Tabellen; PostgreSQL schon
+# (nur Verweise auf nicht partitionierte Tabellen).
+POSTGRES_FOREIGN_KEYS = {
+    'Unterrichtsstunde': [
+        "FOREIGN KEY (stundenplan_id) REFERENCES Stundenplan(id) ON DELETE CASCADE",
+        "FOREIGN KEY (vertretungslehrer_id) REFERENCES Lehrer(id) ON DELETE SET NULL",
+        "FOREIGN KEY (tatsaechlicher_raum_id) REFERENCES Raum(id) ON DELETE SET NULL",
+    ],
+    'Anwesenheit': [
+        "FOREIGN KEY (schueler_id) REFERENCES Schueler(id) ON DELETE CASCADE",
+    ],
+}
+
+SPALTEN = {'Unterrichtsstunde': UNTERRICHTSSTUNDE_SPALTEN, 'Anwesenheit': ANWESENHEIT_SPALTEN}
+
+# ==========================================
+# SCHEMA
+# ==========================================
+def partitioniertes_schema(backend_name, grenzen, neu=False):
+    """DDL fuer partitionierte Varianten von Unterrichtsstunde und Anwesenheit.
+
+    Setzt die uebrigen Tabellen aus 01_schema.sql voraus. Bestehende Tabellen
+    (samt Daten) werden nur mit `neu=True` vorher geloescht; sonst scheitert
+    das CREATE TABLE, wenn es sie schon gibt.
+    """
+    if backend_name == 'mysql':
+        sql = []
+        if neu:
+            sql = ["SET FOREIGN_KEY_CHECKS = 0;", "DROP TABLE IF EXISTS Anwesenheit;",
+                   "DROP TABLE IF EXISTS Unterrichtsstunde;", "SET FOREIGN_KEY_CHECKS = 1;"]
+        for table_name in PARTITIONIERTE_TABELLEN:
+            spalten = SPALTEN[table_name].replace('id INT NOT NULL,', 'id INT NOT NULL AUTO_INCREMENT,', 1)
+            teile = [f"    PARTITION {name} VALUES LESS THAN ('{bis.isoformat()}')" for name, _, bis in grenzen if bis]
+            teile.append(f"    PARTITION {REST_PARTITION} VALUES LESS THAN (MAXVALUE)")
+            sql.append(f"CREATE TABLE {table_name} ({spalten}\n)\nPARTITION BY RANGE COLUMNS (datum) (\n"
+                       + ",\n".join(teile) + "\n);")
+        return "\n\n".join(sql) + "\n"
+
+    if backend_name == 'postgres':
+        sql = []
+        if neu:
+            sql = ["DROP TABLE IF EXISTS Anwesenheit CASCADE;", "DROP TABLE IF EXISTS Unterrichtsstunde CASCADE;"]
+        for table_name in PARTITIONIERTE_TABELLEN:
+            fks = ''.join(f",\n    {fk}" for fk in POSTGRES_FOREIGN_KEYS[table_name])
+            ddl = mysql_schema_zu_postgres(f"CREATE TABLE {table_name} ({SPALTEN[table_name]}{fks}\n);")
+            sql.append(ddl.replace("\n);", "\n) PARTITION BY RANGE (datum);", 1).strip())
+            for name, von, bis in grenzen:
+                partition = f"{table_name.lower()}_{name}"
+                if von is None:
+                    sql.append(f"CREATE TABLE {partition} PARTITION OF {table_name} DEFAULT;")
+                else:
+                    sql.append(f"CREATE TABLE {partition} PARTITION OF {table_name} "
+                               f"FOR VALUES FROM ('{von.isoformat()}') TO ('{bis.isoformat()}');")
+        return "\n\n".join(sql) + "\n"
+
+    raise ValueError(f"Unbekanntes Backend '{backend_name}'")
+
+# ==========================================
+# IMPORT
+# ==========================================
+def import_partitionen(backend, csv_dir, art, nur_partition=None):
+    """Laedt jede Partition einzeln (Staging-Tabelle + Partitionstausch).
+
+    Mit `nur_partition` wird genau diese Partition neu geladen und
+    eingetauscht, alle anderen Partitionen und Tabellen bleiben unberuehrt.
+    """
+    grenzen = partitionen(csv_dir, art)
+    if nur_partition and nur_partition not in [name for name, _, _ in grenzen]:
+        print(f"FEHLER: Partition '{nur_partition}' gibt es bei Partitionierung '{art}' nicht.")
+        return
+
+    getauscht = 0
+    for table_name in PARTITIONIERTE_TABELLEN:
+        for name, von, bis in grenzen:
+            if nur_partition and name != nur_partition:
+                continue
+            file_path = shard_pfad(csv_dir, table_name, name)
+            if not os.path.exists(file_path):
+                if nur_partition:
+                    print(f"WARNUNG: {file_path} nicht gefunden. Ueberspringe {table_name}/{name}.")
+                continue
+
+            with open(file_path, 'r', encoding='utf-8') as file:
+                headers = next(csv.reader(file, delimiter=';', quotechar='"'))
+            try:
+                anzahl = backend.tausche_partition(table_name, name, von, bis, headers, file_path)
+            except backend.Error as e:
+                print(f"FEHLER beim Tausch von '{table_name}' Partition {name}: {e}")
+                continue
+            print(f"ERFOLG: {anzahl} Zeilen in '{table_name}' Partition {name} eingetauscht.")
+            getauscht += 1
+
+    print(f"\nPartitions-Import abgeschlossen. {getauscht} Partitionen eingetauscht.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Partitionierter Import von Unterrichtsstunde/Anwesenheit")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='mysql',
+                        help="Ziel-Datenbanksystem (Standard: mysql)")
+    parser.add_argument('--art', choices=['monat', 'abschnitt'], default='monat',
+                        help="Partitionierung nach Monat oder Abschnitt (Standard: monat)")
+    parser.add_argument('--csv-dir', default=CSV_DIR, help="Ordner mit den CSVs und dem Unterordner 'partitionen'")
+    parser.add_argument('--schema', action='store_true',
+                        help="Unterrichtsstunde/Anwesenheit vorher als partitionierte Tabellen anlegen")
+    parser.add_argument('--neu', action='store_true',
+                        help="Mit --schema: bestehende Unterrichtsstunde/Anwesenheit samt Daten vorher loeschen")
+    parser.add_argument('--print-schema', action='store_true', help="Nur die DDL ausgeben, nichts importieren")
+    parser.add_argument('--partition', default=None,
+                        help="Nur diese Partition (z.B. p2026_09 oder a1) neu laden und eintauschen")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="CSV-Lesen und Senden in getrennten Threads ueberlappen (MySQL)")
+    args = parser.parse_args()
+
+    if args.print_schema:
+        print(partitioniertes_schema(args.backend, partitionen(args.csv_dir, args.art), args.neu))
+        return
+
+    try:
+        backend = BACKENDS[args.backend]()
+    except ImportError as e:
+        print(f"KRITISCHER FEHLER: Datenbank-Treiber fuer '{args.backend}' fehlt ({e}).")
+        return
+    backend.pipeline = args.pipeline
+    db_pass = input(f"Passwort fuer {backend.name}: ")
+
+    try:
+        backend.connect(db_pass)
+        if args.schema:
+            try:
+                backend.run_sql(partitioniertes_schema(args.backend, partitionen(args.csv_dir, args.art), args.neu))
+            except backend.Error as e:
+                if args.neu:
+                    raise
+                print(f"FEHLER: Partitionierte Tabellen konnten nicht angelegt werden ({e}).")
+                print("HINWEIS: Bestehende Tabellen Unterrichtsstunde/Anwesenheit werden nur mit --neu "
+                      "geloescht und neu angelegt (ihre Daten gehen dabei verloren).")
+                return
+            print("Partitionierte Tabellen angelegt.")
+
+        if not args.partition:
+            # Alle anderen Tabellen wie gewohnt, die grossen Tabellen danach partitionsweise
+            andere = [t for t in TABELLEN_REIHENFOLGE if t not in PARTITIONIERTE_TABELLEN]
+            import_csv_data(backend, args.csv_dir, andere)
+        import_partitionen(backend, args.csv_dir, args.art, args.partition)
+    except (backend.Error, NotImplementedError) as e:
+        print(f"\nKRITISCHER FEHLER: {e}")
+    finally:
+        backend.close()
+
+if __name__ == '__main__':
+    main()
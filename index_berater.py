@@ -0,0 +1,360 @@
+import os
+import re
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import statistics
+from datetime import timedelta
+from collections import defaultdict
+
+from import_csv_to_db import DB_USER
+from lasttest_klassenbuch import (ABFRAGEN, LESE_MIX, SCHULJAHR_ID, SQLITE_DB, MySQLZiel, SQLiteZiel,
+                                  lade_workload_daten, lese_operation)
+
+# ==========================================
+# KONFIGURATION
+# ==========================================
+# Wie oft jede Abfrage je erfasster Unterrichtsstunde laeuft (wie im Lasttest)
+GEWICHTE = {'aktuelle_stunde': 1.0, 'kursliste': 1.0, **LESE_MIX}
+
+PARAMETER_SAETZE = 20  # verschiedene Parameter je Abfrage, damit kein Einzelfall gemessen wird
+WIEDERHOLUNGEN = 5     # Median ueber so viele Messlaeufe
+
+# Empfohlen wird ein Index, wenn er - zusaetzlich zu den schon gewaehlten - die gewichtete
+# Gesamtlaufzeit aller Abfragen um mindestens so viel Prozent senkt. Einzelne sehr schnelle
+# Abfragen schwanken zu stark, um allein darueber zu entscheiden.
+MIN_GEWINN_PROZENT = 5
+
+# ==========================================
+# DIALEKTE
+# ==========================================
+class SQLiteAnalyse:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def analysieren(self, tabellen):
+        self.conn.execute("ANALYZE")
+
+    def plan(self, sql, params):
+        """Zeilen von EXPLAIN QUERY PLAN; True, wenn eine Tabelle komplett gelesen wird."""
+        zeilen = [row[3] for row in self.conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        scan = any(re.match(r'SCAN (TABLE )?\w+( AS \w+)?$', z) for z in zeilen)
+        return zeilen, scan
+
+    def vorhandene_indizes(self):
+        indizes = defaultdict(list)
+        for (tabelle,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+            pk = [row[1] for row in sorted(self.conn.execute(f"PRAGMA table_info({tabelle})"), key=lambda r: r[5]) if row[5]]
+            if pk:
+                indizes[tabelle.lower()].append(tuple(c.lower() for c in pk))
+            for index in self.conn.execute(f"PRAGMA index_list({tabelle})").fetchall():
+                spalten = [row[2] for row in self.conn.execute(f"PRAGMA index_info({index[1]})")]
+                indizes[tabelle.lower()].append(tuple(c.lower() for c in spalten))
+        return indizes
+
+    def _belegte_seiten(self):
+        # Seiten geloeschter Indizes landen in der Freelist und werden wiederverwendet
+        return (self.conn.execute("PRAGMA page_count").fetchone()[0]
+                - self.conn.execute("PRAGMA freelist_count").fetchone()[0])
+
+    def index_anlegen(self, name, tabelle, spalten):
+        """Legt den Index an und gibt seine Groesse in Bytes zurueck (gemessen ueber die belegten Seiten)."""
+        vorher = self._belegte_seiten()
+        self.conn.execute(f"CREATE INDEX {name} ON {tabelle} ({', '.join(spalten)})")
+        self.conn.execute(f"ANALYZE {name}")
+        seiten = self._belegte_seiten() - vorher
+        return seiten * self.conn.execute("PRAGMA page_size").fetchone()[0]
+
+    def index_loeschen(self, name, tabelle):
+        self.conn.execute(f"DROP INDEX {name}")
+
+
+class MySQLAnalyse:
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+
+    def analysieren(self, tabellen):
+        for tabelle in tabellen:
+            self.cursor.execute(f"ANALYZE TABLE {tabelle}")
+            self.cursor.fetchall()
+
+    def plan(self, sql, params):
+        self.cursor.execute("EXPLAIN " + sql, params)
+        spalten = [d[0] for d in self.cursor.description]
+        zeilen, scan = [], False
+        for row in self.cursor.fetchall():
+            r = dict(zip(spalten, row))
+            zeilen.append(f"{r['table']}: type={r['type']} key={r['key']} rows={r['rows']}")
+            scan = scan or r['type'] == 'ALL'
+        return zeilen, scan
+
+    def vorhandene_indizes(self):
+        self.cursor.execute("""
+            SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX""")
+        spalten = defaultdict(list)
+        for tabelle, index, spalte in self.cursor.fetchall():
+            spalten[(tabelle.lower(), index)].append(spalte.lower())
+        indizes = defaultdict(list)
+        for (tabelle, _), cols in spalten.items():
+            indizes[tabelle].append(tuple(cols))
+        return indizes
+
+    def index_anlegen(self, name, tabelle, spalten):
+        self.cursor.execute(f"CREATE INDEX {name} ON {tabelle} ({', '.join(spalten)})")
+        self.analysieren([tabelle])
+        try:
+            # Braucht Leserechte auf mysql.*; sonst bleibt die Groesse unbekannt
+            self.cursor.execute("""
+                SELECT stat_value * @@innodb_page_size FROM mysql.innodb_index_stats
+                WHERE database_name = DATABASE() AND table_name = %s AND index_name = %s AND stat_name = 'size'""",
+                                (tabelle, name))
+            row = self.cursor.fetchone()
+            return int(row[0]) if row else None
+        except Exception:
+            return None
+
+    def index_loeschen(self, name, tabelle):
+        self.cursor.execute(f"DROP INDEX {name} ON {tabelle}")
+
+# ==========================================
+# KANDIDATEN
+# ==========================================
+SQL_SCHLUESSELWOERTER = {'ON', 'WHERE', 'JOIN', 'GROUP', 'ORDER', 'LEFT', 'INNER'}
+
+def tabellen_aliase(sql):
+    aliase = {}
+    for tabelle, alias in re.findall(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', sql, re.I):
+        if not alias or alias.upper() in SQL_SCHLUESSELWOERTER:
+            alias = tabelle
+        aliase[alias] = tabelle
+    return aliase
+
+def kandidaten(sql, vorhandene):
+    """Index-Kandidaten (tabelle, spalten) aus den Praedikaten einer Abfrage.
+
+    Je Tabelle: Gleichheits-Spalten plus eine Bereichs-Spalte, jede
+    Join-Spalte einzeln und Gleichheits- + Join-Spalten (deckt den Join
+    gleich mit ab). Kandidaten, die ein vorhandener Index als Praefix
+    schon abdeckt, fallen weg.
+    """
+    gleich, bereich, join = defaultdict(list), defaultdict(list), defaultdict(list)
+
+    def merke(ziel, alias, spalte):
+        if spalte.lower() not in ziel[alias]:
+            ziel[alias].append(spalte.lower())
+
+    for alias, spalte in re.findall(r'(\w+)\.(\w+)\s*(?:=\s*\?|IN\s*\()', sql, re.I):
+        merke(gleich, alias, spalte)
+    for alias, spalte in re.findall(r'(\w+)\.(\w+)\s*(?:BETWEEN\b|[<>]=?\s*\?)', sql, re.I):
+        merke(bereich, alias, spalte)
+    for a1, s1, a2, s2 in re.findall(r'(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)', sql):
+        merke(join, a1, s1)
+        merke(join, a2, s2)
+
+    for alias, tabelle in tabellen_aliase(sql).items():
+        varianten = []
+        if gleich[alias] or bereich[alias]:
+            varianten.append(tuple(gleich[alias] + bereich[alias][:1]))
+        varianten.extend((spalte,) for spalte in join[alias])
+        if gleich[alias] and join[alias]:
+            varianten.append(tuple(gleich[alias] + [s for s in join[alias] if s not in gleich[alias]]))
+        for spalten in varianten:
+            if not any(index[:len(spalten)] == spalten for index in vorhandene.get(tabelle.lower(), [])):
+                yield tabelle, spalten
+
+# ==========================================
+# MESSUNG
+# ==========================================
+def beispiel_parameter(daten, anzahl=PARAMETER_SAETZE):
+    """Je Abfrage `anzahl` Parametersaetze aus den vorhandenen Daten."""
+    slots = [(wt_id, stunde, l_id, k_id) for (wt_id, stunde), eintraege in daten['slots'].items()
+             for _, l_id, k_id in eintraege]
+    lehrer_ids = sorted({s[2] for s in slots})
+    tage = max((daten['letztes_datum'] - daten['erstes_datum']).days, 0)
+    params = defaultdict(list)
+    for _ in range(anzahl):
+        wt_id, stunde, l_id, k_id = random.choice(slots)
+        params['aktuelle_stunde'].append((SCHULJAHR_ID, wt_id, stunde, l_id))
+        params['kursliste'].append((k_id,))
+        datum = daten['erstes_datum'] + timedelta(days=random.randint(0, tage))
+        for name in LESE_MIX:
+            params[name].append(lese_operation(name, daten, lehrer_ids, datum)[1])
+    return params
+
+def messe(conn, ziel, params):
+    """Median-Laufzeit je Ausfuehrung in ms fuer jede Abfrage des Katalogs."""
+    ergebnis = {}
+    cursor = conn.cursor()
+    for name, sql in ABFRAGEN.items():
+        sql = ziel.sql(sql)
+        laeufe = []
+        for lauf in range(WIEDERHOLUNGEN + 1):
+            start = time.perf_counter()
+            for p in params[name]:
+                cursor.execute(sql, p)
+                cursor.fetchall()
+            if lauf:  # erster Lauf waermt nur den Cache auf
+                laeufe.append((time.perf_counter() - start) * 1000 / len(params[name]))
+        ergebnis[name] = statistics.median(laeufe)
+    cursor.close()
+    return ergebnis
+
+def gesamtzeit(messung):
+    return sum(GEWICHTE.get(name, 1.0) * ms for name, ms in messung.items())
+
+def gewinn(vorher, nachher):
+    """Eingesparte ms je erfasster Unterrichtsstunde (gewichtet nach GEWICHTE)."""
+    return sum(GEWICHTE.get(name, 1.0) * (vorher[name] - nachher[name]) for name in vorher)
+
+def bewerte(conn, ziel, analyse, params, kandidat, basis):
+    """Legt einen Kandidaten kurz an und misst ihn gegen `basis`.
+
+    `gewinn_ms` bezieht sich auf genau diese `basis`; gegen die Ausgangslage ist
+    das der Einzelgewinn, gegen die zuletzt angenommene Konfiguration der Grenzgewinn.
+    """
+    groesse = analyse.index_anlegen(kandidat['index'], kandidat['tabelle'], kandidat['spalten'])
+    try:
+        nachher = messe(conn, ziel, params)
+    finally:
+        analyse.index_loeschen(kandidat['index'], kandidat['tabelle'])
+    beste = max(basis, key=lambda n: (basis[n] - nachher[n]) / max(basis[n], 1e-9))
+    return {
+        'gewinn_ms': gewinn(basis, nachher), 'groesse_bytes': groesse,
+        'beste_abfrage': beste, 'vorher_ms': basis[beste], 'nachher_ms': nachher[beste],
+    }
+
+def berate(ziel, conn, analyse):
+    daten = lade_workload_daten(ziel)
+    params = beispiel_parameter(daten)
+    tabellen = sorted({t for sql in ABFRAGEN.values() for t in tabellen_aliase(sql).values()})
+    analyse.analysieren(tabellen)
+
+    print("=== Ausgangslage ===")
+    vorher = messe(conn, ziel, params)
+    plaene = {}
+    for name, sql in ABFRAGEN.items():
+        zeilen, scan = analyse.plan(ziel.sql(sql), params[name][0])
+        plaene[name] = zeilen
+        print(f"\n{name}: {vorher[name]:.3f} ms{'  [FULL SCAN]' if scan else ''}")
+        for zeile in zeilen:
+            print(f"    {zeile}")
+
+    vorhandene = analyse.vorhandene_indizes()
+    alle_kandidaten = []
+    for sql in ABFRAGEN.values():
+        for kandidat in kandidaten(sql, vorhandene):
+            if kandidat not in alle_kandidaten:
+                alle_kandidaten.append(kandidat)
+    print(f"\n{len(alle_kandidaten)} Kandidaten werden einzeln gemessen...")
+
+    ergebnisse = []
+    for tabelle, spalten in alle_kandidaten:
+        name = f"idx_{tabelle.lower()}_{'_'.join(spalten)}"
+        e = {'index': name, 'tabelle': tabelle, 'spalten': list(spalten),
+             'ddl': f"CREATE INDEX {name} ON {tabelle} ({', '.join(spalten)});", 'empfohlen': None}
+        e.update(bewerte(conn, ziel, analyse, params, e, vorher))
+        # Ohne gewaehlte Indizes ist der Grenzgewinn der Einzelgewinn
+        e['grenzgewinn_ms'] = e['gewinn_ms']
+        ergebnisse.append(e)
+    ergebnisse.sort(key=lambda e: e['gewinn_ms'], reverse=True)
+
+    # Gierige Auswahl: den besten Kandidaten anlegen, die uebrigen gegen die neue
+    # Ausgangslage nachmessen. So zaehlt nur, was ein Index zusaetzlich bringt.
+    # Kandidaten, die Praefix eines gewaehlten sind (oder umgekehrt), fallen ganz weg.
+    schwelle = MIN_GEWINN_PROZENT / 100 * gesamtzeit(vorher)
+    gewaehlt, basis, runde = [], vorher, ergebnisse
+    while True:
+        beste = max(runde, key=lambda e: e['grenzgewinn_ms'], default=None)
+        if beste is None or beste['grenzgewinn_ms'] < schwelle:
+            break
+        analyse.index_anlegen(beste['index'], beste['tabelle'], beste['spalten'])
+        gewaehlt.append(beste)
+        beste['empfohlen'] = len(gewaehlt)
+        basis = messe(conn, ziel, params)
+        runde = [e for e in ergebnisse if e['empfohlen'] is None and not any(
+            g['tabelle'] == e['tabelle'] and (g['spalten'][:len(e['spalten'])] == e['spalten']
+                                              or e['spalten'][:len(g['spalten'])] == g['spalten'])
+            for g in gewaehlt)]
+        for e in runde:
+            e['grenzgewinn_ms'] = bewerte(conn, ziel, analyse, params, e, basis)['gewinn_ms']
+    for e in gewaehlt:
+        analyse.index_loeschen(e['index'], e['tabelle'])
+    kombiniert = basis if gewaehlt else None
+
+    return {'vorher_ms': vorher, 'plaene': plaene, 'kandidaten': ergebnisse, 'kombiniert_ms': kombiniert}
+
+def drucke_bericht(ergebnis):
+    print("\n=== Kandidaten (nach Gewinn je erfasster Unterrichtsstunde) ===")
+    print(f"{'#':>2} {'':<3} {'Index':<52} {'Gewinn ms':>10} {'%':>5} {'Groesse':>9} {'ms/MB':>8}  Beste Abfrage")
+    for rang, e in enumerate(ergebnis['kandidaten'], 1):
+        groesse = f"{e['groesse_bytes'] / 1024:.0f} KB" if e['groesse_bytes'] is not None else '?'
+        pro_mb = (f"{e['gewinn_ms'] / (e['groesse_bytes'] / 1e6):.2f}"
+                  if e['groesse_bytes'] else '-')
+        marke = f"*{e['empfohlen']}" if e['empfohlen'] else ''
+        print(f"{rang:>2} {marke:<3} {e['tabelle'] + '(' + ', '.join(e['spalten']) + ')':<52} {e['gewinn_ms']:>10.3f} "
+              f"{100 * e['gewinn_ms'] / max(gesamtzeit(ergebnis['vorher_ms']), 1e-9):>5.1f} {groesse:>9} {pro_mb:>8}  {e['beste_abfrage']} {e['vorher_ms']:.3f} -> {e['nachher_ms']:.3f} ms")
+    print(f"\n*n = empfohlen als n-ter Index (senkt die gewichtete Gesamtlaufzeit zusaetzlich "
+          f"um mindestens {MIN_GEWINN_PROZENT}% der Ausgangslage)")
+
+    if ergebnis['kombiniert_ms']:
+        print("\n=== Mit allen empfohlenen Indizes ===")
+        print(f"{'gewichtet gesamt':<22} {gesamtzeit(ergebnis['vorher_ms']):>8.3f} -> "
+              f"{gesamtzeit(ergebnis['kombiniert_ms']):>8.3f} ms")
+        for name, vorher in ergebnis['vorher_ms'].items():
+            print(f"{name:<22} {vorher:>8.3f} -> {ergebnis['kombiniert_ms'][name]:>8.3f} ms")
+        print("\nFuer 01_schema.sql:")
+        for e in sorted((e for e in ergebnis['kandidaten'] if e['empfohlen']), key=lambda e: e['empfohlen']):
+            print(f"    {e['ddl']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Index-Berater: misst die Klassenbuch-Abfragen mit und ohne Index-Kandidaten")
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite')
+    parser.add_argument('--db', default=SQLITE_DB, help=f"SQLite-Datei (Standard: {SQLITE_DB}, wird nicht veraendert)")
+    parser.add_argument('--seed', type=int, default=1, help="Seed fuer die Parameterauswahl")
+    parser.add_argument('--json', default=None, help="Bericht zusaetzlich als JSON speichern")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    kopie_dir = None
+    if args.backend == 'sqlite':
+        if not os.path.exists(args.db):
+            print(f"FEHLER: {args.db} nicht gefunden. Erst mit convert_mysql_to_sqlite.py erzeugen.")
+            return
+        # Indizes und ANALYZE-Statistiken nur auf einer Kopie anlegen
+        kopie_dir = tempfile.mkdtemp(prefix='index_berater_')
+        ziel = SQLiteZiel(shutil.copy(args.db, kopie_dir))
+    else:
+        try:
+            ziel = MySQLZiel(input(f"Passwort fuer MySQL-User '{DB_USER}': "))
+        except ImportError as e:
+            print(f"KRITISCHER FEHLER: Datenbank-Treiber fuer MySQL fehlt ({e}).")
+            return
+        print("HINWEIS: Kandidaten werden kurz angelegt und wieder geloescht (ANALYZE TABLE inklusive).")
+
+    try:
+        conn = ziel.verbinde()
+        analyse = SQLiteAnalyse(conn) if args.backend == 'sqlite' else MySQLAnalyse(conn)
+        try:
+            ergebnis = berate(ziel, conn, analyse)
+        finally:
+            conn.close()
+    except ziel.Error as e:
+        print(f"\nKRITISCHER FEHLER: {e}")
+        return
+    finally:
+        if kopie_dir:
+            shutil.rmtree(kopie_dir)
+
+    drucke_bericht(ergebnis)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(ergebnis, f, indent=2)
+        print(f"\nBericht gespeichert: {args.json}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+# Kleine Kennzahl-Helfer, die Lasttest (lasttest_klassenbuch.py) und
+# Datenprofil (datenprofil.py) gemeinsam nutzen.
+
+def perzentil(sortiert, p):
+    """p-tes Perzentil (0-100) einer aufsteigend sortierten Liste, nach naechstem Rang; leer -> 0.0."""
+    if not sortiert:
+        return 0.0
+    return sortiert[min(len(sortiert) - 1, int(round(p / 100 * (len(sortiert) - 1))))]
@@ -0,0 +1,362 @@
+import os
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import threading
+from datetime import date, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from import_csv_to_db import DB_HOST, DB_USER, DB_NAME
+from kennzahlen import perzentil
+# Anwesenheiten werden mit denselben Annahmen erfasst, mit denen der Generator sie ausrollt
+from db_DigitalesKlassenbuch.schulalltag import ANWESENHEIT_STATUS_GEWICHTE, VERSPAETUNG_MINUTEN
+
+# ==========================================
+# KONFIGURATION
+# ==========================================
+SQLITE_DB = 'klassenbuch.sqlite' # entsteht mit convert_mysql_to_sqlite.py
+SCHULJAHR_ID = 1
+
+# Worker-Threads = gleichzeitig arbeitende Nutzer (Lehrkraefte, Sekretariat)
+THREADS = 32
+
+# Lesende Zugriffe je erfasster Unterrichtsstunde, z.B. schaut bei jeder
+# zweiten Stunde ein Schueler in seinen Stundenplan
+LESE_MIX = {
+    'stundenplan_lehrer': 0.3,
+    'stundenplan_schueler': 0.5,
+    'fehlzeiten_schueler': 0.1,
+    'vertretungsplan': 0.2,
+}
+
+# Typische Klassenbuch-Abfragen (Platzhalter im SQLite-Stil '?', fuer MySQL wird '%s' daraus).
+# Auch der Index-Berater (index_berater.py) misst genau diese Abfragen.
+ABFRAGEN = {
+    # Lehrkraft oeffnet zu Stundenbeginn ihre aktuelle Stunde (idx_stundenplan_slot)
+    'aktuelle_stunde': """
+        SELECT sp.id, sp.kurs_id, k.bezeichnung
+        FROM Stundenplan sp JOIN Kurs k ON k.id = sp.kurs_id
+        WHERE sp.schuljahr_id = ? AND sp.wochentag_id = ? AND sp.stunde = ? AND k.lehrer_id = ?""",
+    'kursliste': """
+        SELECT s.id, s.nachname, s.vorname
+        FROM Kursbelegung kb JOIN Schueler s ON s.id = kb.schueler_id
+        WHERE kb.kurs_id = ?
+        ORDER BY s.nachname, s.vorname""",
+    'stundenplan_lehrer': """
+        SELECT sp.wochentag_id, sp.stunde, k.bezeichnung, sp.raum_id
+        FROM Stundenplan sp JOIN Kurs k ON k.id = sp.kurs_id
+        WHERE k.lehrer_id = ? AND sp.schuljahr_id = ?
+        ORDER BY sp.wochentag_id, sp.stunde""",
+    'stundenplan_schueler': """
+        SELECT sp.wochentag_id, sp.stunde, k.bezeichnung, sp.raum_id
+        FROM Kursbelegung kb
+        JOIN Kurs k ON k.id = kb.kurs_id
+        JOIN Stundenplan sp ON sp.kurs_id = k.id
+        WHERE kb.schueler_id = ? AND sp.schuljahr_id = ?
+        ORDER BY sp.wochentag_id, sp.stunde""",
+    # Sekretariat: Fehlzeiten eines Schuelers im Halbjahr
+    'fehlzeiten_schueler': """
+        SELECT a.status, COUNT(*), SUM(a.verspaetung_minuten)
+        FROM Anwesenheit a JOIN Unterrichtsstunde u ON u.id = a.unterrichtsstunde_id
+        WHERE a.schueler_id = ? AND u.datum BETWEEN ? AND ?
+        GROUP BY a.status""",
+    'vertretungsplan': """
+        SELECT u.id, sp.stunde, k.bezeichnung, u.status, u.vertretungslehrer_id
+        FROM Unterrichtsstunde u
+        JOIN Stundenplan sp ON sp.id = u.stundenplan_id
+        JOIN Kurs k ON k.id = sp.kurs_id
+        WHERE u.datum = ? AND u.status IN ('vertretung', 'entfallen')
+        ORDER BY sp.stunde""",
+}
+
+UNTERRICHTSSTUNDE_INSERT = ("INSERT INTO Unterrichtsstunde (stundenplan_id, datum, status, ist_klausur) "
+                            "VALUES (?, ?, 'gehalten', 0)")
+# Partitionierte Anwesenheit (import_partitionen.py) hat `datum` denormalisiert als Pflichtspalte,
+# 01_schema.sql nicht; lade_workload_daten() stellt fest, welche Variante vorliegt
+ANWESENHEIT_INSERT = ("INSERT INTO Anwesenheit (unterrichtsstunde_id, schueler_id, datum, status, verspaetung_minuten) "
+                      "VALUES (?, ?, ?, ?, ?)")
+ANWESENHEIT_INSERT_OHNE_DATUM = ("INSERT INTO Anwesenheit (unterrichtsstunde_id, schueler_id, status, verspaetung_minuten) "
+                                 "VALUES (?, ?, ?, ?)")
+
+# ==========================================
+# VERBINDUNGEN
+# ==========================================
+class SQLiteZiel:
+    name = 'SQLite'
+    Error = sqlite3.Error
+
+    def __init__(self, pfad):
+        self.pfad = pfad
+
+    def verbinde(self):
+        # Jeder Thread bekommt eine eigene Verbindung; wartende Schreiber blockieren statt abzubrechen
+        conn = sqlite3.connect(self.pfad, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        return conn
+
+    def sql(self, text):
+        return text
+
+
+class MySQLZiel:
+    name = 'MySQL'
+
+    def __init__(self, password):
+        import mysql.connector
+        from mysql.connector import Error
+        self._connector = mysql.connector
+        self.Error = Error
+        self.password = password
+
+    def verbinde(self):
+        return self._connector.connect(host=DB_HOST, user=DB_USER, password=self.password, database=DB_NAME)
+
+    def sql(self, text):
+        return text.replace('?', '%s')
+
+# ==========================================
+# WORKLOAD
+# ==========================================
+def lade_workload_daten(ziel):
+    """Liest Stundenplan, Kursbelegung und ersten/letzten Unterrichtstag aus der Datenbank."""
+    conn = ziel.verbinde()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(ziel.sql("""
+            SELECT sp.id, sp.wochentag_id, sp.stunde, k.lehrer_id, sp.kurs_id
+            FROM Stundenplan sp JOIN Kurs k ON k.id = sp.kurs_id
+            WHERE sp.schuljahr_id = ?"""), (SCHULJAHR_ID,))
+        slots = defaultdict(list)
+        for sp_id, wt_id, stunde, lehrer_id, kurs_id in cursor.fetchall():
+            slots[(int(wt_id), int(stunde))].append((sp_id, lehrer_id, kurs_id))
+
+        cursor.execute("SELECT kurs_id, schueler_id FROM Kursbelegung ORDER BY kurs_id, schueler_id")
+        kursbelegung = defaultdict(list)
+        for kurs_id, schueler_id in cursor.fetchall():
+            kursbelegung[kurs_id].append(schueler_id)
+        schueler_ids = sorted({s_id for kurs_schueler in kursbelegung.values() for s_id in kurs_schueler})
+        cursor.execute("SELECT MIN(datum), MAX(datum) FROM Unterrichtsstunde")
+        erstes, letztes = cursor.fetchone()
+        cursor.execute("SELECT * FROM Anwesenheit WHERE 1 = 0")
+        cursor.fetchall()
+        anwesenheit_mit_datum = 'datum' in [spalte[0] for spalte in cursor.description]
+    finally:
+        conn.close()
+
+    heute = date.today()
+    erstes = date.fromisoformat(str(erstes)) if erstes else heute
+    letztes = date.fromisoformat(str(letztes)) if letztes else heute
+    return {'slots': slots, 'kursbelegung': dict(kursbelegung), 'schueler_ids': schueler_ids,
+            'erstes_datum': erstes, 'letztes_datum': letztes, 'anwesenheit_mit_datum': anwesenheit_mit_datum}
+
+def naechster_schultag(datum):
+    """Der erste Werktag (Mo-Fr) nach `datum`."""
+    datum += timedelta(days=1)
+    while datum.weekday() > 4:
+        datum += timedelta(days=1)
+    return datum
+
+def ziehe_anwesenheit(schueler_ids):
+    """Status und Verspaetung je Schueler, {schueler_id: (status, verspaetung_minuten)}."""
+    erfassung = {}
+    for s_id in schueler_ids:
+        status = random.choices(list(ANWESENHEIT_STATUS_GEWICHTE), weights=list(ANWESENHEIT_STATUS_GEWICHTE.values()))[0]
+        erfassung[s_id] = (status, random.randint(*VERSPAETUNG_MINUTEN) if status == 'verspaetet' else 0)
+    return erfassung
+
+def erzeuge_workload(daten, tage=1, nur_erste_stunde=False, lese_faktor=1.0, nur_lesen=False):
+    """Liste (operation, parameter) fuer `tage` Schultage nach dem letzten vorhandenen Tag.
+
+    Je Stunde erfasst jede unterrichtende Lehrkraft ihre Anwesenheit;
+    dazwischen laufen lesende Zugriffe gemaess LESE_MIX. Innerhalb einer
+    Stunde ist die Reihenfolge gemischt, weil alle gleichzeitig arbeiten.
+    Alle Zufallswerte (auch die erfassten Status) werden hier gezogen, damit
+    ein Seed unabhaengig von der Thread-Reihenfolge dieselbe Last ergibt.
+    """
+    ops = []
+    curr_date = daten['letztes_datum']
+    lehrer_ids = sorted({l_id for eintraege in daten['slots'].values() for _, l_id, _ in eintraege})
+    stunden = sorted({stunde for _, stunde in daten['slots']})
+    if nur_erste_stunde:
+        stunden = stunden[:1]
+
+    for _ in range(tage):
+        curr_date = naechster_schultag(curr_date)
+        wt_id = curr_date.weekday() + 1
+
+        for stunde in stunden:
+            slot_ops = []
+            for sp_id, lehrer_id, kurs_id in daten['slots'].get((wt_id, stunde), []):
+                if not nur_lesen:
+                    erfassung = ziehe_anwesenheit(daten['kursbelegung'].get(kurs_id, []))
+                    slot_ops.append(('anwesenheit_erfassen', (wt_id, stunde, lehrer_id, curr_date.isoformat(),
+                                                              daten['anwesenheit_mit_datum'], erfassung)))
+                for name, anteil in LESE_MIX.items():
+                    # Erwartungswert anteil * lese_faktor Zugriffe je Stunde, Rest zufaellig gerundet
+                    anzahl = int(anteil * lese_faktor) + (random.random() < (anteil * lese_faktor) % 1)
+                    for _ in range(anzahl):
+                        slot_ops.append(lese_operation(name, daten, lehrer_ids, curr_date))
+            random.shuffle(slot_ops)
+            ops.extend(slot_ops)
+    return ops
+
+def lese_operation(name, daten, lehrer_ids, curr_date):
+    if name == 'stundenplan_lehrer':
+        return name, (random.choice(lehrer_ids), SCHULJAHR_ID)
+    if name == 'stundenplan_schueler':
+        return name, (random.choice(daten['schueler_ids']), SCHULJAHR_ID)
+    if name == 'fehlzeiten_schueler':
+        return name, (random.choice(daten['schueler_ids']), daten['erstes_datum'].isoformat(), curr_date.isoformat())
+    return name, (curr_date.isoformat(),)
+
+# ==========================================
+# AUSFUEHRUNG
+# ==========================================
+def anwesenheit_erfassen(cursor, ziel, wt_id, stunde, lehrer_id, datum, mit_datum=False, erfassung=None):
+    """Der komplette Ablauf einer Lehrkraft: aktuelle Stunde, Kursliste, Anwesenheit speichern.
+
+    `erfassung` kommt aus ziehe_anwesenheit(); wer dort fehlt, ist anwesend.
+    """
+    erfassung = erfassung or {}
+    cursor.execute(ziel.sql(ABFRAGEN['aktuelle_stunde']), (SCHULJAHR_ID, wt_id, stunde, lehrer_id))
+    stunden = cursor.fetchall()
+    for sp_id, kurs_id, _ in stunden:
+        cursor.execute(ziel.sql(ABFRAGEN['kursliste']), (kurs_id,))
+        schueler = cursor.fetchall()
+        cursor.execute(ziel.sql(UNTERRICHTSSTUNDE_INSERT), (sp_id, datum))
+        us_id = cursor.lastrowid
+        zeilen = []
+        for s_id, _, _ in schueler:
+            status, verspaetung = erfassung.get(s_id, ('anwesend', 0))
+            zeilen.append((us_id, s_id, datum, status, verspaetung) if mit_datum else (us_id, s_id, status, verspaetung))
+        cursor.executemany(ziel.sql(ANWESENHEIT_INSERT if mit_datum else ANWESENHEIT_INSERT_OHNE_DATUM), zeilen)
+
+def fuehre_aus(ziel, ops, threads=THREADS):
+    """Spielt die Operationen mit `threads` parallelen Verbindungen ab.
+
+    Gibt {operation: [dauer_ms, ...]}, {operation: fehleranzahl} und die Gesamtdauer zurueck.
+    """
+    lokal = threading.local()
+    verbindungen = []
+    sperre = threading.Lock()
+    dauern, fehler = defaultdict(list), defaultdict(int)
+
+    def ausfuehren(op):
+        name, params = op
+        if not hasattr(lokal, 'conn'):
+            lokal.conn = ziel.verbinde()
+            with sperre:
+                verbindungen.append(lokal.conn)
+        cursor = lokal.conn.cursor()
+        start = time.perf_counter()
+        try:
+            if name == 'anwesenheit_erfassen':
+                anwesenheit_erfassen(cursor, ziel, *params)
+            else:
+                cursor.execute(ziel.sql(ABFRAGEN[name]), params)
+                cursor.fetchall()
+            lokal.conn.commit()
+        except ziel.Error:
+            lokal.conn.rollback()
+            with sperre:
+                fehler[name] += 1
+            return
+        finally:
+            cursor.close()
+        dauer_ms = (time.perf_counter() - start) * 1000
+        with sperre:
+            dauern[name].append(dauer_ms)
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(ausfuehren, ops))
+    finally:
+        for conn in verbindungen:
+            conn.close()
+    return dauern, fehler, time.perf_counter() - start
+
+def bericht(dauern, fehler, gesamt):
+    """Perzentile und Durchsatz je Operation als Liste von dicts (auch fuer --json)."""
+    zeilen = []
+    for name in sorted(set(dauern) | set(fehler)):
+        werte = sorted(dauern[name])
+        zeilen.append({
+            'operation': name, 'anzahl': len(werte), 'fehler': fehler[name],
+            'p50_ms': perzentil(werte, 50), 'p95_ms': perzentil(werte, 95), 'p99_ms': perzentil(werte, 99),
+            'max_ms': werte[-1] if werte else 0.0, 'ops_pro_s': len(werte) / max(gesamt, 1e-9),
+        })
+    return zeilen
+
+def drucke_bericht(zeilen, gesamt, threads):
+    anzahl = sum(z['anzahl'] for z in zeilen)
+    print(f"\n{anzahl} Operationen mit {threads} Threads in {gesamt:.2f}s ({anzahl / max(gesamt, 1e-9):.0f} ops/s)\n")
+    print(f"{'Operation':<22} {'Anzahl':>7} {'Fehler':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'ops/s':>8}")
+    for z in zeilen:
+        print(f"{z['operation']:<22} {z['anzahl']:>7} {z['fehler']:>6} {z['p50_ms']:>8.2f} {z['p95_ms']:>8.2f} "
+              f"{z['p99_ms']:>8.2f} {z['max_ms']:>8.2f} {z['ops_pro_s']:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Lasttest mit typischen Klassenbuch-Zugriffen")
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite')
+    parser.add_argument('--db', default=SQLITE_DB, help=f"SQLite-Datei (Standard: {SQLITE_DB})")
+    parser.add_argument('--threads', type=int, default=THREADS, help="Gleichzeitige Nutzer/Verbindungen")
+    parser.add_argument('--tage', type=int, default=1, help="Anzahl simulierter Schultage")
+    parser.add_argument('--stundenbeginn', action='store_true',
+                        help="Nur die erste Stunde: alle Lehrkraefte erfassen gleichzeitig um 08:00")
+    parser.add_argument('--lese-faktor', type=float, default=1.0, help="Skaliert die lesenden Zugriffe aus LESE_MIX")
+    parser.add_argument('--nur-lesen', action='store_true', help="Keine Anwesenheiten schreiben")
+    parser.add_argument('--direkt', action='store_true',
+                        help="SQLite-Datei direkt beschreiben statt mit einer temporaeren Kopie zu arbeiten")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', default=None, help="Ergebnis zusaetzlich als JSON speichern")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    kopie_dir = None
+    if args.backend == 'sqlite':
+        if not os.path.exists(args.db):
+            print(f"FEHLER: {args.db} nicht gefunden. Erst mit convert_mysql_to_sqlite.py erzeugen.")
+            return
+        pfad = args.db
+        if not args.direkt and not args.nur_lesen:
+            kopie_dir = tempfile.mkdtemp(prefix='lasttest_')
+            pfad = shutil.copy(args.db, kopie_dir)
+        ziel = SQLiteZiel(pfad)
+    else:
+        try:
+            ziel = MySQLZiel(input(f"Passwort fuer MySQL-User '{DB_USER}': "))
+        except ImportError as e:
+            print(f"KRITISCHER FEHLER: Datenbank-Treiber fuer MySQL fehlt ({e}).")
+            return
+        if not args.nur_lesen:
+            print(f"HINWEIS: Die Anwesenheiten werden dauerhaft in '{DB_NAME}' geschrieben.")
+
+    try:
+        daten = lade_workload_daten(ziel)
+        ops = erzeuge_workload(daten, args.tage, args.stundenbeginn, args.lese_faktor, args.nur_lesen)
+        print(f"=== Lasttest {ziel.name}: {len(ops)} Operationen ab {naechster_schultag(daten['letztes_datum'])} ===")
+        dauern, fehler, gesamt = fuehre_aus(ziel, ops, args.threads)
+    except ziel.Error as e:
+        print(f"\nKRITISCHER FEHLER: {e}")
+        return
+    finally:
+        if kopie_dir:
+            shutil.rmtree(kopie_dir)
+
+    zeilen = bericht(dauern, fehler, gesamt)
+    drucke_bericht(zeilen, gesamt, args.threads)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'backend': ziel.name, 'threads': args.threads, 'sekunden': gesamt, 'operationen': zeilen}, f, indent=2)
+        print(f"\nErgebnis gespeichert: {args.json}")
+
+if __name__ == '__main__':
+    main()
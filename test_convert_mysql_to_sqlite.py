@@ -0,0 +1,63 @@
+import io
+import os
+import sys
+import sqlite3
+import subprocess
+
+from convert_mysql_to_sqlite import Uebersetzer, lese_statements
+
+SKRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'convert_mysql_to_sqlite.py')
+
+DUMP = """-- Kommentar; mit Semikolon
+/*!40101 SET NAMES utf8mb4 */;
+SET FOREIGN_KEY_CHECKS = 0;
+CREATE TABLE `Lehrer` (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    kuerzel VARCHAR(10) NOT NULL COMMENT 'z.B. MUE',
+    status ENUM('aktiv', 'beurlaubt') NOT NULL DEFAULT 'aktiv',
+    KEY idx_lehrer_kuerzel (kuerzel)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+INSERT IGNORE INTO `Lehrer` (id, kuerzel, status) VALUES
+(1, 'O''C; x', 'aktiv'), # Kommentar
+(2, 'Back\\\\slash \\'quote\\' \\n', "beurlaubt");
+SET FOREIGN_KEY_CHECKS = 1;
+-- EOD
+"""
+
+
+def test_tokenizer_unabhaengig_von_blockgrenzen():
+    erwartet = list(lese_statements(io.StringIO(DUMP)))
+    assert len(erwartet) == 4
+    for block in (1, 2, 3, 7):
+        assert list(lese_statements(io.StringIO(DUMP), block_groesse=block)) == erwartet
+
+
+def test_dump_laesst_sich_in_sqlite_ausfuehren():
+    uebersetzer = Uebersetzer()
+    conn = sqlite3.connect(':memory:')
+    for statement in lese_statements(io.StringIO(DUMP), block_groesse=4):
+        for sql in uebersetzer.uebersetze(statement):
+            conn.execute(sql)
+
+    zeilen = conn.execute("SELECT id, kuerzel, status FROM Lehrer ORDER BY id").fetchall()
+    assert zeilen == [(1, "O'C; x", 'aktiv'), (2, "Back\\slash 'quote' \n", 'beurlaubt')]
+    conn.execute("INSERT INTO Lehrer (kuerzel) VALUES ('NEU')")
+    assert conn.execute("SELECT max(id) FROM Lehrer").fetchone()[0] == 3
+    assert conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").fetchall() == [
+        ('idx_lehrer_kuerzel',)]
+
+
+def test_fehlerhafter_dump_loescht_ausgabe_und_endet_mit_exit_code(tmp_path):
+    dump = tmp_path / 'kaputt.sql'
+    dump.write_text(DUMP + "INSERT INTO Gibtsnicht VALUES (1);\n", encoding='utf-8')
+    ausgabe = tmp_path / 'kaputt.sqlite'
+
+    ergebnis = subprocess.run([sys.executable, SKRIPT, str(dump), '-o', str(ausgabe)], capture_output=True, text=True)
+    assert ergebnis.returncode == 1
+    assert 'FEHLER' in ergebnis.stdout
+    assert not ausgabe.exists()
+
+    dump.write_text(DUMP, encoding='utf-8')
+    ergebnis = subprocess.run([sys.executable, SKRIPT, str(dump), '-o', str(ausgabe)], capture_output=True, text=True)
+    assert ergebnis.returncode == 0
+    assert sqlite3.connect(ausgabe).execute("SELECT count(*) FROM Lehrer").fetchone()[0] == 2
@@ -0,0 +1,80 @@
+import os
+import random
+
+import datenprofil
+
+
+def _schreibe(pfad, header, zeilen):
+    with open(pfad, 'w', encoding='utf-8', newline='') as f:
+        f.write(';'.join(header) + '\n')
+        for z in zeilen:
+            f.write(';'.join(str(w) for w in z) + '\n')
+
+
+def test_skizzen():
+    random.seed(0)
+    hll = datenprofil.HyperLogLog()
+    hll.add(str(i) for i in range(20000))
+    assert abs(hll.schaetzung() - 20000) / 20000 < 0.05
+
+    topk = datenprofil.TopK(k=8)
+    for i in range(5000):
+        topk.add('haeufig' if i % 3 == 0 else f'selten{i}')
+    assert topk.top(1)[0][0] == 'haeufig'
+    assert topk.top(1)[0][1] <= 1667 <= topk.top(1)[0][1] + topk.abzug
+
+    hist = datenprofil.Histogramm(bins=4)
+    werte = [random.randint(-50, 300) for _ in range(1000)]
+    for x in werte:
+        hist.add(x)
+    bins = hist.ergebnis()
+    assert len(bins) <= 4 and sum(b[2] for b in bins) == len(werte)
+    for x in werte:
+        assert any(von <= x < bis for von, bis, _ in bins)
+
+
+def test_profil_und_kennzahlen(tmp_path):
+    _schreibe(tmp_path / 'kurs.csv', ['id', 'kursart', 'lehrer_id'], [[1, 'GK', 7], [2, 'GK', 7], [3, 'LK', 8]])
+    _schreibe(tmp_path / 'kursbelegung.csv', ['schueler_id', 'kurs_id'],
+              [[s, 1] for s in range(1, 21)] + [[s, 2] for s in range(1, 11)])
+    anwesenheit = []
+    for i in range(1, 1001):
+        status = 'fehlend_entschuldigt' if i % 10 == 0 else ('verspaetet' if i % 25 == 1 else 'anwesend')
+        anwesenheit.append([i, i // 30 + 1, i % 20 + 1, status, 10 if status == 'verspaetet' else 0, ''])
+    _schreibe(tmp_path / 'anwesenheit.csv',
+              ['id', 'unterrichtsstunde_id', 'schueler_id', 'status', 'verspaetung_minuten', 'anmerkung'], anwesenheit)
+
+    profil = datenprofil.profiliere(str(tmp_path), ['Kurs', 'Kursbelegung', 'Anwesenheit'])
+    spalten = profil['tabellen']['Anwesenheit']['spalten']
+    assert profil['tabellen']['Anwesenheit']['zeilen'] == 1000
+    assert spalten['id']['typ'] == 'int' and spalten['id']['min'] == 1 and spalten['id']['max'] == 1000
+    assert spalten['anmerkung']['leer_quote'] == 1
+    assert spalten['status']['top'][0] == ['anwesend', 860]
+    assert spalten['schueler_id']['distinct_ca'] == 20
+
+    k = profil['kennzahlen']
+    assert k['anwesenheit']['fehlquote'] == 0.1
+    assert k['anwesenheit']['verspaetung_minuten']['verteilung'] == [[10, 40]]
+    assert k['kursgroessen']['GK'] == {'anzahl': 2, 'min': 10, 'p50': 10, 'p90': 20, 'max': 20, 'mittel': 15}
+    assert k['kursgroessen']['LK']['max'] == 0
+
+    # Blockgroesse aendert nichts an Zaehlungen, Min/Max und Distinct-Schaetzung
+    klein = datenprofil.profiliere_datei(os.path.join(tmp_path, 'anwesenheit.csv'), block_zeilen=7)
+    for name, s in klein['spalten'].items():
+        for feld in ('typ', 'anzahl', 'leer', 'min', 'max', 'mittel', 'distinct_ca'):
+            assert s.get(feld) == spalten[name].get(feld)
+
+
+def test_alle_csvs_und_auslastung_gegen_deputat_soll(tmp_path):
+    _schreibe(tmp_path / 'kurs.csv', ['id', 'kursart', 'lehrer_id'], [[1, 'GK', 7], [2, 'LK', 7]])
+    _schreibe(tmp_path / 'lehrer_deputation.csv', ['lehrer_id', 'deputat_soll', 'deputat_unterricht_verfuegbar'],
+              [[7, '20.00', '5.00']])
+    _schreibe(tmp_path / 'stundenplan.csv', ['kurs_id', 'raum_id', 'stunde'], [[1, 1, s] for s in range(1, 4)] +
+              [[2, 1, s] for s in range(4, 9)])
+    _schreibe(tmp_path / 'zusatz.csv', ['wert'], [[1], [2]])
+
+    profil = datenprofil.profiliere(str(tmp_path))
+    # Bekannte Tabellen in Import-Reihenfolge, unbekannte CSVs danach unter ihrem Dateinamen
+    assert list(profil['tabellen']) == ['LehrerDeputation', 'Kurs', 'Stundenplan', 'zusatz']
+    assert profil['tabellen']['zusatz']['zeilen'] == 2
+    assert profil['kennzahlen']['lehrerauslastung']['anteil_deputat']['max'] == 0.4
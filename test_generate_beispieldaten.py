@@ -0,0 +1,135 @@
+import os
+import csv
+import sys
+import pickle
+import sqlite3
+import subprocess
+from datetime import date
+
+DATEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db_DigitalesKlassenbuch')
+sys.path.insert(0, DATEN_DIR)
+import generate_beispieldaten as g
+
+from convert_mysql_to_sqlite import Uebersetzer, lese_statements
+from import_csv_to_db import SCHEMA_FILE, TABELLEN_REIHENFOLGE, convert_value, csv_dateiname
+
+
+def _ohne_laufzeit(wert):
+    # Laufzeiten in den Statistiken unterscheiden sich zwangslaeufig zwischen zwei Laeufen
+    if isinstance(wert, dict):
+        return {k: _ohne_laufzeit(v) for k, v in wert.items() if not str(k).startswith('laufzeit')}
+    if isinstance(wert, list):
+        return [_ohne_laufzeit(v) for v in wert]
+    return wert
+
+
+def _pipeline_im_prozess(hash_seed, cache_dir, ausgabe):
+    skript = (
+        "import pickle, sys, generate_beispieldaten as g\n"
+        "ctx = {'ids': g.id_basis(None), 'praefix': g.schul_praefix(None), 'namen_dir': '.'}\n"
+        "e = g.run_pipeline(ctx, seed=5, cache_dir=sys.argv[1] or None)\n"
+        "pickle.dump(e, open(sys.argv[2], 'wb'))\n"
+    )
+    subprocess.run([sys.executable, '-c', skript, cache_dir, ausgabe], cwd=DATEN_DIR, capture_output=True,
+                   env=dict(os.environ, PYTHONHASHSEED=hash_seed), check=True)
+    with open(ausgabe, 'rb') as f:
+        return _ohne_laufzeit(pickle.load(f))
+
+
+def test_cache_treffer_gleich_neuberechnung(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    # Lauf 1 fuellt den Cache, Lauf 2 rechnet ohne Cache (anderer Hash-Seed), Lauf 3 liest nur aus dem Cache
+    befuellt = _pipeline_im_prozess('1', cache_dir, str(tmp_path / 'a.pickle'))
+    neu = _pipeline_im_prozess('2', '', str(tmp_path / 'b.pickle'))
+    aus_cache = _pipeline_im_prozess('3', cache_dir, str(tmp_path / 'c.pickle'))
+
+    assert len(os.listdir(cache_dir)) == len(g.STUFEN)
+    for stufe in g.STUFEN:
+        assert befuellt[stufe.name] == neu[stufe.name], stufe.name
+        assert aus_cache[stufe.name] == neu[stufe.name], stufe.name
+
+
+def test_cache_treffer_zeigt_statistik(tmp_path, capsys):
+    cache_dir = str(tmp_path / 'cache')
+    for lauf in ('neu', 'cache'):
+        g.generate_schule(out_dir=str(tmp_path / lauf), namen_dir=DATEN_DIR, seed=5, cache_dir=cache_dir)
+        ausgabe = capsys.readouterr().out
+        assert ("Stufe 'lehrer': aus Cache" in ausgabe) == (lauf == 'cache')
+        assert 'Lehrerzuweisung:' in ausgabe
+        assert 'Sek II Belegung Q1:' in ausgabe
+
+
+def _lese_csv(pfad):
+    with open(pfad, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f, delimiter=';', quotechar='"')
+        return next(reader), list(reader)
+
+
+def test_mehrere_schulen_disjunkt_und_zusammengefuehrt_importierbar(tmp_path):
+    g.generate_schulen(3, out_dir=str(tmp_path), seed=11, prozesse=3, merge=True)
+    schulen = [str(tmp_path / f'schule_{nr:03d}') for nr in (1, 2, 3)]
+
+    for tabelle in TABELLEN_REIHENFOLGE:
+        datei = csv_dateiname(tabelle)
+        header, zusammen = _lese_csv(tmp_path / datei)
+        teile = [_lese_csv(os.path.join(schule, datei))[1] for schule in schulen]
+        if datei in g.GEMEINSAME_TABELLEN:
+            assert zusammen == teile[0], datei
+            continue
+        # Zusammenfuehren behaelt alle Zeilen, die id-Bereiche der Schulen ueberschneiden sich nicht
+        assert zusammen == [z for teil in teile for z in teil], datei
+        if header[0] == 'id':
+            bereiche = sorted((min(int(z[0]) for z in teil), max(int(z[0]) for z in teil)) for teil in teile)
+            assert all(bis < von for (_, bis), (von, _) in zip(bereiche, bereiche[1:])), datei
+
+    # Der zusammengefuehrte Datensatz erfuellt alle UNIQUE- und Fremdschluessel-Regeln aus 01_schema.sql
+    conn = sqlite3.connect(':memory:')
+    uebersetzer = Uebersetzer()
+    with open(SCHEMA_FILE, encoding='utf-8') as f:
+        for statement in lese_statements(f):
+            for sql in uebersetzer.uebersetze(statement):
+                conn.execute(sql)
+    for tabelle in TABELLEN_REIHENFOLGE:
+        header, zeilen = _lese_csv(tmp_path / csv_dateiname(tabelle))
+        conn.executemany(f"INSERT INTO {tabelle} ({', '.join(header)}) VALUES ({', '.join('?' * len(header))})",
+                         [tuple(convert_value(w) for w in z) for z in zeilen])
+    assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+
+
+def test_naechste_schultage():
+    halbjahre = [(date(2026, 8, 1), date(2027, 1, 29)), (date(2027, 2, 8), date(2027, 7, 16))]
+
+    # Freitag -> naechste Woche, Wochenende uebersprungen
+    assert g.naechste_schultage(date(2026, 9, 4), 3, halbjahre) == [date(2026, 9, 7), date(2026, 9, 8), date(2026, 9, 9)]
+    # Luecke zwischen den Abschnitten (Zeugnisferien) wird uebersprungen
+    assert g.naechste_schultage(date(2027, 1, 28), 3, halbjahre) == [date(2027, 1, 29), date(2027, 2, 8), date(2027, 2, 9)]
+    # Nach dem letzten Abschnitt ist Schluss, auch wenn weniger Tage als gewuenscht herauskommen
+    assert g.naechste_schultage(date(2027, 7, 14), 5, halbjahre) == [date(2027, 7, 15), date(2027, 7, 16)]
+    assert g.naechste_schultage(date(2027, 7, 16), 5, halbjahre) == []
+    # Ohne Abschnitte gilt das Schuljahresende
+    assert g.naechste_schultage(date(2027, 7, 29), 5, []) == [date(2027, 7, 30)]
+
+
+def test_append_schultage_setzt_ids_fort(tmp_path):
+    g.generate_schule(str(tmp_path), namen_dir=DATEN_DIR, seed=2)
+    _, us_alt = _lese_csv(tmp_path / 'unterrichtsstunde.csv')
+    _, anw_alt = _lese_csv(tmp_path / 'anwesenheit.csv')
+    letztes_datum = max(date.fromisoformat(z[2]) for z in us_alt)
+
+    assert g.append_schultage(str(tmp_path), 2, delta_dir=str(tmp_path / 'delta')) == 2
+    _, us = _lese_csv(tmp_path / 'unterrichtsstunde.csv')
+    _, anw = _lese_csv(tmp_path / 'anwesenheit.csv')
+    us_neu, anw_neu = us[len(us_alt):], anw[len(anw_alt):]
+    assert us[:len(us_alt)] == us_alt and anw[:len(anw_alt)] == anw_alt
+    assert us_neu and anw_neu
+
+    # Neue ids schliessen lueckenlos an die bisher groessten an
+    max_us, max_anw = max(int(z[0]) for z in us_alt), max(int(z[0]) for z in anw_alt)
+    assert [int(z[0]) for z in us_neu] == list(range(max_us + 1, max_us + 1 + len(us_neu)))
+    assert [int(z[0]) for z in anw_neu] == list(range(max_anw + 1, max_anw + 1 + len(anw_neu)))
+    assert {int(z[1]) for z in anw_neu} <= {int(z[0]) for z in us_neu}
+    assert g.naechste_schultage(letztes_datum, 2, []) == sorted({date.fromisoformat(z[2]) for z in us_neu})
+
+    # Die Delta-CSVs enthalten genau die neuen Zeilen
+    assert _lese_csv(tmp_path / 'delta' / 'unterrichtsstunde.csv')[1] == us_neu
+    assert _lese_csv(tmp_path / 'delta' / 'anwesenheit.csv')[1] == anw_neu
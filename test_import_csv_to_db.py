@@ -0,0 +1,90 @@
+import os
+import re
+
+import pytest
+
+from import_csv_to_db import (CSV_DIR, SCHEMA_FILE, TABELLEN_REIHENFOLGE, ImportBackend, csv_dateiname,
+                              mysql_schema_zu_postgres, split_top_level)
+
+SCHEMA = """
+-- Kommentar; mit Semikolon
+CREATE TABLE Lehrer (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    kuerzel VARCHAR(10) NOT NULL UNIQUE,
+    status ENUM('aktiv', 'inaktiv') DEFAULT 'aktiv'
+);
+
+CREATE TABLE Kurs (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    lehrer_id INT,
+    kursart ENUM('GK', 'LK', 'Klassenunterricht') NOT NULL,
+    FOREIGN KEY (lehrer_id) REFERENCES Lehrer(id) ON DELETE SET NULL,
+    INDEX idx_kurs_lehrer (lehrer_id),
+    KEY idx_kurs_art (kursart, lehrer_id)
+);
+"""
+
+
+def test_split_top_level():
+    assert split_top_level("a INT, CHECK (a IN (1, 2)), b ENUM('x,y')") == [
+        'a INT', 'CHECK (a IN (1, 2))', "b ENUM('x,y')"]
+    assert split_top_level("'a', 'b' ") == ["'a'", "'b'"]
+    assert split_top_level('') == []
+
+
+def test_mysql_schema_zu_postgres():
+    ddl = mysql_schema_zu_postgres(SCHEMA)
+
+    assert 'AUTO_INCREMENT' not in ddl and 'ENUM' not in ddl
+    assert ddl.count('id INT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY') == 2
+    assert "status VARCHAR(7) DEFAULT 'aktiv' CHECK (status IN ('aktiv', 'inaktiv'))" in ddl
+    assert "kursart VARCHAR(17) NOT NULL CHECK (kursart IN ('GK', 'LK', 'Klassenunterricht'))" in ddl
+    assert ("FOREIGN KEY (lehrer_id) REFERENCES Lehrer(id) ON DELETE SET NULL DEFERRABLE INITIALLY DEFERRED"
+            in ddl)
+    assert 'CREATE INDEX idx_kurs_lehrer ON Kurs (lehrer_id);' in ddl
+    assert 'CREATE INDEX idx_kurs_art ON Kurs (kursart, lehrer_id);' in ddl
+    # Indizes erst nach allen Tabellen, keine Inline-Reste
+    assert ddl.index('CREATE INDEX') > ddl.rindex('CREATE TABLE')
+    assert not re.search(r'^\s*(INDEX|KEY)\b', ddl, flags=re.M)
+
+
+def test_tabellen_reihenfolge_deckt_schema_in_fk_reihenfolge_ab():
+    with open(SCHEMA_FILE, encoding='utf-8') as f:
+        schema = f.read()
+    tabellen = re.findall(r'CREATE TABLE (\w+)', schema)
+    assert sorted(tabellen) == sorted(TABELLEN_REIHENFOLGE)
+
+    for statement in schema.split('CREATE TABLE')[1:]:
+        tabelle = statement.split()[0]
+        for referenz in set(re.findall(r'REFERENCES (\w+)', statement)) - {tabelle}:
+            assert TABELLEN_REIHENFOLGE.index(referenz) < TABELLEN_REIHENFOLGE.index(tabelle), (tabelle, referenz)
+
+    for tabelle in TABELLEN_REIHENFOLGE:
+        assert os.path.exists(os.path.join(CSV_DIR, csv_dateiname(tabelle))), tabelle
+
+
+def test_backend_muss_die_schnittstelle_vollstaendig_implementieren():
+    class OhneLaden(ImportBackend):
+        name = 'Halb'
+
+        def connect(self, password):
+            pass
+
+        def create_schema(self, schema_sql):
+            pass
+
+        def run_sql(self, sql):
+            pass
+
+        def close(self):
+            pass
+
+    with pytest.raises(TypeError, match='load_table'):
+        OhneLaden()
+
+    class OhnePartitionen(OhneLaden):
+        def load_table(self, table_name, headers, file_path):
+            return 0
+
+    with pytest.raises(NotImplementedError, match="'Halb' unterstuetzt keinen Partitionstausch"):
+        OhnePartitionen().tausche_partition('Anwesenheit', 'p_rest', None, None, [], 'anwesenheit.csv')
@@ -0,0 +1,96 @@
+import os
+import sys
+import csv
+from datetime import date
+
+import pytest
+
+import import_partitionen
+from import_partitionen import REST_PARTITION, partitionen, partitioniertes_schema, shard_pfad
+
+DATEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db_DigitalesKlassenbuch')
+sys.path.insert(0, DATEN_DIR)
+import generate_beispieldaten
+
+
+def _schreibe(pfad, header, zeilen):
+    with open(pfad, 'w', encoding='utf-8', newline='') as f:
+        f.write(';'.join(header) + '\n')
+        for z in zeilen:
+            f.write(';'.join(str(w) for w in z) + '\n')
+
+
+def test_partitionen(tmp_path):
+    _schreibe(tmp_path / 'schuljahr.csv', ['id', 'bezeichnung', 'startdatum', 'enddatum', 'aktiv'],
+              [[1, '2026/27', '2026-08-15', '2027-01-10', 1]])
+    _schreibe(tmp_path / 'abschnitt.csv', ['id', 'schuljahr_id', 'code', 'startdatum', 'enddatum'],
+              [[2, 1, '2. Hj', '2027-02-01', '2027-07-31'], [1, 1, '1. Hj', '2026-08-01', '2027-01-31'],
+               [3, 1, 'offen', '', '']])
+
+    monate = partitionen(str(tmp_path), 'monat')
+    # Ganze Monate ueber den Jahreswechsel, lueckenlos, Rest-Partition zuletzt
+    assert [name for name, _, _ in monate] == ['p2026_08', 'p2026_09', 'p2026_10', 'p2026_11', 'p2026_12',
+                                              'p2027_01', REST_PARTITION]
+    assert monate[0][1] == date(2026, 8, 1) and monate[-2][2] == date(2027, 2, 1)
+    assert all(bis == von for (_, _, bis), (_, von, _) in zip(monate[:-2], monate[1:-1]))
+    assert monate[-1] == (REST_PARTITION, None, None)
+
+    # Abschnitte nach Datum sortiert, `bis` exklusiv (Tag nach dem Enddatum), ohne Datum uebersprungen
+    assert partitionen(str(tmp_path), 'abschnitt') == [
+        ('a1', date(2026, 8, 1), date(2027, 2, 1)), ('a2', date(2027, 2, 1), date(2027, 8, 1)),
+        (REST_PARTITION, None, None)]
+
+    with pytest.raises(ValueError):
+        partitionen(str(tmp_path), 'woche')
+
+
+def test_partitioniertes_schema():
+    grenzen = [('p2026_08', date(2026, 8, 1), date(2026, 9, 1)), ('p2026_09', date(2026, 9, 1), date(2026, 10, 1)),
+               (REST_PARTITION, None, None)]
+
+    mysql = partitioniertes_schema('mysql', grenzen)
+    assert mysql.count('PARTITION BY RANGE COLUMNS (datum)') == 2
+    assert mysql.count("PARTITION p2026_08 VALUES LESS THAN ('2026-09-01')") == 2
+    assert mysql.count(f"PARTITION {REST_PARTITION} VALUES LESS THAN (MAXVALUE)") == 2
+    assert mysql.count('PRIMARY KEY (id, datum)') == 2
+    assert 'FOREIGN KEY' not in mysql
+
+    postgres = partitioniertes_schema('postgres', grenzen)
+    assert postgres.count('PARTITION BY RANGE (datum);') == 2
+    assert ("CREATE TABLE anwesenheit_p2026_09 PARTITION OF Anwesenheit "
+            "FOR VALUES FROM ('2026-09-01') TO ('2026-10-01');") in postgres
+    assert f"CREATE TABLE unterrichtsstunde_{REST_PARTITION} PARTITION OF Unterrichtsstunde DEFAULT;" in postgres
+    assert 'REFERENCES Schueler(id)' in postgres
+    assert 'ENUM' not in postgres and 'AUTO_INCREMENT' not in postgres
+
+    # Bestehende Tabellen (samt Daten) nur auf ausdruecklichen Wunsch loeschen
+    assert 'DROP TABLE' not in mysql and 'DROP TABLE' not in postgres
+    assert 'DROP TABLE IF EXISTS Anwesenheit;' in partitioniertes_schema('mysql', grenzen, neu=True)
+    assert 'DROP TABLE IF EXISTS Anwesenheit CASCADE;' in partitioniertes_schema('postgres', grenzen, neu=True)
+
+    with pytest.raises(ValueError):
+        partitioniertes_schema('sqlite', grenzen)
+
+
+@pytest.mark.parametrize('art', ['monat', 'abschnitt'])
+def test_generator_schreibt_die_shards_des_importers(tmp_path, art):
+    generate_beispieldaten.generate_schule(str(tmp_path), namen_dir=DATEN_DIR, seed=1, partitioniert=art)
+
+    grenzen = {shard_pfad(str(tmp_path), tabelle, name): (von, bis)
+               for tabelle in import_partitionen.PARTITIONIERTE_TABELLEN
+               for name, von, bis in partitionen(str(tmp_path), art)}
+    shard_dir = os.path.join(tmp_path, import_partitionen.PARTITIONEN_DIR)
+    dateien = [os.path.join(shard_dir, d) for d in sorted(os.listdir(shard_dir))]
+    assert len(dateien) >= 2
+
+    zeilen = 0
+    for pfad in dateien:
+        assert pfad in grenzen, pfad
+        von, bis = grenzen[pfad]
+        with open(pfad, encoding='utf-8') as f:
+            for row in csv.DictReader(f, delimiter=';'):
+                assert von is None or von <= date.fromisoformat(row['datum']) < bis
+                zeilen += 1
+    with open(os.path.join(tmp_path, 'unterrichtsstunde.csv'), encoding='utf-8') as f_us, \
+            open(os.path.join(tmp_path, 'anwesenheit.csv'), encoding='utf-8') as f_anw:
+        assert zeilen == sum(1 for _ in f_us) + sum(1 for _ in f_anw) - 2
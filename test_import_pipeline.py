@@ -0,0 +1,37 @@
+import csv
+
+import pytest
+
+from import_csv_to_db import BatchPipeline
+
+
+def _schreibe_csv(pfad, zeilen):
+    with open(pfad, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=';', quotechar='"')
+        writer.writerow(['id', 'name', 'notiz'])
+        writer.writerows(zeilen)
+
+
+def test_pipeline_liefert_alle_zeilen_in_reihenfolge(tmp_path):
+    pfad = tmp_path / 'lehrer.csv'
+    _schreibe_csv(pfad, [[i, f'L{i}', ''] for i in range(1, 1001)])
+
+    pipeline = BatchPipeline(str(pfad), batch_size=64, queue_groesse=2)
+    zeilen = [row for batch in pipeline for row in batch]
+
+    assert [row[0] for row in zeilen] == [str(i) for i in range(1, 1001)]
+    assert zeilen[0] == ('1', 'L1', None)
+    assert max(pipeline.fuellstaende) <= 2
+    assert 'Engpass' in pipeline.bericht()
+
+
+def test_pipeline_beendet_leser_bei_abbruch(tmp_path):
+    pfad = tmp_path / 'anwesenheit.csv'
+    _schreibe_csv(pfad, [[i, 'x', ''] for i in range(5000)])
+
+    pipeline = BatchPipeline(str(pfad), batch_size=10, queue_groesse=1)
+    with pytest.raises(RuntimeError):
+        for _ in pipeline:
+            raise RuntimeError('Datenbankfehler')
+    # Der Leser-Thread darf nicht an der vollen Queue haengen bleiben
+    assert pipeline._stop.is_set()
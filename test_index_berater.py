@@ -0,0 +1,102 @@
+import sqlite3
+
+import index_berater
+from convert_mysql_to_sqlite import Uebersetzer, lese_statements
+from import_csv_to_db import SCHEMA_FILE
+from index_berater import SQLiteAnalyse, berate, bewerte, kandidaten
+from lasttest_klassenbuch import ABFRAGEN, SQLiteZiel
+
+
+def test_kandidaten_aus_praedikaten_ohne_vorhandene_praefixe():
+    vorhandene = {
+        'kursbelegung': [('schueler_id', 'kurs_id')],
+        'schueler': [('id',)],
+        'anwesenheit': [('id',), ('unterrichtsstunde_id', 'schueler_id')],
+        'unterrichtsstunde': [('id',), ('datum',)],
+    }
+    assert list(kandidaten(ABFRAGEN['kursliste'], vorhandene)) == [
+        ('Kursbelegung', ('kurs_id',)),
+        ('Kursbelegung', ('kurs_id', 'schueler_id')),
+    ]
+    assert list(kandidaten(ABFRAGEN['fehlzeiten_schueler'], vorhandene)) == [
+        ('Anwesenheit', ('schueler_id',)),
+        ('Anwesenheit', ('schueler_id', 'unterrichtsstunde_id')),
+    ]
+
+
+# Angenommene Laufzeiten (ms) je Abfrage, abhaengig von den gerade angelegten Indizes
+LAUFZEITEN = {
+    'kursliste': [({'idx_kursbelegung_kurs_id_schueler_id'}, 2.0), ({'idx_kursbelegung_kurs_id'}, 4.0)],
+    'aktuelle_stunde': [({'idx_stundenplan_schuljahr_id_wochentag_id_stunde_kurs_id', 'idx_kurs_lehrer_id'}, 3.0),
+                        ({'idx_stundenplan_schuljahr_id_wochentag_id_stunde_kurs_id'}, 4.0),
+                        ({'idx_kurs_lehrer_id'}, 5.0)],
+}
+
+
+def _berater_db(tmp_path):
+    pfad = str(tmp_path / 'klassenbuch.sqlite')
+    conn = sqlite3.connect(pfad)
+    uebersetzer = Uebersetzer()
+    with open(SCHEMA_FILE, encoding='utf-8') as f:
+        for statement in lese_statements(f):
+            for sql in uebersetzer.uebersetze(statement):
+                conn.execute(sql)
+    conn.commit()
+    conn.close()
+    return pfad
+
+
+def _messe_nach_modell(messungen):
+    def messe(conn, ziel, params):
+        indizes = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        messungen.append(indizes)
+        ergebnis = {}
+        for abfrage in ABFRAGEN:
+            ergebnis[abfrage] = next((ms for noetig, ms in LAUFZEITEN.get(abfrage, []) if noetig <= indizes), 10.0)
+        return ergebnis
+    return messe
+
+
+def test_bewerte_loescht_den_kandidaten_wieder(monkeypatch):
+    messungen = []
+    monkeypatch.setattr(index_berater, 'messe', _messe_nach_modell(messungen))
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE Kursbelegung (schueler_id INT, kurs_id INT)")
+    kandidat = {'index': 'idx_kursbelegung_kurs_id', 'tabelle': 'Kursbelegung', 'spalten': ['kurs_id']}
+    basis = {abfrage: 10.0 for abfrage in ABFRAGEN}
+
+    e = bewerte(conn, SQLiteZiel(':memory:'), SQLiteAnalyse(conn), {}, kandidat, basis)
+
+    assert messungen == [{'idx_kursbelegung_kurs_id'}]
+    assert conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall() == []
+    assert e['gewinn_ms'] == 6.0
+    assert (e['beste_abfrage'], e['vorher_ms'], e['nachher_ms']) == ('kursliste', 10.0, 4.0)
+
+
+def test_berate_misst_grenzgewinn_gegen_gewaehlte_indizes(tmp_path, monkeypatch):
+    messungen = []
+    monkeypatch.setattr(index_berater, 'messe', _messe_nach_modell(messungen))
+    monkeypatch.setattr(index_berater, 'beispiel_parameter',
+                        lambda daten: {abfrage: [(1,) * sql.count('?')] for abfrage, sql in ABFRAGEN.items()})
+    ziel = SQLiteZiel(_berater_db(tmp_path))
+    conn = ziel.verbinde()
+    try:
+        ergebnis = berate(ziel, conn, SQLiteAnalyse(conn))
+        uebrig = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    finally:
+        conn.close()
+
+    kandidaten_nach_name = {e['index']: e for e in ergebnis['kandidaten']}
+    empfohlen = {name: e['empfohlen'] for name, e in kandidaten_nach_name.items() if e['empfohlen']}
+    assert empfohlen == {'idx_kursbelegung_kurs_id_schueler_id': 1,
+                         'idx_stundenplan_schuljahr_id_wochentag_id_stunde_kurs_id': 2}
+    assert not uebrig & set(kandidaten_nach_name)
+    assert ergebnis['kombiniert_ms']['kursliste'] == 2.0
+    assert ergebnis['kombiniert_ms']['aktuelle_stunde'] == 4.0
+
+    # Allein spart idx_kurs_lehrer_id 5 ms, neben dem gewaehlten Stundenplan-Index nur noch 1 ms
+    lehrer = kandidaten_nach_name['idx_kurs_lehrer_id']
+    assert (lehrer['gewinn_ms'], lehrer['grenzgewinn_ms']) == (5.0, 1.0)
+    # Der Praefix des gewaehlten Kursbelegung-Index wird nicht mehr neben ihm gemessen
+    assert kandidaten_nach_name['idx_kursbelegung_kurs_id']['grenzgewinn_ms'] == 6.0
+    assert not any({'idx_kursbelegung_kurs_id', 'idx_kursbelegung_kurs_id_schueler_id'} <= m for m in messungen)
@@ -0,0 +1,9 @@
+from kennzahlen import perzentil
+
+
+def test_perzentil():
+    assert perzentil([], 50) == 0.0
+    werte = [10.0, 20.0, 30.0]
+    assert perzentil(werte, 0) == 10.0
+    assert perzentil(werte, 50) == 20.0
+    assert perzentil(werte, 100) == 30.0
@@ -0,0 +1,78 @@
+import sqlite3
+from datetime import date
+
+from convert_mysql_to_sqlite import Uebersetzer, lese_statements
+from import_csv_to_db import SCHEMA_FILE
+from lasttest_klassenbuch import (ANWESENHEIT_STATUS_GEWICHTE, SQLiteZiel, erzeuge_workload, fuehre_aus,
+                                  lade_workload_daten)
+
+
+def _klassenbuch_db(tmp_path):
+    """Winzige Schule: zwei Lehrkraefte, zwei Kurse, drei Stundenplan-Eintraege, letzter Unterricht am Freitag."""
+    pfad = str(tmp_path / 'klassenbuch.sqlite')
+    conn = sqlite3.connect(pfad)
+    uebersetzer = Uebersetzer()
+    with open(SCHEMA_FILE, encoding='utf-8') as f:
+        for statement in lese_statements(f):
+            for sql in uebersetzer.uebersetze(statement):
+                conn.execute(sql)
+    conn.execute("INSERT INTO Schuljahr VALUES (1, '2026/27', '2026-08-01', '2027-07-31', 1)")
+    conn.executemany("INSERT INTO Wochentag VALUES (?, ?)",
+                     enumerate(['Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag'], 1))
+    conn.execute("INSERT INTO Fach VALUES (1, 'D', 'Deutsch', 'I')")
+    conn.executemany("INSERT INTO Lehrer VALUES (?, ?, 'Vorname', 'Nachname', '1980-01-01', 1)", [(1, 'AAA'), (2, 'BBB')])
+    conn.execute("INSERT INTO Raum VALUES (1, 'R-1')")
+    conn.executemany("INSERT INTO Kurs (id, schuljahr_id, bezeichnung, fach_id, lehrer_id, jahrgangsstufe, kursart, "
+                     "wochenstunden) VALUES (?, 1, ?, 1, ?, '5', 'Klassenunterricht', 2)",
+                     [(1, '5a-D', 1), (2, '5b-D', 2)])
+    conn.executemany("INSERT INTO Stundenplan (id, kurs_id, schuljahr_id, raum_id, wochentag_id, stunde, gueltig_ab) "
+                     "VALUES (?, ?, 1, 1, ?, ?, '2026-08-01')",
+                     [(1, 1, 1, 1), (2, 2, 1, 1), (3, 1, 5, 2)])
+    conn.executemany("INSERT INTO Schueler VALUES (?, 'Vorname', ?, '2015-01-01', 1)",
+                     [(s_id, f'Nachname{s_id}') for s_id in range(1, 5)])
+    conn.executemany("INSERT INTO Kursbelegung VALUES (?, ?)", [(1, 1), (2, 1), (3, 1), (3, 2), (4, 2)])
+    conn.execute("INSERT INTO Unterrichtsstunde (id, stundenplan_id, datum, status, ist_klausur) "
+                 "VALUES (1, 3, '2026-08-28', 'gehalten', 0)")
+    conn.commit()
+    conn.close()
+    return pfad
+
+
+def test_workload_ueberspringt_wochenende_und_erfasst_jeden_stundenplan_eintrag(tmp_path):
+    daten = lade_workload_daten(SQLiteZiel(_klassenbuch_db(tmp_path)))
+    assert daten['letztes_datum'] == date(2026, 8, 28) # Freitag
+    assert daten['kursbelegung'] == {1: [1, 2, 3], 2: [3, 4]}
+
+    ops = erzeuge_workload(daten, tage=5, lese_faktor=0)
+    erfassen = [params for name, params in ops if name == 'anwesenheit_erfassen']
+    # Mo 31.08. (wochentag 1) zwei Eintraege, Fr 04.09. (wochentag 5) einer; Samstag und Sonntag fehlen
+    assert sorted((p[3], p[0], p[1], p[2]) for p in erfassen) == [
+        ('2026-08-31', 1, 1, 1), ('2026-08-31', 1, 1, 2), ('2026-09-04', 5, 2, 1)]
+    for wt_id, stunde, lehrer_id, datum, mit_datum, erfassung in erfassen:
+        assert mit_datum is False
+        assert sorted(erfassung) == daten['kursbelegung'][lehrer_id] # Kurs 1 gehoert Lehrkraft 1, Kurs 2 Lehrkraft 2
+        for status, verspaetung in erfassung.values():
+            assert status in ANWESENHEIT_STATUS_GEWICHTE
+            assert (verspaetung > 0) == (status == 'verspaetet')
+
+
+def test_fuehre_aus_schreibt_die_gezogenen_anwesenheiten(tmp_path):
+    ziel = SQLiteZiel(_klassenbuch_db(tmp_path))
+    ops = erzeuge_workload(lade_workload_daten(ziel), tage=5, lese_faktor=2.0)
+
+    dauern, fehler, gesamt = fuehre_aus(ziel, ops, threads=4)
+
+    assert dict(fehler) == {}
+    assert sum(len(werte) for werte in dauern.values()) == len(ops)
+    erwartet = []
+    for name, params in ops:
+        if name == 'anwesenheit_erfassen':
+            datum, erfassung = params[3], params[5]
+            erwartet += [(datum, s_id, status, verspaetung) for s_id, (status, verspaetung) in erfassung.items()]
+    conn = sqlite3.connect(ziel.pfad)
+    geschrieben = sorted(conn.execute("""
+        SELECT u.datum, a.schueler_id, a.status, a.verspaetung_minuten
+        FROM Anwesenheit a JOIN Unterrichtsstunde u ON u.id = a.unterrichtsstunde_id""").fetchall())
+    conn.close()
+    assert len(geschrieben) == 8
+    assert geschrieben == sorted(erwartet)
@@ -0,0 +1,101 @@
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db_DigitalesKlassenbuch'))
+import lehrer_zuweisung
+
+
+def _kurse():
+    kurse = []
+    # Reli-Band: drei parallele Kurse im selben Slot -> drei verschiedene Lehrkraefte
+    for fach in ['ER', 'KR', 'ER']:
+        kurse.append({'fach': fach, 'stunden': 2, 'slots': [(2, 3), (2, 4)]})
+    # Klassenunterricht ohne Kollisionen
+    for wt in range(5):
+        kurse.append({'fach': 'D', 'stunden': 4, 'slots': [(wt, 1), (wt, 2), ((wt + 1) % 5, 5), ((wt + 1) % 5, 6)]})
+        kurse.append({'fach': 'M', 'stunden': 2, 'slots': [(wt, 7), (wt, 8)]})
+    return kurse
+
+
+def test_zuweisung_respektiert_lehrbefaehigung_deputat_und_slots():
+    random.seed(0)
+    kurse = _kurse()
+    lehrkraefte, kurs_lehrer, statistik = lehrer_zuweisung.weise_lehrer_zu(kurse, {'D': ['ER']})
+
+    assert len(kurs_lehrer) == len(kurse)
+    for l_idx, lehrkraft in enumerate(lehrkraefte):
+        slots = [s for k_idx in lehrkraft['kurse'] for s in kurse[k_idx]['slots']]
+        assert len(slots) == len(set(slots))
+        assert lehrkraft['stunden'] <= int(lehrkraft['deputat_soll'])
+        assert all(kurse[k_idx]['fach'] in lehrkraft['faecher'] for k_idx in lehrkraft['kurse'])
+        assert all(kurs_lehrer[k_idx] == l_idx for k_idx in lehrkraft['kurse'])
+
+    assert statistik['fachfremd_stunden'] == 0
+    assert statistik['lehrkraefte'] >= statistik['untere_schranke'] >= 2
+
+
+def test_fachfremd_nur_bis_zum_limit():
+    random.seed(0)
+    kurse = [{'fach': 'D', 'stunden': 4, 'slots': [(0, 1), (0, 2), (1, 1), (1, 2)]},
+             {'fach': 'IF', 'stunden': 1, 'slots': [(2, 1)]}]
+    lehrkraefte, _, statistik = lehrer_zuweisung.weise_lehrer_zu(
+        kurse, deputat_verteilung=[(25.5, 1.0)], fachfremd_max=1)
+
+    assert statistik['lehrkraefte'] == 1
+    assert statistik['fachfremd_stunden'] <= 1
+
+
+def test_zweitfach_nur_mit_freien_slots():
+    random.seed(0)
+    # Reli-Band: ER und KR im selben Slot. Ein ER-Lehrer mit KR als Zweitfach koennte keinen KR-Kurs halten.
+    kurse = [{'fach': 'ER', 'stunden': 2, 'slots': [(2, 3), (2, 4)]},
+             {'fach': 'KR', 'stunden': 2, 'slots': [(2, 3), (2, 4)]}]
+    for wt in range(5):
+        kurse.append({'fach': 'D', 'stunden': 2, 'slots': [(wt, 1), (wt, 2)]})
+    lehrkraefte, _, statistik = lehrer_zuweisung.weise_lehrer_zu(
+        kurse, {'ER': ['KR']}, deputat_verteilung=[(25.5, 1.0)], lokale_suche=False)
+
+    assert statistik['lehrkraefte'] == 2
+    assert [l['faecher'] for l in lehrkraefte] == [['ER', 'D'], ['KR']]
+
+
+def test_kursangebot_des_generators():
+    import generate_beispieldaten
+
+    anzahl = []
+    for seed in range(1, 6):
+        random.seed(seed)
+        kurse = generate_beispieldaten.stufe_kurse({}, {'ids': generate_beispieldaten.id_basis(0), 'praefix': ''})['kurse']
+        _, _, statistik = lehrer_zuweisung.weise_lehrer_zu(kurse, generate_beispieldaten.VERWANDTE_FAECHER)
+        anzahl.append(statistik['lehrkraefte'])
+        # Keine Lehrkraft, die nur fuer einen Band-Kurs angelegt wurde
+        assert statistik['auslastung_min'] >= 0.15
+        assert statistik['auslastung_mittel'] >= 0.9
+    # Die fruehere Fitting-Schleife (26 h fuer alle, beliebig viele Faecher) brauchte rund 71 Lehrkraefte
+    assert sum(anzahl) / len(anzahl) < 71
+
+
+def test_lokale_suche_begrenzt_ueber_runden():
+    import generate_beispieldaten
+
+    random.seed(3)
+    kurse = generate_beispieldaten.stufe_kurse({}, {'ids': generate_beispieldaten.id_basis(0), 'praefix': ''})['kurse']
+    ergebnisse = []
+    for _ in range(2):
+        random.seed(7)
+        lehrkraefte, kurs_lehrer, statistik = lehrer_zuweisung.weise_lehrer_zu(kurse, generate_beispieldaten.VERWANDTE_FAECHER)
+        ergebnisse.append((lehrkraefte, kurs_lehrer))
+    assert ergebnisse[0] == ergebnisse[1]
+    assert 0 < statistik['runden_lokale_suche'] <= lehrer_zuweisung.LOKALE_SUCHE_MAX_RUNDEN
+
+    random.seed(7)
+    _, _, statistik = lehrer_zuweisung.weise_lehrer_zu(kurse, generate_beispieldaten.VERWANDTE_FAECHER, max_runden=1)
+    assert statistik['runden_lokale_suche'] == 1
+
+
+def test_zeitlimit_nur_als_notbremse(capsys):
+    random.seed(0)
+    _, _, statistik = lehrer_zuweisung.weise_lehrer_zu(_kurse(), {'D': ['ER']}, zeitlimit=0)
+    assert statistik['runden_lokale_suche'] == 0
+    assert 'WARNUNG: Lokale Suche' in capsys.readouterr().out
@@ -0,0 +1,76 @@
+import os
+import sys
+import random
+import subprocess
+from collections import defaultdict
+
+DATEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db_DigitalesKlassenbuch')
+sys.path.insert(0, DATEN_DIR)
+import sek_ii_belegung
+
+
+def _kurse(anzahl_gk_schienen=9):
+    # Je Schiene vier GK-Faecher (jedes Fach in drei Schienen), dazu zwei LK-Schienen mit je zwei Kursen pro LK-Fach
+    faecher = ['D', 'M', 'E', 'SP', 'BI', 'GE', 'KU', 'SW', 'PH', 'CH', 'ER', 'PL']
+    kurse = []
+    for s in range(anzahl_gk_schienen):
+        for i in range(4):
+            fach = faecher[(s + 3 * i) % len(faecher)]
+            kurse.append({'fach': fach, 'art': 'GK', 'schiene': s, 'bez': f'{fach}-GK{s}'})
+    for s in (9, 10):
+        for fach in ['D', 'M', 'E', 'BI', 'GE']:
+            for i in range(2):
+                kurse.append({'fach': fach, 'art': 'LK', 'schiene': s, 'bez': f'{fach}-LK{s}-{i}'})
+    return kurse
+
+
+def test_belegung_ist_schienenkonfliktfrei_und_balanciert():
+    random.seed(0)
+    kurse = _kurse()
+    schueler = list(range(1, 12001))
+    belegung, statistik = sek_ii_belegung.belege_jahrgang(schueler, kurse)
+
+    pro_schueler = defaultdict(list)
+    for k_idx, kurs_schueler in enumerate(belegung):
+        for s_id in kurs_schueler:
+            pro_schueler[s_id].append(kurse[k_idx])
+
+    assert statistik['unvollstaendig'] == 0
+    assert len(pro_schueler) == len(schueler)
+    for gewaehlt in pro_schueler.values():
+        assert len(gewaehlt) == sek_ii_belegung.LK_ANZAHL + sek_ii_belegung.GK_ANZAHL
+        assert len({c['schiene'] for c in gewaehlt}) == len(gewaehlt)
+        assert len({c['fach'] for c in gewaehlt}) == len(gewaehlt)
+        assert set(sek_ii_belegung.PFLICHTFAECHER) <= {c['fach'] for c in gewaehlt}
+        assert sum(c['art'] == 'LK' for c in gewaehlt) == sek_ii_belegung.LK_ANZAHL
+
+    for art in ('LK', 'GK'):
+        assert abs(statistik[art]['mittel'] - statistik[art]['ziel']) < 1e-9
+    # LKs: alle Faecher in beiden Schienen -> Kursgroessen unterscheiden sich hoechstens um einen Schueler
+    lk_groessen = [len(belegung[k_idx]) for k_idx, c in enumerate(kurse) if c['art'] == 'LK']
+    assert max(lk_groessen) - min(lk_groessen) <= 1
+
+
+def test_belegung_unabhaengig_vom_hash_seed_und_balanciert():
+    # Gleicher Seed -> gleiche Belegung, auch wenn sich PYTHONHASHSEED zwischen Prozessen unterscheidet
+    skript = (
+        "import random, generate_beispieldaten as g, sek_ii_belegung as b\n"
+        "random.seed(7)\n"
+        "kurse = g.stufe_kurse({}, {'ids': g.id_basis(0), 'praefix': ''})['kurse']\n"
+        "for jg, n in g.STUFEN_SEK_II.items():\n"
+        "    jk = [c for c in kurse if c['jg'] == jg]\n"
+        "    bel, st = b.belege_jahrgang(list(range(n)), jk, lk_anzahl=0 if jg == 'EF' else b.LK_ANZAHL)\n"
+        "    print(bel)\n"
+        "    print(jg, st['GK']['max_abweichung'])\n"
+    )
+    ausgaben = []
+    for hash_seed in ('1', '2'):
+        ergebnis = subprocess.run([sys.executable, '-c', skript], cwd=DATEN_DIR, capture_output=True, text=True,
+                                  env=dict(os.environ, PYTHONHASHSEED=hash_seed), check=True)
+        ausgaben.append(ergebnis.stdout)
+    assert ausgaben[0] == ausgaben[1]
+
+    # Mit dem Kursangebot des Generators liegen alle GKs nahe am Ziel
+    for zeile in ausgaben[0].splitlines():
+        if zeile.split()[0] in ('EF', 'Q1', 'Q2'):
+            assert float(zeile.split()[1]) < 0.25